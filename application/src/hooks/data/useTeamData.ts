@@ -13,7 +13,7 @@ export function useTeamData() {
       try {
         setIsLoading(true)
         setError(null)
-        const teamData = await processTeamData()
+        const teamData = await processTeamData('24/25')
         
         // Filter to only include teams where season='24/25'
         const filteredData = teamData.filter(team => team.season === '24/25')
@@ -3,7 +3,7 @@ import { useState } from 'react'
 import { BarChart } from '../components/charts/BarChart'
 import { InteractiveTable } from '../components/charts/InteractiveTable'
 import { usePlayerData } from '../hooks/data/usePlayerData'
-import { getValue } from '../utils/processors/playerDataProcessor'
+import { getValue, getPercentileRank } from '../utils/processors/playerDataProcessor'
 import { PlayerSelector } from '../components/common/PlayerSelector'
 import { MultiPlayerSelector } from '../components/common/MultiPlayerSelector'
 import type { PlayerFilters } from '../components/common/MultiPlayerSelector'
@@ -155,7 +155,7 @@ function PlayerView() {
     return statNames.map(statName => ({
       name: STAT_DISPLAY_NAMES[statName] || statName,
       value: getValue(selectedPlayer, statName),
-      percentile: getValue(selectedPlayer, statName) // Use getValue for percentile too - it's already stored
+      percentile: getPercentileRank(selectedPlayer, statName)
     }))
   }
 
@@ -217,16 +217,15 @@ function PlayerView() {
           league: player.league
         }
 
-        // Add position-specific stats dynamically - use getValue for stored percentiles
+        // Add position-specific stats dynamically with their stored percentiles
         const positionSpecificData: any = {}
         positionStats.forEach(statName => {
           const key = statName.replace(/[^a-zA-Z0-9]/g, '').toLowerCase()
           const rawValue = getValue(player, statName)
-          const percentileValue = getValue(player, statName) // Same value - it's already the percentile stored in data
           
           positionSpecificData[key] = {
             value: rawValue,
-            percentile: percentileValue, // Use the stored percentile value directly
+            percentile: getPercentileRank(player, statName),
             displayName: STAT_DISPLAY_NAMES[statName] || statName,
             originalName: statName,
             formatted: typeof rawValue === 'number' ? 
@@ -239,9 +238,9 @@ function PlayerView() {
           ...baseData,
           ...positionSpecificData,
           rating: Math.round((
-            getValue(player, positionStats[0]) +
-            getValue(player, positionStats[1]) +
-            getValue(player, positionStats[2])
+            getPercentileRank(player, positionStats[0]) +
+            getPercentileRank(player, positionStats[1]) +
+            getPercentileRank(player, positionStats[2])
           ) / 3)
         }
       })
@@ -283,7 +282,7 @@ function PlayerView() {
         format: (statObject: any) => {
           if (!statObject) return 'N/A'
           
-          // For the table display, show the percentile value (which is stored as the main value)
+          // For the table display, show the percentile rank
           const percentile = statObject.percentile
           if (typeof percentile === 'number') {
             return Math.round(percentile).toString()
@@ -3,8 +3,9 @@ import { StackedBarChart } from '../components/charts/StackedBarChart'
 import { LineChart } from '../components/charts/LineChart'
 import { useMatchData } from '../hooks/data/useMatchData'
 import { MatchSelector } from '../components/common/MatchSelector'
-import { getValue, getOppositionValue } from '../utils/processors/matchDataProcessor'
-import { useMemo } from 'react'
+import { getValue, getOppositionValue, processMatchSeries, rollingMean } from '../utils/processors/matchDataProcessor'
+import { useEffect, useMemo, useState } from 'react'
+import type { MatchSeries } from '../types'
 
 function ProgressView() {
   const { data, selectedMatch, setSelectedMatch, isLoading, error, matches } = useMatchData()
@@ -13,67 +14,62 @@ function ProgressView() {
   // Sort data by matchId ascending
   const sortedData = useMemo(() => [...data].sort((a, b) => a.matchId - b.matchId), [data])
 
-  // xPoints running average (projected to 46 games)
-  const xPointsData = sortedData.map((match, index) => {
-    const xPoints = getValue(match, "Dorking Wanderers", "xPoints")
-    const runningTotal = sortedData
-      .filter(m => m.matchId <= match.matchId)
-      .reduce((sum, m) => sum + getValue(m, "Dorking Wanderers", "xPoints"), 0)
-    const runningAverage = (runningTotal / (index + 1)) * 46
-    return {
-      match: match.match,
-      matchId: match.matchId,
-      value: runningAverage
-    }
-  })
-
   // Helper to get last N matches for rolling average
   const rollingWindow = 5
 
-  // xG Difference (5-game rolling average)
-  const xgDiffData = sortedData.map((match, index) => {
-    const windowStart = Math.max(0, index - rollingWindow + 1)
-    const windowMatches = sortedData.slice(windowStart, index + 1)
-    const sum = windowMatches.reduce(
-      (acc, m) => acc + (getValue(m, "Dorking Wanderers", "xG") - getOppositionValue(m, "xG")),
-      0
-    )
-    return {
-      match: match.match,
-      matchId: match.matchId,
-      value: sum / windowMatches.length
-    }
-  })
+  // Precomputed series from match_series.json, used when it covers the loaded matches
+  const [series, setSeries] = useState<MatchSeries | null>(null)
+  useEffect(() => {
+    processMatchSeries().then(setSeries)
+  }, [])
 
-  // Progressive Pass Success Difference (5-game rolling average)
-  const progPassDiffData = sortedData.map((match, index) => {
-    const windowStart = Math.max(0, index - rollingWindow + 1)
-    const windowMatches = sortedData.slice(windowStart, index + 1)
-    const sum = windowMatches.reduce(
-      (acc, m) => acc + (getValue(m, "Dorking Wanderers", "Progressive pass success %") - getOppositionValue(m, "Progressive pass success %")),
-      0
-    )
-    return {
+  const { xPointsData, xgDiffData, progPassDiffData, xgPerfData } = useMemo(() => {
+    const teamSeries = series?.teams["Dorking Wanderers"]
+    const rolling = teamSeries?.rolling[String(rollingWindow)]
+    const precomputed = teamSeries && rolling &&
+      teamSeries.matchIds.length === sortedData.length &&
+      teamSeries.matchIds.every((id, index) => id === sortedData[index].matchId)
+
+    const toPoints = (values: number[]) => sortedData.map((match, index) => ({
       match: match.match,
       matchId: match.matchId,
-      value: sum / windowMatches.length
+      value: values[index]
+    }))
+
+    if (precomputed) {
+      return {
+        // xPoints running average (projected to 46 games)
+        xPointsData: toPoints(teamSeries.projectedXPoints),
+        xgDiffData: toPoints(rolling.xgDiff),
+        progPassDiffData: toPoints(rolling.progPassDiff),
+        xgPerfData: toPoints(rolling.xgPerformance)
+      }
     }
-  })
 
-  // xG Performance (5-game rolling average)
-  const xgPerfData = sortedData.map((match, index) => {
-    const windowStart = Math.max(0, index - rollingWindow + 1)
-    const windowMatches = sortedData.slice(windowStart, index + 1)
-    const sum = windowMatches.reduce(
-      (acc, m) => acc + ((getValue(m, "Dorking Wanderers", "Goals") - getValue(m, "Dorking Wanderers", "xG")) - (getOppositionValue(m, "Goals") - getOppositionValue(m, "xG"))),
-      0
+    // Fallback: compute the same series with running sums
+    let runningTotal = 0
+    const projected = sortedData.map((match, index) => {
+      runningTotal += getValue(match, "Dorking Wanderers", "xPoints")
+      return (runningTotal / (index + 1)) * 46
+    })
+    const diff = (statName: string) => sortedData.map(m =>
+      getValue(m, "Dorking Wanderers", statName) - getOppositionValue(m, statName)
     )
+    const xgPerformance = sortedData.map(m =>
+      (getValue(m, "Dorking Wanderers", "Goals") - getValue(m, "Dorking Wanderers", "xG")) -
+      (getOppositionValue(m, "Goals") - getOppositionValue(m, "xG"))
+    )
+
     return {
-      match: match.match,
-      matchId: match.matchId,
-      value: sum / windowMatches.length
+      xPointsData: toPoints(projected),
+      // xG Difference (5-game rolling average)
+      xgDiffData: toPoints(rollingMean(diff("xG"), rollingWindow)),
+      // Progressive Pass Success Difference (5-game rolling average)
+      progPassDiffData: toPoints(rollingMean(diff("Progressive pass success %"), rollingWindow)),
+      // xG Performance (5-game rolling average)
+      xgPerfData: toPoints(rollingMean(xgPerformance, rollingWindow))
     }
-  })
+  }, [series, sortedData])
 
   // --- Match Comparison Section Stats ---
 
@@ -8,6 +8,7 @@ export interface StatValue {
 export interface TeamStats {
   team: string;
   season: string;
+  league?: string;
   stats: {
     Goals: StatValue;
     xG: StatValue;
@@ -35,10 +36,15 @@ export interface Player {
   height: string | number;
   league: string;
   stats: {
-    [key: string]: number;
+    [key: string]: number | PlayerStatValue;
   };
 }
 
+export interface PlayerStatValue {
+  value: number;
+  percentile: number;
+}
+
 // Match/Progress-related types - PLACEHOLDER
 export interface MatchData {
   matchId: string;
@@ -51,6 +57,70 @@ export interface MatchData {
   };
 }
 
+// Per-team series precomputed by match_csv_converter.py
+export interface TeamSeries {
+  matchIds: number[];
+  matches: string[];
+  cumulativeXPoints: number[];
+  projectedXPoints: number[];
+  rolling: {
+    [window: string]: {
+      xgDiff: number[];
+      progPassDiff: number[];
+      xgPerformance: number[];
+    };
+  };
+}
+
+export interface MatchSeries {
+  windows: number[];
+  seasonLength: number;
+  teams: {
+    [team: string]: TeamSeries;
+  };
+}
+
+// Columnar payloads written by columnar.py (--columnar on the oppo and player converters)
+export interface ColumnarTeamStats {
+  format: 'team-stats';
+  version: number;
+  teams: string[];
+  seasons: string[];
+  leagues?: (string | null)[];
+  stats: string[];
+  values: number[][];
+  percentiles: number[][];
+}
+
+export interface ColumnarPlayers {
+  format: 'players';
+  version: number;
+  count: number;
+  fields: string[];
+  columns: (string | number)[][];
+  stats: string[];
+  values: (number | string)[][];
+  percentiles: (number | null)[][];
+}
+
+// Shard manifests written by shard_export.py (data/shards/<kind>/manifest.json)
+export interface ShardEntry {
+  path: string;
+  count: number;
+  bytes: number;
+  gzipBytes: number;
+  hash: string;
+}
+
+export interface ShardManifest {
+  kind: string;
+  layouts: {
+    [layout: string]: {
+      [key: string]: ShardEntry;
+    };
+  };
+}
+
 // Chart component types
 export interface ChartMetric {
   name: string;
@@ -78,6 +148,38 @@ export interface TeamLineup {
   team_id: number;
   league_position: number;
   last_5_matches: MatchData[];
+  average_shape?: AverageShape;
+}
+
+// Precomputed by lineup_shapes.py over a team's most recent matches
+export interface ShapeSlot extends PlayerPosition {
+  spreadX: number;
+  spreadY: number;
+}
+
+export interface ShapePlayer {
+  id: number;
+  surname: string;
+  full_name: string;
+  jersey_number: string;
+  position: string;
+  starts: number;
+  averageX: number;
+  averageY: number;
+  spreadX: number;
+  spreadY: number;
+}
+
+export interface AverageShape {
+  matches: number;
+  match_ids: number[];
+  slots: ShapeSlot[];
+  players: ShapePlayer[];
+  grid: {
+    columns: number;
+    rows: number;
+    occupancy: number[][];
+  };
 }
 
 export interface MatchData {
@@ -0,0 +1,258 @@
+import argparse
+import csv
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+DATA_DIR = os.path.dirname(os.path.abspath(__file__))
+BASELINE_FILE = os.path.join(DATA_DIR, "benchmark_baselines.json")
+
+DEFAULT_SCALES = [1, 10, 100, 1000]
+DEFAULT_THRESHOLD = 0.25  # fail on >25% throughput drop or peak memory growth
+DEFAULT_REPEAT = 3
+# Each timed sample repeats the stage until it has run this long, so
+# millisecond stages are not compared on timer noise
+MIN_SAMPLE_SECONDS = 0.2
+
+# Rows generated at 1x scale, roughly the size of today's real inputs
+BASE_MATCHES = 47
+BASE_TEAMS = 72
+BASE_PLAYERS = 100
+BASE_EVENTS = 120
+
+PLAYER_STATS = [
+    'Goals', 'xG', 'Assists', 'xA', 'Shots per 90', 'Passes per 90', 'Accurate passes, %',
+    'Progressive passes per 90', 'Progressive runs per 90', 'Defensive duels per 90',
+    'Defensive duels won, %', 'Aerial duels per 90', 'Aerial duels won, %', 'Interceptions per 90',
+    'Successful dribbles, %', 'Touches in box per 90', 'Key passes per 90', 'Crosses per 90'
+]
+POSITIONS = ['GK', 'CB', 'LCB', 'RB', 'LB', 'DMF', 'CMF', 'AMF', 'LW', 'RW', 'CF']
+
+def read_header(csv_name):
+    with open(os.path.join(DATA_DIR, csv_name), 'r', encoding='utf-8') as f:
+        return next(csv.reader(f))
+
+def generate_match_csv(path, scale, rng):
+    """match_data.csv schema: LEAGUE AVERAGE row, then a Dorking and Opposition row per match"""
+    header = read_header('match_data.csv')
+    stat_columns = header[4:]
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(header)
+        writer.writerow(['LEAGUE AVERAGE', '', '30/12/1899', 'Dorking Wanderers'] + [f"{rng.uniform(0, 100):.3f}" for _ in stat_columns])
+        for i in range(BASE_MATCHES * scale):
+            match_name = f"M{i}: Synthetic ({'H' if i % 2 else 'A'})"
+            home = 'h' if i % 2 else 'a'
+            for team in ('Dorking Wanderers', 'Opposition'):
+                stats = [str(rng.randint(0, 4)), f"{rng.uniform(0, 3):.2f}"] + [f"{rng.uniform(0, 100):.2f}" for _ in stat_columns[2:]]
+                writer.writerow([match_name, home, '31/12/1899', team] + stats)
+    return BASE_MATCHES * scale * 2
+
+def generate_oppo_csv(path, scale, rng):
+    """oppo_data.csv schema: one row per team and season"""
+    header = read_header('oppo_data.csv')
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(header)
+        for i in range(BASE_TEAMS * scale):
+            writer.writerow([f"Team {i}", f"{20 + i % 5}/{21 + i % 5}"] + [f"{rng.uniform(0.1, 150):.2f}" for _ in header[2:]])
+    return BASE_TEAMS * scale
+
+def generate_player_csv(path, scale, rng):
+    """Wyscout player export schema: the converter's top-level fields plus per-90 stats"""
+    import player_csv_converter
+    header = player_csv_converter.TOP_LEVEL_FIELDS + PLAYER_STATS
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(header)
+        for i in range(BASE_PLAYERS * scale):
+            writer.writerow([
+                f"Player {i}", f"Team {i % 200}", '24/25', rng.choice(POSITIONS), str(rng.randint(17, 38)),
+                '2026-06-30', str(rng.randint(0, 4000)), 'England', rng.choice(['left', 'right']),
+                str(rng.randint(165, 200)), rng.choice(['National League South', 'National League North'])
+            ] + [f"{rng.uniform(0, 10):.2f}" if rng.random() > 0.1 else '' for _ in PLAYER_STATS])
+    return BASE_PLAYERS * scale
+
+def generate_average_positions(rng):
+    """One SofaScore average-positions payload: 11 starters and 3-5 subs per side"""
+    payload = {"substitutions": []}
+    player_id = rng.randint(1, 10**6)
+    for side in ('home', 'away'):
+        players = []
+        for n in range(11 + rng.randint(3, 5)):
+            player_id += 1
+            players.append({
+                "player": {"id": player_id, "name": f"First{n} Last-Name{n}", "jerseyNumber": str(n + 1), "position": rng.choice('GDMF')},
+                "averageX": rng.uniform(0, 100),
+                "averageY": rng.uniform(0, 100)
+            })
+            if n >= 11:
+                payload["substitutions"].append({"playerIn": {"id": player_id}})
+        payload[side] = players
+    return payload
+
+def run_match(tmp_dir, scale, rng):
+    import match_csv_converter
+    csv_path = os.path.join(tmp_dir, 'match.csv')
+    rows = generate_match_csv(csv_path, scale, rng)
+    return rows, lambda: match_csv_converter.csv_to_json(csv_path, os.path.join(tmp_dir, 'match.json'))
+
+def run_oppo(tmp_dir, scale, rng):
+    import oppo_csv_converter
+    csv_path = os.path.join(tmp_dir, 'oppo.csv')
+    rows = generate_oppo_csv(csv_path, scale, rng)
+    return rows, lambda: oppo_csv_converter.process_football_data(csv_path)
+
+def run_player(tmp_dir, scale, rng):
+    import player_csv_converter
+    csv_path = os.path.join(tmp_dir, 'player.csv')
+    rows = generate_player_csv(csv_path, scale, rng)
+    return rows, lambda: player_csv_converter.csv_to_json(csv_path, os.path.join(tmp_dir, 'player.json'))
+
+def run_lineups(tmp_dir, scale, rng):
+    from lineup_grabber import process_average_positions
+    payloads = [generate_average_positions(rng) for _ in range(BASE_EVENTS * scale)]
+    return len(payloads), lambda: [process_average_positions(payload) for payload in payloads]
+
+def generate_xpoints_matches(scale, rng):
+    """Built-match shape add_xpoints() reads: two teams per match with an xG stat"""
+    return [
+        {'teams': {team: {'stats': {'xG': round(rng.uniform(0, 3), 2)}} for team in ('Dorking Wanderers', 'Opposition')}}
+        for _ in range(BASE_MATCHES * scale)
+    ]
+
+def run_xpoints(tmp_dir, scale, rng):
+    from xpoints import add_xpoints
+    matches = generate_xpoints_matches(scale, rng)
+    return len(matches), lambda: add_xpoints(matches)
+
+STAGES = {
+    'match_csv_converter.csv_to_json': run_match,
+    'oppo_csv_converter.process_football_data': run_oppo,
+    'player_csv_converter.csv_to_json': run_player,
+    'lineup_grabber.process_average_positions': run_lineups,
+    'xpoints.add_xpoints': run_xpoints
+}
+
+def time_loops(run, loops):
+    start = time.perf_counter()
+    for _ in range(loops):
+        run()
+    return time.perf_counter() - start
+
+def measure(stage_setup, scale, repeat=DEFAULT_REPEAT, seed=0, min_sample_seconds=MIN_SAMPLE_SECONDS):
+    """Best-of-`repeat` time per run for one stage, then one run under tracemalloc for peak memory.
+
+    Each sample runs the stage `loops` times, with `loops` doubled until a
+    sample takes at least min_sample_seconds (as timeit's autorange does).
+    """
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        rows, run = stage_setup(tmp_dir, scale, random.Random(seed))
+
+        # Converters print progress; keep the benchmark output readable
+        stdout = sys.stdout
+        sys.stdout = open(os.devnull, 'w')
+        try:
+            # Warm-up run so lazy imports and first-call setup are not timed
+            run()
+
+            loops = 1
+            sample = time_loops(run, loops)
+            while sample < min_sample_seconds:
+                loops *= 2
+                sample = time_loops(run, loops)
+
+            seconds = sample / loops
+            for _ in range(repeat - 1):
+                seconds = min(seconds, time_loops(run, loops) / loops)
+
+            tracemalloc.start()
+            run()
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+        finally:
+            sys.stdout.close()
+            sys.stdout = stdout
+
+    return {
+        'rows': rows,
+        'seconds': round(seconds, 6),
+        'loops': loops,
+        'rows_per_sec': round(rows / seconds, 1) if seconds > 0 else None,
+        'peak_mb': round(peak / 2**20, 2)
+    }
+
+def compare(results, baselines, threshold):
+    """Return regression messages for results worse than baseline by more than threshold"""
+    regressions = []
+    for key, result in results.items():
+        baseline = baselines.get(key)
+        if not baseline:
+            continue
+        if result['seconds'] > baseline['seconds'] * (1 + threshold):
+            regressions.append(f"{key}: {result['seconds']:.4f}s per run vs baseline {baseline['seconds']:.4f}s")
+        if result['peak_mb'] > baseline['peak_mb'] * (1 + threshold) and result['peak_mb'] - baseline['peak_mb'] > 1:
+            regressions.append(f"{key}: {result['peak_mb']:.1f} MB peak vs baseline {baseline['peak_mb']:.1f}")
+    return regressions
+
+def run_benchmarks(scales=DEFAULT_SCALES, stages=None, baseline_file=BASELINE_FILE, save=False,
+                   threshold=DEFAULT_THRESHOLD, repeat=DEFAULT_REPEAT, min_sample_seconds=MIN_SAMPLE_SECONDS):
+    results = {}
+    for stage_name, stage_setup in STAGES.items():
+        if stages and not any(s in stage_name for s in stages):
+            continue
+        for scale in scales:
+            key = f"{stage_name}@{scale}x"
+            try:
+                results[key] = measure(stage_setup, scale, repeat, min_sample_seconds=min_sample_seconds)
+            except ImportError as e:
+                print(f"⏭️  Skipping {stage_name}: {e}")
+                break
+            r = results[key]
+            print(f"{key:<50} {r['rows']:>9} rows {r['seconds']:>9.4f}s x{r['loops']:<5} {r['rows_per_sec'] or 0:>12.0f} rows/s {r['peak_mb']:>9.1f} MB")
+
+    try:
+        with open(baseline_file, 'r', encoding='utf-8') as f:
+            baselines = json.load(f)
+    except (OSError, ValueError):
+        baselines = {}
+
+    if save:
+        baselines.update(results)
+        with open(baseline_file, 'w', encoding='utf-8') as f:
+            json.dump(baselines, f, indent=2, sort_keys=True)
+        print(f"💾 Saved {len(results)} baselines to {baseline_file}")
+        return []
+
+    regressions = compare(results, baselines, threshold)
+    if regressions:
+        print(f"\n❌ {len(regressions)} regressions beyond {threshold:.0%}:")
+        for message in regressions:
+            print(f"  {message}")
+    elif baselines:
+        print(f"\n✅ No regressions beyond {threshold:.0%}")
+    else:
+        print(f"\nNo baselines in {baseline_file}; run with --save to record them")
+    return regressions
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Throughput and peak-memory benchmarks for the data converters")
+    parser.add_argument("--scales", type=int, nargs="+", default=DEFAULT_SCALES,
+                        help="multiples of today's input size to generate")
+    parser.add_argument("--stages", nargs="+", help="only run stages whose name contains one of these")
+    parser.add_argument("--baseline-file", default=BASELINE_FILE)
+    parser.add_argument("--save", action="store_true", help="record results as the new baselines")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="allowed fractional slowdown or memory growth before failing")
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT, help="timed samples per stage; the fastest counts")
+    parser.add_argument("--min-sample-seconds", type=float, default=MIN_SAMPLE_SECONDS,
+                        help="repeat a stage within each sample until it has run this long")
+    args = parser.parse_args()
+
+    regressions = run_benchmarks(args.scales, args.stages, args.baseline_file, args.save, args.threshold, args.repeat,
+                                 args.min_sample_seconds)
+    sys.exit(1 if regressions else 0)
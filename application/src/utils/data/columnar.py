@@ -0,0 +1,154 @@
+import argparse
+import gzip
+import json
+import time
+
+COLUMNAR_VERSION = 1
+
+def encode_team_stats(records):
+    """Columnar form of oppo_data.json records.
+
+    Team names, seasons (and leagues, when the records have them) and stat
+    names are stored once; values[i] and percentiles[i] hold stat i for every
+    team, in record order.
+    """
+    stats = list(records[0]['stats']) if records else []
+    payload = {
+        'format': 'team-stats',
+        'version': COLUMNAR_VERSION,
+        'teams': [record['team'] for record in records],
+        'seasons': [record['season'] for record in records],
+        'stats': stats,
+        'values': [[record['stats'][stat]['value'] for record in records] for stat in stats],
+        'percentiles': [[record['stats'][stat]['percentile'] for record in records] for stat in stats]
+    }
+    if any('league' in record for record in records):
+        # Percentiles are ranked within (season, league) groups
+        payload['leagues'] = [record.get('league') for record in records]
+    return payload
+
+def encode_players(players):
+    """Columnar form of player_data.json.
+
+    Top-level fields become one array per field. Each stat has a values
+    array and a percentiles array; a null percentile marks a player whose
+    stat was stored as a bare value (missing or non-numeric) rather than
+    {value, percentile}.
+    """
+    fields = [key for key in players[0] if key != 'stats'] if players else []
+    stats = list(dict.fromkeys(key for player in players for key in player['stats']))
+
+    values = []
+    percentiles = []
+    for stat in stats:
+        stat_values = []
+        stat_percentiles = []
+        for player in players:
+            entry = player['stats'].get(stat, 0)
+            if isinstance(entry, dict):
+                stat_values.append(entry['value'])
+                stat_percentiles.append(entry['percentile'])
+            else:
+                stat_values.append(entry)
+                stat_percentiles.append(None)
+        values.append(stat_values)
+        percentiles.append(stat_percentiles)
+
+    return {
+        'format': 'players',
+        'version': COLUMNAR_VERSION,
+        'count': len(players),
+        'fields': fields,
+        'columns': [[player.get(field) for player in players] for field in fields],
+        'stats': stats,
+        'values': values,
+        'percentiles': percentiles
+    }
+
+def decode(payload):
+    """Rebuild the row layout the converters write from a columnar payload"""
+    if payload['format'] == 'team-stats':
+        stats = payload['stats']
+        value_rows = list(zip(*payload['values'])) if stats else [()] * len(payload['teams'])
+        percentile_rows = list(zip(*payload['percentiles'])) if stats else [()] * len(payload['teams'])
+        records = [
+            {
+                'team': team,
+                'season': season,
+                'stats': {
+                    stat: {'value': value, 'percentile': percentile}
+                    for stat, value, percentile in zip(stats, value_row, percentile_row)
+                }
+            }
+            for team, season, value_row, percentile_row in zip(payload['teams'], payload['seasons'], value_rows, percentile_rows)
+        ]
+        for record, league in zip(records, payload.get('leagues') or []):
+            if league is not None:
+                record['league'] = league
+        return records
+
+    if payload['format'] == 'players':
+        players = [dict(zip(payload['fields'], row)) for row in zip(*payload['columns'])] if payload['fields'] \
+            else [{} for _ in range(payload['count'])]
+        stats = payload['stats']
+        for player, value_row, percentile_row in zip(players, zip(*payload['values']), zip(*payload['percentiles'])):
+            player['stats'] = {
+                stat: value if percentile is None else {'value': value, 'percentile': percentile}
+                for stat, value, percentile in zip(stats, value_row, percentile_row)
+            }
+        return players
+
+    raise ValueError(f"Unknown columnar format: {payload.get('format')}")
+
+def write_columnar(payload, output_file_path):
+    with open(output_file_path, 'w', encoding='utf-8') as f:
+        json.dump(payload, f, ensure_ascii=False, separators=(',', ':'))
+
+def _best_parse_seconds(text, repeat, transform=None):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        data = json.loads(text)
+        if transform:
+            transform(data)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def format_report(rows, columnar, repeat=5):
+    """Size and parse-time comparison of the current row layout against the columnar payload"""
+    layouts = {
+        'rows (indent=2)': json.dumps(rows, indent=2, ensure_ascii=False),
+        'rows (minified)': json.dumps(rows, ensure_ascii=False, separators=(',', ':')),
+        'columnar': json.dumps(columnar, ensure_ascii=False, separators=(',', ':'))
+    }
+    baseline = len(layouts['rows (indent=2)'].encode('utf-8'))
+
+    lines = [f"{'layout':<24} {'bytes':>11} {'gzip':>10} {'ratio':>7} {'parse ms':>9}"]
+    for name, text in layouts.items():
+        body = text.encode('utf-8')
+        gzipped = len(gzip.compress(body, mtime=0))
+        parse_ms = _best_parse_seconds(text, repeat) * 1000
+        lines.append(f"{name:<24} {len(body):>11} {gzipped:>10} {baseline / len(body):>6.1f}x {parse_ms:>9.1f}")
+
+    decode_ms = _best_parse_seconds(layouts['columnar'], repeat, decode) * 1000
+    lines.append(f"{'columnar + decode()':<24} {'':>11} {'':>10} {'':>7} {decode_ms:>9.1f}")
+    return "\n".join(lines)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Convert oppo_data.json or player_data.json to or from the columnar layout")
+    parser.add_argument("input_file")
+    parser.add_argument("output_file")
+    parser.add_argument("--decode", action="store_true", help="input is columnar; write the row layout")
+    args = parser.parse_args()
+
+    with open(args.input_file, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+
+    if args.decode:
+        with open(args.output_file, 'w', encoding='utf-8') as f:
+            json.dump(decode(data), f, indent=2, ensure_ascii=False)
+    else:
+        is_players = bool(data) and 'name' in data[0]
+        payload = encode_players(data) if is_players else encode_team_stats(data)
+        write_columnar(payload, args.output_file)
+        print(format_report(data, payload))
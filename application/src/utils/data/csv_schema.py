@@ -0,0 +1,297 @@
+import argparse
+import json
+import numpy as np
+import pandas as pd
+
+# Column types. Each converts a whole column at once:
+#   number   float, whole values as int; empty -> 0, unparseable -> 0 (match stats)
+#   float    float; empty -> 0, unparseable -> kept as the raw string (player stats)
+#   integer  int, or float when the cell contains '.'; empty -> 0, unparseable -> raw string
+#   text     the raw string; empty -> 0
+#   raw      the raw string, untouched
+COLUMN_TYPES = ('number', 'float', 'integer', 'text', 'raw')
+
+class ParseReport:
+    """Per-column counts of empty cells replaced by 0 and cells that failed to parse"""
+
+    def __init__(self, source=""):
+        self.source = source
+        self.columns = {}
+
+    def add(self, column, column_type, empty, invalid, examples):
+        self.columns[column] = {'type': column_type, 'empty': empty, 'invalid': invalid, 'examples': examples}
+
+    @property
+    def invalid(self):
+        return sum(counts['invalid'] for counts in self.columns.values())
+
+    @property
+    def empty(self):
+        return sum(counts['empty'] for counts in self.columns.values())
+
+    def summary(self, limit=10):
+        lines = [f"{self.source}: {self.empty} empty cells set to 0, {self.invalid} invalid cells"]
+        bad = sorted((c for c in self.columns.items() if c[1]['invalid']), key=lambda c: -c[1]['invalid'])
+        for column, counts in bad[:limit]:
+            lines.append(f"  ⚠️ {column} ({counts['type']}): {counts['invalid']} invalid, e.g. {counts['examples']}")
+        if len(bad) > limit:
+            lines.append(f"  ... and {len(bad) - limit} more columns with invalid cells")
+        return "\n".join(lines)
+
+def _python_float(value):
+    try:
+        return float(value)
+    except ValueError:
+        return None
+
+def _python_integer(value):
+    try:
+        return float(value) if '.' in value else int(value)
+    except ValueError:
+        return None
+
+def _is_empty(value):
+    # None is a missing trailing cell; float() and int() ignore surrounding whitespace
+    return not value or value.isspace()
+
+def _convert_float_column(values, whole_as_int, keep_invalid):
+    # Empty cells parse as 0.0 when whole numbers become int anyway, else as 0 directly
+    empty_value = 0.0 if whole_as_int else 0
+    try:
+        # Fast path: one comprehension when every cell is a number or ''/None
+        parsed = [float(value) if value else empty_value for value in values]
+        empty = values.count('') + values.count(None)
+        invalid_positions = []
+    except (ValueError, TypeError):
+        # Whitespace-only or unparseable cells: check each one
+        empty_flags = [_is_empty(value) for value in values]
+        empty = sum(empty_flags)
+        parsed = [empty_value if is_empty else _python_float(value) for value, is_empty in zip(values, empty_flags)]
+        invalid_positions = [i for i, value in enumerate(parsed) if value is None]
+        for i in invalid_positions:
+            parsed[i] = 0.0
+
+    if whole_as_int:
+        parsed = [int(value) if value.is_integer() else value for value in parsed]
+    for i in invalid_positions:
+        parsed[i] = values[i] if keep_invalid else 0
+    return parsed, empty, invalid_positions
+
+def _convert_integer_column(values):
+    try:
+        return [float(value) if '.' in value else int(value) for value in values], 0, []
+    except (ValueError, TypeError):
+        empty_flags = [_is_empty(value) for value in values]
+        parsed = [0 if is_empty else _python_integer(value) for value, is_empty in zip(values, empty_flags)]
+        invalid_positions = [i for i, value in enumerate(parsed) if value is None]
+        for i in invalid_positions:
+            parsed[i] = values[i]
+        return parsed, sum(empty_flags), invalid_positions
+
+def convert_column(values, column_type):
+    """Convert one column of raw strings. Returns (values, empty_count, invalid_positions)."""
+    if column_type == 'raw':
+        return list(values), 0, []
+    if column_type == 'text':
+        empty_flags = [_is_empty(value) for value in values]
+        return [0 if is_empty else value for value, is_empty in zip(values, empty_flags)], sum(empty_flags), []
+    if column_type == 'number':
+        return _convert_float_column(values, whole_as_int=True, keep_invalid=False)
+    if column_type == 'float':
+        return _convert_float_column(values, whole_as_int=False, keep_invalid=True)
+    if column_type == 'integer':
+        return _convert_integer_column(values)
+    raise ValueError(f"Unknown column type {column_type!r}; expected one of {COLUMN_TYPES}")
+
+def _convert_numeric_array(array, column_type):
+    """Fast path for a column pandas parsed as int64/float64 (NaN marks an empty cell).
+
+    Returns (values, empty_flags) matching convert_column() on the raw strings.
+    """
+    if array.dtype.kind in 'iu':
+        empty = np.zeros(len(array), dtype=bool)
+        return (array.tolist() if column_type == 'number' else array.astype(np.float64).tolist()), empty
+
+    empty = np.isnan(array)
+    if column_type == 'float':
+        values = array.tolist()
+        if empty.any():
+            values = [0 if is_empty else value for value, is_empty in zip(values, empty.tolist())]
+        return values, empty
+
+    filled = np.where(empty, 0.0, array)
+    whole = np.isfinite(filled) & (filled == np.floor(filled))
+    fits = whole & (np.abs(filled) < 2 ** 63)
+    if fits.all():
+        return filled.astype(np.int64).tolist(), empty
+    # Object arrays hold Python floats and ints, so tolist() keeps the mixed types
+    values = filled.astype(object)
+    values[fits] = filled[fits].astype(np.int64).astype(object)
+    for i in np.flatnonzero(whole & ~fits):
+        values[i] = int(filled[i])
+    return values.tolist(), empty
+
+def convert_cell(value, column_type):
+    """Single-cell form of convert_column(), for row-at-a-time streaming"""
+    if column_type == 'raw':
+        return value
+    if _is_empty(value):
+        return 0
+    if column_type == 'text':
+        return value
+    if column_type == 'integer':
+        parsed = _python_integer(value)
+        return value if parsed is None else parsed
+
+    parsed = _python_float(value)
+    if parsed is None:
+        return value if column_type == 'float' else 0
+    if column_type == 'number' and parsed.is_integer():
+        return int(parsed)
+    return parsed
+
+def infer_type(values):
+    """'float' if every non-empty cell parses as a number, else 'text'"""
+    return 'float' if not _convert_float_column(values, whole_as_int=False, keep_invalid=False)[2] else 'text'
+
+class Schema:
+    """Column name -> type, with a default for undeclared columns.
+
+    default=None infers each undeclared column's type once per file from its
+    values (see infer_type()).
+    """
+
+    def __init__(self, columns=None, default=None):
+        self.columns = dict(columns or {})
+        self.default = default
+        for column_type in list(self.columns.values()) + ([default] if default else []):
+            if column_type not in COLUMN_TYPES:
+                raise ValueError(f"Unknown column type {column_type!r}; expected one of {COLUMN_TYPES}")
+
+    @classmethod
+    def load(cls, path):
+        """Read a declared schema: {"columns": {"Goals": "number", ...}, "default": "float"}"""
+        with open(path, 'r', encoding='utf-8') as f:
+            spec = json.load(f)
+        return cls(spec.get('columns'), spec.get('default'))
+
+    def extend(self, other):
+        """New schema with `other`'s declared columns (and default, if set) taking precedence"""
+        return Schema({**self.columns, **other.columns}, other.default or self.default)
+
+    def column_type(self, name, values=None):
+        if name in self.columns:
+            return self.columns[name]
+        if self.default:
+            return self.default
+        return infer_type(values or [])
+
+    def cell_converters(self, header):
+        """[(index, name, convert)] for row-at-a-time parsing, types fixed from the header.
+
+        Undeclared columns use the default, or 'float' when inferring (a
+        streaming parse cannot see the column's values in advance).
+        """
+        converters = []
+        for index, name in enumerate(header):
+            column_type = self.columns.get(name, self.default or 'float')
+            converters.append((index, name, lambda value, t=column_type: convert_cell(value, t)))
+        return converters
+
+class Table:
+    """A CSV file parsed column by column: converted values, empty-cell flags and a ParseReport.
+
+    `raw` holds every column's original strings when read with keep_raw=True.
+    """
+
+    def __init__(self, header, parsed, empty, types, report, raw=None):
+        self.header = header
+        self.parsed = parsed
+        self.empty = empty
+        self.types = types
+        self.report = report
+        self.raw = raw
+        self.length = len(parsed[header[0]]) if header else 0
+
+    def __len__(self):
+        return self.length
+
+    def raw_rows(self):
+        """Rows of original strings (needs keep_raw=True); missing trailing cells are ''"""
+        columns = [self.raw[name] for name in self.header]
+        return [dict(zip(self.header, row)) for row in zip(*columns)]
+
+    def parsed_rows(self, names=None):
+        """Rows of converted values, limited to `names` (in that order) if given"""
+        names = self.header if names is None else names
+        columns = [self.parsed[name] for name in names]
+        return [dict(zip(names, row)) for row in zip(*columns)]
+
+def _strings(series):
+    # Missing cells come back from pandas as NaN
+    return [value if isinstance(value, str) else '' if value != value else str(value) for value in series.tolist()]
+
+def _read_frame(csv_file_path, **options):
+    try:
+        return pd.read_csv(csv_file_path, encoding='utf-8', index_col=False, keep_default_na=False, **options)
+    except pd.errors.EmptyDataError:
+        return pd.DataFrame()
+
+def read_table(csv_file_path, schema, keep_raw=False):
+    """Read a CSV and convert each column at once with the schema's column types.
+
+    pandas' C parser reads numeric columns straight into arrays (round_trip
+    precision, so values equal Python's float()). Columns it cannot parse as
+    numbers, or declared as text, are converted cell by cell with the same
+    rules, and their invalid cells are counted in the report.
+    """
+    string_columns = {name: str for name, column_type in schema.columns.items() if column_type in ('raw', 'text', 'integer')}
+    frame = _read_frame(csv_file_path, na_values=[''], float_precision='round_trip', dtype=string_columns)
+    header = [str(name) for name in frame.columns]
+
+    report = ParseReport(csv_file_path)
+    parsed, empty, types = {}, {}, {}
+    for name, (_, series) in zip(header, frame.items()):
+        numeric = series.dtype.kind in 'iuf'
+        if numeric and name not in schema.columns and not schema.default:
+            column_type = 'float'
+        else:
+            column_type = schema.column_type(name, None if numeric else _strings(series))
+
+        if numeric and column_type in ('number', 'float'):
+            converted, empty_flags = _convert_numeric_array(series.to_numpy(), column_type)
+            empty_count, invalid = int(empty_flags.sum()), []
+            empty_flags = empty_flags.tolist()
+        else:
+            values = _strings(series)
+            converted, empty_count, invalid = convert_column(values, column_type)
+            empty_flags = [_is_empty(value) for value in values]
+
+        parsed[name] = converted
+        empty[name] = empty_flags
+        types[name] = column_type
+        if column_type != 'raw':
+            report.add(name, column_type, empty_count, len(invalid), [values[i] for i in invalid[:3]])
+
+    raw = None
+    if keep_raw:
+        raw_frame = _read_frame(csv_file_path, dtype=str, na_filter=False)
+        raw = {name: _strings(series) for name, (_, series) in zip(header, raw_frame.items())}
+    return Table(header, parsed, empty, types, report, raw)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Show inferred column types and data problems in a CSV")
+    parser.add_argument("csv_file")
+    parser.add_argument("--schema", help="declared schema JSON; undeclared columns are inferred")
+    parser.add_argument("--write-schema", help="save the resulting column types as a schema JSON")
+    args = parser.parse_args()
+
+    schema = Schema.load(args.schema) if args.schema else Schema()
+    table = read_table(args.csv_file, schema)
+    print(f"{len(table)} rows, {len(table.header)} columns")
+    print(table.report.summary(limit=50))
+
+    if args.write_schema:
+        with open(args.write_schema, 'w', encoding='utf-8') as f:
+            json.dump({'columns': table.types}, f, indent=2, ensure_ascii=False)
+        print(f"💾 Wrote schema to {args.write_schema}")
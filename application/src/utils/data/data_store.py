@@ -0,0 +1,331 @@
+import argparse
+import json
+import os
+import re
+import sqlite3
+
+from player_csv_converter import primary_position
+
+DATA_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_DB_PATH = os.path.join(DATA_DIR, "scouting.db")
+
+# Bump when the schema changes; older databases are rebuilt from the converters
+SCHEMA_VERSION = 2
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS matches (
+    source TEXT NOT NULL,
+    season TEXT NOT NULL,
+    match_id INTEGER NOT NULL,
+    match TEXT NOT NULL,
+    home TEXT,
+    date TEXT,
+    team TEXT NOT NULL,
+    stats TEXT NOT NULL,
+    PRIMARY KEY (source, match_id, team)
+);
+CREATE INDEX IF NOT EXISTS idx_matches_team ON matches (team, season);
+CREATE INDEX IF NOT EXISTS idx_matches_season ON matches (season, match_id);
+
+CREATE TABLE IF NOT EXISTS team_seasons (
+    source TEXT NOT NULL,
+    team TEXT NOT NULL,
+    season TEXT NOT NULL,
+    league TEXT NOT NULL,
+    stats TEXT NOT NULL,
+    PRIMARY KEY (source, team, season, league)
+);
+CREATE INDEX IF NOT EXISTS idx_team_seasons_team ON team_seasons (team, season);
+CREATE INDEX IF NOT EXISTS idx_team_seasons_season ON team_seasons (season, league);
+
+CREATE TABLE IF NOT EXISTS players (
+    source TEXT NOT NULL,
+    row_number INTEGER NOT NULL,
+    name TEXT,
+    team TEXT,
+    season TEXT,
+    position TEXT,
+    primary_position TEXT,
+    league TEXT,
+    data TEXT NOT NULL,
+    PRIMARY KEY (source, row_number)
+);
+CREATE INDEX IF NOT EXISTS idx_players_team ON players (team, season);
+CREATE INDEX IF NOT EXISTS idx_players_position ON players (primary_position, league, season);
+CREATE INDEX IF NOT EXISTS idx_players_season ON players (season, league);
+
+CREATE TABLE IF NOT EXISTS lineups (
+    league TEXT NOT NULL,
+    season TEXT NOT NULL,
+    team_id INTEGER NOT NULL,
+    team_name TEXT NOT NULL,
+    team_slug TEXT,
+    league_position INTEGER,
+    slot INTEGER NOT NULL,
+    event_id INTEGER,
+    home_team TEXT,
+    away_team TEXT,
+    start_timestamp INTEGER,
+    event TEXT,
+    PRIMARY KEY (league, season, team_id, slot)
+);
+CREATE INDEX IF NOT EXISTS idx_lineups_team ON lineups (team_name, season);
+CREATE INDEX IF NOT EXISTS idx_lineups_event ON lineups (event_id);
+"""
+
+def slugify(value):
+    return re.sub(r"[^a-z0-9]+", "-", str(value).lower()).strip("-")
+
+class DataStore:
+    """SQLite store shared by the CSV converters and the lineup grabber.
+
+    Each writer replaces everything it previously wrote for the same source
+    (a CSV file, or a league and season for lineups) in one transaction, so
+    reruns are idempotent. Rows keep the converters' JSON shape in a `stats`,
+    `data` or `event` column, with the fields used for lookups pulled out
+    into indexed columns.
+    """
+
+    def __init__(self, path=DEFAULT_DB_PATH):
+        self.path = path
+        # Several pipeline workers may write at once; wait for the lock instead of failing
+        self.connection = sqlite3.connect(path, timeout=60)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self._create_schema()
+
+    def _create_schema(self):
+        version = self.connection.execute("PRAGMA user_version").fetchone()[0]
+        with self.connection:
+            if version not in (0, SCHEMA_VERSION):
+                for table in ("matches", "team_seasons", "players", "lineups"):
+                    self.connection.execute(f"DROP TABLE IF EXISTS {table}")
+            self.connection.executescript(SCHEMA)
+            self.connection.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+    def close(self):
+        self.connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    # Writers
+
+    def write_matches(self, source, matches, season=""):
+        """Store match_csv_converter output: one row per match and team"""
+        rows = [
+            (source, season, match['matchId'], match['match'], match.get('home'), match.get('date'),
+             team_name, json.dumps(team_data['stats'], ensure_ascii=False))
+            for match in matches
+            for team_name, team_data in match['teams'].items()
+        ]
+        with self.connection:
+            self.connection.execute("DELETE FROM matches WHERE source = ?", (source,))
+            self.connection.executemany("INSERT INTO matches VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows)
+        return len(rows)
+
+    def write_team_seasons(self, source, records):
+        """Store oppo_csv_converter output: one row per team, season and league"""
+        rows = [
+            (source, record['team'], str(record['season']), str(record.get('league', '')),
+             json.dumps(record['stats'], ensure_ascii=False))
+            for record in records
+        ]
+        with self.connection:
+            self.connection.execute("DELETE FROM team_seasons WHERE source = ?", (source,))
+            self.connection.executemany("INSERT OR REPLACE INTO team_seasons VALUES (?, ?, ?, ?, ?)", rows)
+        return len(rows)
+
+    def write_players(self, source, players):
+        """Store player_csv_converter output, keeping CSV row order"""
+        rows = (
+            (source, row_number, str(player.get('name', '')), str(player.get('team', '')), str(player.get('season', '')),
+             str(player.get('position', '')), primary_position(player.get('position', '')), str(player.get('league', '')),
+             json.dumps(player, ensure_ascii=False))
+            for row_number, player in enumerate(players)
+        )
+        with self.connection:
+            self.connection.execute("DELETE FROM players WHERE source = ?", (source,))
+            count = self.connection.executemany("INSERT INTO players VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", rows).rowcount
+        return count
+
+    def write_lineups(self, final_data):
+        """Store a lineup_grabber/lineup_crawler result, replacing its league and season"""
+        league = final_data['league']
+        season = str(final_data['season'])
+        rows = []
+        for team in final_data['teams']:
+            matches = team['last_5_matches'] or [None]
+            for slot, event in enumerate(matches):
+                rows.append((
+                    league, season, team['team_id'], team['team_name'], team.get('team_slug'), team.get('league_position'),
+                    slot,
+                    event['id'] if event else None,
+                    event['homeTeam'] if event else None,
+                    event['awayTeam'] if event else None,
+                    event['startTimestamp'] if event else None,
+                    json.dumps(event, ensure_ascii=False) if event else None
+                ))
+        with self.connection:
+            self.connection.execute("DELETE FROM lineups WHERE league = ? AND season = ?", (league, season))
+            self.connection.executemany("INSERT INTO lineups VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+        return len(rows)
+
+    # Queries
+
+    def _select(self, sql, filters, order_by):
+        clauses = [f"{column} = ?" for column, value in filters if value is not None]
+        params = [value for _, value in filters if value is not None]
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        return self.connection.execute(f"{sql} ORDER BY {order_by}", params)
+
+    def matches(self, team=None, season=None, match_id=None, source=None):
+        """Matches in match_data.json shape, plus the 'source' each was stored from.
+        Filtering by team returns whole matches (both sides) that team played in."""
+        if team is not None:
+            keys = self._select("SELECT DISTINCT source, match_id FROM matches",
+                                [("team", team), ("season", season), ("match_id", match_id), ("source", source)],
+                                "source, match_id").fetchall()
+            rows = []
+            for key_source, key_match_id in keys:
+                rows += self._select("SELECT source, match_id, match, home, date, team, stats FROM matches",
+                                     [("source", key_source), ("match_id", key_match_id)], "rowid").fetchall()
+        else:
+            rows = self._select("SELECT source, match_id, match, home, date, team, stats FROM matches",
+                                [("season", season), ("match_id", match_id), ("source", source)],
+                                "source, match_id, rowid").fetchall()
+
+        matches = {}
+        # Match ids are only unique within one source (CSV), so key on both
+        for row_source, row_match_id, match_name, home, date, team_name, stats in rows:
+            match = matches.setdefault((row_source, row_match_id), {
+                'matchId': row_match_id, 'match': match_name, 'home': home, 'date': date, 'source': row_source, 'teams': {}
+            })
+            match['teams'][team_name] = {'name': team_name, 'stats': json.loads(stats)}
+        return list(matches.values())
+
+    def team_seasons(self, team=None, season=None, league=None, source=None):
+        """Team-season stats in oppo_data.json shape, with 'league' on records that have one"""
+        rows = self._select("SELECT team, season, league, stats FROM team_seasons",
+                            [("team", team), ("season", season), ("league", league), ("source", source)],
+                            "source, rowid")
+        records = []
+        for name, row_season, row_league, stats in rows:
+            record = {'team': name, 'season': row_season, 'stats': json.loads(stats)}
+            if row_league:
+                record['league'] = row_league
+            records.append(record)
+        return records
+
+    def players(self, team=None, season=None, position=None, league=None, source=None):
+        """Players in player_data.json shape; `position` matches the primary position"""
+        rows = self._select("SELECT data FROM players",
+                            [("team", team), ("season", season), ("primary_position", position),
+                             ("league", league), ("source", source)], "source, row_number")
+        return [json.loads(data) for data, in rows]
+
+    def lineups(self, team=None, season=None, league=None):
+        """Teams with their collected matches, in lineup_data.json team shape.
+        A team crawled for several leagues or seasons gets one entry per league and season."""
+        rows = self._select(
+            "SELECT league, season, team_id, team_name, team_slug, league_position, event FROM lineups",
+            [("team_name", team), ("season", season), ("league", league)],
+            "league, season, league_position, team_id, slot"
+        )
+        teams = {}
+        for row_league, row_season, team_id, team_name, team_slug, league_position, event in rows:
+            team_data = teams.setdefault((row_league, row_season, team_id), {
+                "team_name": team_name,
+                "team_slug": team_slug,
+                "team_id": team_id,
+                "league_position": league_position,
+                "last_5_matches": []
+            })
+            if event:
+                team_data["last_5_matches"].append(json.loads(event))
+        return list(teams.values())
+
+    def lineup_sets(self):
+        """(league, season) pairs with stored lineups"""
+        return self.connection.execute("SELECT DISTINCT league, season FROM lineups ORDER BY league, season").fetchall()
+
+    # Export
+
+    def export_json(self, kind, output_path, **filters):
+        """Write one query result as a JSON slice, e.g. export_json("players", path, position="CF")"""
+        queries = {
+            "matches": self.matches,
+            "team_seasons": self.team_seasons,
+            "players": self.players,
+            "lineups": self.lineups
+        }
+        data = queries[kind](**filters)
+        if kind == "lineups":
+            data = {"league": filters.get("league"), "season": filters.get("season"), "total_teams": len(data), "teams": data}
+
+        os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
+        with open(output_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, separators=(',', ':'))
+        return data
+
+    def export_team_lineups(self, output_dir):
+        """One lineups/<team_slug>.json per team, so a team page loads only its own matches"""
+        written = []
+        for league, season in self.lineup_sets():
+            for team in self.lineups(league=league, season=season):
+                path = os.path.join(output_dir, "lineups", f"{team['team_slug'] or slugify(team['team_name'])}.json")
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                with open(path, 'w', encoding='utf-8') as f:
+                    json.dump({"league": league, "season": season, **team}, f, ensure_ascii=False, separators=(',', ':'))
+                written.append(path)
+        return written
+
+def store_source(csv_file_path, root=DATA_DIR):
+    """Stable source key for a converter input: its path relative to root where possible"""
+    path = os.path.abspath(csv_file_path)
+    try:
+        relative = os.path.relpath(path, root)
+    except ValueError:
+        return path
+    return path if relative.startswith('..') else relative
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Query the scouting SQLite store or export JSON slices from it")
+    parser.add_argument("kind", choices=["matches", "team_seasons", "players", "lineups", "team-lineups"])
+    parser.add_argument("--db", default=DEFAULT_DB_PATH, help="SQLite database written by the converters")
+    parser.add_argument("--team")
+    parser.add_argument("--season")
+    parser.add_argument("--position", help="primary position, for players")
+    parser.add_argument("--league", help="for team_seasons, players and lineups")
+    parser.add_argument("--match-id", type=int, help="for matches")
+    parser.add_argument("--out", help="write the result as a JSON slice here (a directory for team-lineups)")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.db):
+        parser.error(f"{args.db} does not exist; run a converter with --db first")
+
+    with DataStore(args.db) as store:
+        if args.kind == "team-lineups":
+            written = store.export_team_lineups(args.out or DATA_DIR)
+            print(f"💾 Wrote {len(written)} team lineup files")
+            raise SystemExit(0)
+
+        filters = {"team": args.team, "season": args.season}
+        if args.kind == "players":
+            filters.update(position=args.position, league=args.league)
+        elif args.kind in ("team_seasons", "lineups"):
+            filters["league"] = args.league
+        elif args.kind == "matches":
+            filters["match_id"] = args.match_id
+
+        if args.out:
+            data = store.export_json(args.kind, args.out, **filters)
+            count = data["total_teams"] if args.kind == "lineups" else len(data)
+            print(f"💾 Wrote {count} {args.kind} to {args.out}")
+        else:
+            method = getattr(store, args.kind)
+            print(json.dumps(method(**filters), indent=2, ensure_ascii=False))
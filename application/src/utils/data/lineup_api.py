@@ -0,0 +1,160 @@
+from urllib.parse import urlparse
+import gzip
+import http.client
+import json
+import os
+import queue
+import threading
+import time
+
+from lineup_metrics import span
+
+API_BASE = "https://www.sofascore.com/api/v1"
+TOURNAMENT_ID = 174
+
+DEFAULT_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124.0 Safari/537.36",
+    "Accept": "application/json",
+    "Accept-Encoding": "gzip",
+    "Connection": "keep-alive"
+}
+
+class TokenBucket:
+    """Thread-safe token bucket: `rate` requests per second with bursts up to `capacity`.
+
+    Share one bucket between every client and worker to enforce a single
+    global request rate.
+    """
+
+    def __init__(self, rate, capacity=None):
+        self.rate = rate
+        self.capacity = capacity or max(1, rate)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Block until a token is available, then take it"""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+class SofascoreClient:
+    """Keep-alive JSON client for the SofaScore endpoints the scraper needs.
+
+    Holds up to `pool_size` persistent connections to the API host, so it can be
+    shared across worker threads. Set `api_base` to a local stub server (see
+    lineup_stub_server.py) to run against recorded fixtures, and `record_dir` to
+    save every response in the layout that server expects. Pass a TokenBucket
+    as `rate_limiter` to cap the request rate, retries included.
+    """
+
+    def __init__(self, api_base=API_BASE, pool_size=4, timeout=15, max_attempts=3, backoff_base=0.5, record_dir=None,
+                 rate_limiter=None):
+        parsed = urlparse(api_base)
+        self.scheme = parsed.scheme
+        self.host = parsed.netloc
+        self.base_path = parsed.path.rstrip("/")
+        self.timeout = timeout
+        self.max_attempts = max_attempts
+        self.backoff_base = backoff_base
+        self.record_dir = record_dir
+        self.rate_limiter = rate_limiter
+        self._connections = queue.LifoQueue()
+        for _ in range(pool_size):
+            self._connections.put(None)
+
+    def _new_connection(self):
+        if self.scheme == "https":
+            return http.client.HTTPSConnection(self.host, timeout=self.timeout)
+        return http.client.HTTPConnection(self.host, timeout=self.timeout)
+
+    def _request(self, path):
+        # Slots start empty and are filled lazily; a broken connection is dropped
+        connection = self._connections.get() or self._new_connection()
+        try:
+            connection.request("GET", path, headers=DEFAULT_HEADERS)
+            response = connection.getresponse()
+            body = response.read()
+            if response.getheader("Content-Encoding") == "gzip":
+                body = gzip.decompress(body)
+            self._connections.put(connection)
+            return response.status, body
+        except Exception:
+            connection.close()
+            self._connections.put(None)
+            raise
+
+    def get_json(self, endpoint_path, not_found=None):
+        """GET `endpoint_path` (relative to the API base) and return the decoded body.
+
+        404 means the resource does not exist (e.g. no average positions for an
+        event) and returns `not_found` straight away; other failures retry with
+        backoff and then return None.
+        """
+        path = f"{self.base_path}/{endpoint_path.lstrip('/')}"
+        for attempt in range(1, self.max_attempts + 1):
+            if self.rate_limiter is not None:
+                with span("rate_limit_wait", path):
+                    self.rate_limiter.acquire()
+            try:
+                with span("http_get", path, attempt=attempt) as request_span:
+                    status, body = self._request(path)
+                    request_span.set(status=status, bytes=len(body))
+                if status == 404:
+                    return not_found
+                if status == 200:
+                    with span("json_decode", path):
+                        data = json.loads(body)
+                    if self.record_dir:
+                        self._record(path, body)
+                    return data
+                print(f"⚠️ HTTP {status} for {path} on attempt {attempt}/{self.max_attempts}")
+            except Exception as e:
+                print(f"⚠️ Error fetching {path} on attempt {attempt}/{self.max_attempts}: {e}")
+
+            if attempt < self.max_attempts:
+                with span("backoff", path, attempt=attempt):
+                    time.sleep(self.backoff_base * 2 ** (attempt - 1))
+        return None
+
+    def _record(self, path, body):
+        fixture_path = os.path.join(self.record_dir, path.lstrip("/") + ".json")
+        os.makedirs(os.path.dirname(fixture_path), exist_ok=True)
+        with open(fixture_path, "wb") as f:
+            f.write(body)
+
+    def close(self):
+        while not self._connections.empty():
+            connection = self._connections.get_nowait()
+            if connection is not None:
+                connection.close()
+
+    def seasons(self, tournament_id=TOURNAMENT_ID):
+        """Seasons of a tournament, most recent first: [{"id", "name", "year"}, ...]"""
+        data = self.get_json(f"unique-tournament/{tournament_id}/seasons")
+        return (data or {}).get("seasons", [])
+
+    def current_season_id(self, tournament_id=TOURNAMENT_ID):
+        seasons = self.seasons(tournament_id)
+        return seasons[0]["id"] if seasons else None
+
+    def standings(self, season_id, tournament_id=TOURNAMENT_ID):
+        return self.get_json(f"unique-tournament/{tournament_id}/season/{season_id}/standings/total")
+
+    def season_events(self, season_id, page=0, tournament_id=TOURNAMENT_ID):
+        """One page of the season's finished events, most recent first: {"events", "hasNextPage"}"""
+        return self.get_json(f"unique-tournament/{tournament_id}/season/{season_id}/events/last/{page}")
+
+    def team_performance(self, team_id):
+        return self.get_json(f"team/{team_id}/performance")
+
+    def average_positions(self, event_id, not_found=None):
+        return self.get_json(f"event/{event_id}/average-positions", not_found)
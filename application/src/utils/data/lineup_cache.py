@@ -0,0 +1,120 @@
+import hashlib
+import json
+import os
+import threading
+import time
+
+from lineup_metrics import annotate
+
+DEFAULT_CACHE_DIR = ".lineup_cache"
+
+# Seconds each endpoint class stays fresh. None means the entry never expires:
+# average-positions are only requested for finished events, which never change.
+ENDPOINT_TTLS = {
+    "standings": 6 * 60 * 60,
+    "performance": 12 * 60 * 60,
+    "season-events": 12 * 60 * 60,
+    "average-positions": None
+}
+
+class ResponseCache:
+    """On-disk JSON response cache keyed by sha256("<endpoint>:<key>").
+
+    Entries live at <cache_dir>/<hash[:2]>/<hash>.json and record when they
+    were fetched, so expiry is decided at read time from ENDPOINT_TTLS. The
+    hash is of the request, not the response body. One instance is safe to
+    share between threads.
+    """
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, ttls=None):
+        self.cache_dir = cache_dir
+        self.ttls = dict(ENDPOINT_TTLS, **(ttls or {}))
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def _count(self, hit):
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def _path(self, endpoint, key):
+        digest = hashlib.sha256(f"{endpoint}:{key}".encode("utf-8")).hexdigest()
+        return os.path.join(self.cache_dir, digest[:2], f"{digest}.json")
+
+    def get(self, endpoint, key):
+        """Return the cached response body, or None if missing or expired."""
+        path = self._path(endpoint, key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            self._count(hit=False)
+            return None
+
+        ttl = self.ttls.get(endpoint)
+        if ttl is not None and time.time() - entry["fetched_at"] > ttl:
+            self._count(hit=False)
+            return None
+
+        self._count(hit=True)
+        return entry["data"]
+
+    def put(self, endpoint, key, data):
+        path = self._path(endpoint, key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        # Write then rename so an interrupted run never leaves a truncated entry
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"endpoint": endpoint, "key": str(key), "fetched_at": time.time(), "data": data}, f)
+        os.replace(tmp_path, path)
+
+    def fetch(self, endpoint, key, fetch_fn):
+        """Return the cached body for (endpoint, key), calling fetch_fn() on a miss.
+
+        fetch_fn returns the decoded JSON body or None; None results are not cached.
+        """
+        data = self.get(endpoint, key)
+        if data is not None:
+            print(f"💾 Cache hit: {endpoint} {key}")
+            annotate("cache_hit")
+            return data
+
+        data = fetch_fn()
+        if data is not None:
+            self.put(endpoint, key, data)
+        return data
+
+    async def fetch_async(self, endpoint, key, fetch_fn):
+        """Async counterpart of fetch() for coroutine fetch functions."""
+        data = self.get(endpoint, key)
+        if data is not None:
+            print(f"💾 Cache hit: {endpoint} {key}")
+            annotate("cache_hit")
+            return data
+
+        data = await fetch_fn()
+        if data is not None:
+            self.put(endpoint, key, data)
+        return data
+
+def load_known_events(output_path):
+    """Map event id -> processed players from an existing lineup file.
+
+    Events whose lineups failed to capture are left out so they get retried.
+    """
+    try:
+        with open(output_path, "r") as f:
+            existing = json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+    known = {}
+    for team in existing.get("teams", []):
+        for event in team.get("last_5_matches", []):
+            if event.get("players"):
+                known[event["id"]] = event["players"]
+    return known
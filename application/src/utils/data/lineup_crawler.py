@@ -0,0 +1,445 @@
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from lineup_grabber import (
+    LEAGUE_NAME, MATCHES_PER_TEAM, extract_teams, filter_league_events,
+    process_average_positions, build_final_data, save_lineup_data, save_lineups_to_store
+)
+from lineup_api import SofascoreClient, TokenBucket, API_BASE, TOURNAMENT_ID
+from lineup_cache import ResponseCache, DEFAULT_CACHE_DIR, ENDPOINT_TTLS
+from lineup_metrics import MetricsRecorder, set_recorder, span, DEFAULT_METRICS_FILE
+import argparse
+import json
+import os
+import re
+import threading
+import time
+
+DEFAULT_JOURNAL_FILE = "crawl_journal.jsonl"
+DEFAULT_WORKERS = 8
+DEFAULT_RATE = 4.0  # requests per second across every target
+DEFAULT_BURST = 8
+# Safety cap on pages of season events read for a past-season target
+MAX_SEASON_EVENT_PAGES = 50
+# A current season's journaled standings (and the teams crawled from them) are
+# only resumed while they are this fresh; past seasons never change
+CURRENT_STANDINGS_TTL = ENDPOINT_TTLS["standings"]
+# Returned by the client when an event has no average positions (HTTP 404)
+NO_LINEUPS = object()
+
+DEFAULT_TARGETS = [
+    {"tournament_id": TOURNAMENT_ID, "league": LEAGUE_NAME, "season": None, "depth": MATCHES_PER_TEAM}
+]
+
+def parse_target(spec):
+    """Parse a CLI target "tournament_id:league[:season[:depth]]", e.g. "174:National League South:24/25:5".
+
+    An empty or missing season means the tournament's current season.
+    """
+    parts = spec.split(":")
+    if len(parts) < 2:
+        raise ValueError(f"Target '{spec}' must be tournament_id:league[:season[:depth]]")
+    return normalise_target({
+        "tournament_id": parts[0],
+        "league": parts[1],
+        "season": parts[2] if len(parts) > 2 else None,
+        "depth": parts[3] if len(parts) > 3 else MATCHES_PER_TEAM
+    })
+
+def normalise_target(target):
+    return {
+        "tournament_id": int(target["tournament_id"]),
+        "league": target["league"],
+        "season": target.get("season") or None,
+        "depth": int(target.get("depth") or MATCHES_PER_TEAM)
+    }
+
+def load_targets(path):
+    """Read a JSON list of {"tournament_id", "league", "season", "depth"} targets"""
+    with open(path, "r", encoding="utf-8") as f:
+        return [normalise_target(target) for target in json.load(f)]
+
+def target_key(target):
+    """Journal key for a target, stable before its season id is resolved"""
+    return f"{target['tournament_id']}:{target['season'] or 'current'}"
+
+def output_path_for(target, season_year, output_dir="."):
+    slug = re.sub(r"[^a-z0-9]+", "-", target["league"].lower()).strip("-")
+    season_slug = re.sub(r"[^0-9A-Za-z]+", "-", str(season_year)).strip("-")
+    return os.path.join(output_dir, f"lineups_{slug}_{season_slug}.json")
+
+class CheckpointJournal:
+    """Append-only JSONL record of finished crawl steps, replayed to resume after a crash.
+
+    Records standings per target, each finished match (with its lineups, or
+    None when the event has none), each complete team, and each written output
+    file. Every line is flushed and fsynced as it is written, so at most the
+    steps in flight when the process died are repeated. A current-season
+    target older than CURRENT_STANDINGS_TTL is dropped on replay, apart from
+    its matches, so it is looked up again.
+    """
+
+    def __init__(self, path=DEFAULT_JOURNAL_FILE):
+        self.path = path
+        self.standings = {}
+        self.matches = {}
+        self.teams = {}
+        self.outputs = {}
+        self._lock = threading.Lock()
+        self._replay()
+        self._file = open(path, "a", encoding="utf-8")
+
+    def _replay(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                lines = f.readlines()
+        except OSError:
+            return
+
+        for line in lines:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                # A torn final line from a crash mid-write
+                continue
+            key = record["target"]
+            if record["kind"] == "standings":
+                self.standings[key] = record
+            elif record["kind"] == "match":
+                self.matches[(key, record["event"]["id"])] = record["event"]
+            elif record["kind"] == "team":
+                self.teams[(key, record["team"]["team_id"])] = record["team"]
+            elif record["kind"] == "output":
+                self.outputs[key] = record["path"]
+
+        now = time.time()
+        expired = {key for key, record in self.standings.items()
+                   if record.get("current", True) and now - record.get("recorded_at", 0) > CURRENT_STANDINGS_TTL}
+        for key in expired:
+            print(f"⌛ Standings for {key} are out of date; looking them up again")
+            del self.standings[key]
+            self.outputs.pop(key, None)
+        self.teams = {team_key: team for team_key, team in self.teams.items() if team_key[0] not in expired}
+
+        if lines:
+            print(f"♻️ Resuming from {self.path}: {len(self.standings)} targets, "
+                  f"{len(self.teams)} teams, {len(self.matches)} matches already collected")
+
+    def _append(self, record):
+        with self._lock:
+            self._file.write(json.dumps(record) + "\n")
+            self._file.flush()
+            os.fsync(self._file.fileno())
+
+    def record_standings(self, key, season_id, season_year, teams, current=True):
+        record = {"kind": "standings", "target": key, "season_id": season_id, "season": season_year, "teams": teams,
+                  "current": current, "recorded_at": time.time()}
+        self.standings[key] = record
+        self._append(record)
+
+    def record_match(self, key, event):
+        self.matches[(key, event["id"])] = event
+        self._append({"kind": "match", "target": key, "event": event})
+
+    def record_team(self, key, team_data):
+        self.teams[(key, team_data["team_id"])] = team_data
+        self._append({"kind": "team", "target": key, "team": team_data})
+
+    def record_output(self, key, path):
+        self.outputs[key] = path
+        self._append({"kind": "output", "target": key, "path": path})
+
+    def close(self, remove=False):
+        with self._lock:
+            self._file.close()
+        if remove:
+            os.remove(self.path)
+
+def resolve_target(client, target, cache=None):
+    """Look up the target's season and standings.
+
+    Returns (season_id, season_year, teams, current) or None, where current
+    is True for the tournament's latest season.
+    """
+    with span("standings", target["league"], tournament_id=target["tournament_id"]):
+        seasons = client.seasons(target["tournament_id"])
+        if target["season"]:
+            season = next((s for s in seasons if target["season"] in (s.get("year"), s.get("name"), str(s.get("id")))), None)
+        else:
+            season = seasons[0] if seasons else None
+        if season is None:
+            print(f"❌ No season {target['season'] or '(current)'} for tournament {target['tournament_id']}")
+            return None
+
+        standings_key = f"{target['tournament_id']}/{season['id']}"
+        if cache is not None:
+            standings_data = cache.fetch("standings", standings_key, lambda: client.standings(season["id"], target["tournament_id"]))
+        else:
+            standings_data = client.standings(season["id"], target["tournament_id"])
+        if not standings_data:
+            print(f"❌ No standings data for {target['league']} {season.get('year')}")
+            return None
+
+        season_year = season.get("year") or season.get("name") or str(season["id"])
+        return season["id"], season_year, extract_teams(standings_data), season is seasons[0]
+
+class SeasonEvents:
+    """A past season's finished events, fetched once per target and shared by its team crawls.
+
+    A team's performance endpoint only lists its recent events, so past-season
+    targets read the tournament's season event pages instead.
+    """
+
+    def __init__(self, client, cache=None):
+        self.client = client
+        self.cache = cache
+        self._events = {}
+        self._locks = {}
+        self._lock = threading.Lock()
+
+    def _load(self, tournament_id, season_id):
+        events = []
+        for page in range(MAX_SEASON_EVENT_PAGES):
+            fetch = lambda: self.client.season_events(season_id, page, tournament_id)
+            cache_key = f"{tournament_id}/{season_id}/{page}"
+            data = self.cache.fetch("season-events", cache_key, fetch) if self.cache is not None else fetch()
+            if not data:
+                break
+            events.extend(data.get("events", []))
+            if not data.get("hasNextPage"):
+                break
+        return events
+
+    def for_team(self, tournament_id, season_id, team_id):
+        """The team's events in a performance-response shape, for filter_league_events()"""
+        key = (tournament_id, season_id)
+        with self._lock:
+            lock = self._locks.setdefault(key, threading.Lock())
+        with lock:
+            if key not in self._events:
+                with span("season_events", f"{tournament_id}/{season_id}"):
+                    self._events[key] = self._load(tournament_id, season_id)
+        return {"events": [
+            event for event in self._events[key]
+            if team_id in ((event.get("homeTeam") or {}).get("id"), (event.get("awayTeam") or {}).get("id"))
+        ]}
+
+def empty_team_data(team):
+    return {
+        "team_name": team['name'],
+        "team_slug": team['slug'],
+        "team_id": team['id'],
+        "league_position": team['position'],
+        "last_5_matches": []
+    }
+
+def team_complete(team_data, journal, key):
+    """True when every match of the team is finished, so it never needs re-crawling.
+
+    A match is finished once it has lineups or is journaled as having none.
+    """
+    matches = team_data["last_5_matches"]
+    return bool(matches) and all(event.get("players") or (key, event["id"]) in journal.matches for event in matches)
+
+def fetch_average_positions(client, event_id, cache=None):
+    """(raw average positions or None, True when the event has none at all)
+
+    Only a 404 counts as having none; a failed request is retried next run.
+    """
+    not_found = []
+
+    def fetch():
+        data = client.average_positions(event_id, not_found=NO_LINEUPS)
+        if data is NO_LINEUPS:
+            not_found.append(event_id)
+            return None
+        return data
+
+    raw_data = cache.fetch("average-positions", event_id, fetch) if cache is not None else fetch()
+    return raw_data, bool(not_found)
+
+def crawl_team(client, target, team, journal, cache=None, season_events=None):
+    """Collect one team's last `depth` league matches of the target's season, journaling each finished match.
+
+    The current season's matches come from the team's performance endpoint;
+    past seasons read the season's events through `season_events`.
+    """
+    key = target_key(target)
+    standings = journal.standings[key]
+    season_id = standings["season_id"]
+    team_data = empty_team_data(team)
+
+    with span("team", team['name'], team_id=team['id'], league=target["league"]) as team_span:
+        if standings.get("current", True):
+            fetch = lambda: client.team_performance(team['id'])
+            cache_key = f"{team['id']}/{season_id}"
+            performance_data = cache.fetch("performance", cache_key, fetch) if cache is not None else fetch()
+        else:
+            season_events = season_events or SeasonEvents(client, cache)
+            performance_data = season_events.for_team(target["tournament_id"], season_id, team['id'])
+        if not performance_data:
+            team_span.set("no_matches")
+            print(f"❌ No performance data captured for {team['name']}")
+            return team_data
+
+        events = filter_league_events(performance_data, target["league"], target["depth"], season_id)
+        for event in events:
+            with span("match", f"{event['homeTeam']} vs {event['awayTeam']}", event_id=event['id']) as match_span:
+                done = journal.matches.get((key, event['id']))
+                if done is not None:
+                    event["players"] = done["players"]
+                    match_span.set("reused")
+                    continue
+
+                raw_data, no_lineups = fetch_average_positions(client, event['id'], cache)
+                with span("process", event['id']):
+                    event["players"] = process_average_positions(raw_data) if raw_data else None
+                if event["players"]:
+                    journal.record_match(key, event)
+                elif no_lineups:
+                    # Final: the event has no average positions, so stop asking for them
+                    match_span.set("no_lineups")
+                    print(f"⚠️ Match {event['id']} has no average-positions")
+                    journal.record_match(key, event)
+                else:
+                    match_span.set("missing")
+                    print(f"❌ Match {event['id']} failed to capture average-positions")
+
+        team_data["last_5_matches"] = events
+        team_span.set(matches=len(events))
+
+    print(f"✅ {target['league']}: {team['name']} ({len(events)} matches)")
+    return team_data
+
+def crawl(client, targets, journal, cache=None, workers=DEFAULT_WORKERS, output_dir=".", db_path=None):
+    """Crawl every target on one shared worker pool and write one lineup file per target.
+
+    Standings lookups and team crawls from all targets share the pool, so a
+    target's teams start as soon as its standings arrive; the client's rate
+    limiter bounds the combined request rate. Returns {target key: output path}.
+
+    Teams and targets are only journaled once complete; anything with missing
+    lineups, including a team whose crawl raised, is written as-is and crawled
+    again on the next run. Events without average positions (404) count as
+    complete.
+    """
+    outputs = {}
+    state = {}
+    season_events = SeasonEvents(client, cache)
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        pending = {}
+
+        def submit_teams(key, target):
+            record = journal.standings[key]
+            state[key] = {"teams": record["teams"], "collected": {}}
+            for team in record["teams"]:
+                done = journal.teams.get((key, team["id"]))
+                if done is not None:
+                    state[key]["collected"][team["id"]] = done
+                    continue
+                future = executor.submit(crawl_team, client, target, team, journal, cache, season_events)
+                pending[future] = ("team", key, target, team)
+            finish_if_complete(key, target)
+
+        def finish_if_complete(key, target):
+            target_state = state[key]
+            if len(target_state["collected"]) < len(target_state["teams"]):
+                return
+            record = journal.standings[key]
+            teams_data = [target_state["collected"][team["id"]] for team in target_state["teams"]]
+            final_data = build_final_data(target_state["teams"], teams_data, target["league"], record["season"])
+            final_data.update({"tournament_id": target["tournament_id"], "season_id": record["season_id"], "match_depth": target["depth"]})
+            path = output_path_for(target, record["season"], output_dir)
+            save_lineup_data(final_data, path)
+            if db_path:
+                save_lineups_to_store(final_data, db_path)
+            outputs[key] = path
+            # Targets with gaps are written but left open, so a rerun retries the gaps
+            if all(team_complete(team, journal, key) for team in teams_data):
+                journal.record_output(key, path)
+
+        for target in targets:
+            key = target_key(target)
+            if key in journal.outputs and os.path.exists(journal.outputs[key]):
+                print(f"⏭️  {target['league']} {target['season'] or '(current)'} already written to {journal.outputs[key]}")
+                outputs[key] = journal.outputs[key]
+            elif key in journal.standings:
+                submit_teams(key, target)
+            else:
+                pending[executor.submit(resolve_target, client, target, cache)] = ("standings", key, target, None)
+
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                kind, key, target, team = pending.pop(future)
+                try:
+                    result = future.result()
+                except Exception as e:
+                    print(f"❌ Error crawling {target['league']} ({kind}{': ' + team['name'] if team else ''}): {e}")
+                    if kind == "standings":
+                        continue
+                    # Written without matches so the target still gets its file; the team is retried next run
+                    result = empty_team_data(team)
+
+                if kind == "standings":
+                    if result is None:
+                        continue
+                    season_id, season_year, teams, current = result
+                    print(f"Found {len(teams)} teams in {target['league']} {season_year}")
+                    journal.record_standings(key, season_id, season_year, teams, current)
+                    submit_teams(key, target)
+                else:
+                    if team_complete(result, journal, key):
+                        journal.record_team(key, result)
+                    state[key]["collected"][result["team_id"]] = result
+                    finish_if_complete(key, target)
+
+    return outputs
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Collect lineups for several tournaments and seasons under one rate limit")
+    parser.add_argument("--targets", help="JSON file listing {tournament_id, league, season, depth} targets")
+    parser.add_argument("--target", action="append", default=[],
+                        help="tournament_id:league[:season[:depth]], repeatable, e.g. '174:National League South:24/25:5'")
+    parser.add_argument("--output-dir", default=".", help="where the per-target lineup files are written")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS, help="worker threads shared by all targets")
+    parser.add_argument("--rate", type=float, default=DEFAULT_RATE, help="global request rate limit (requests/sec)")
+    parser.add_argument("--burst", type=int, default=DEFAULT_BURST, help="requests allowed in a burst above the rate")
+    parser.add_argument("--journal", default=DEFAULT_JOURNAL_FILE, help="checkpoint journal used to resume after a crash")
+    parser.add_argument("--fresh", action="store_true", help="discard an existing journal and start over")
+    parser.add_argument("--keep-journal", action="store_true", help="keep the journal after every target has been written")
+    parser.add_argument("--cache-dir", default=DEFAULT_CACHE_DIR, help="directory for the on-disk response cache")
+    parser.add_argument("--no-cache", action="store_true", help="always fetch fresh responses")
+    parser.add_argument("--api-base", default=API_BASE, help="API root, e.g. a lineup_stub_server.py address")
+    parser.add_argument("--db", nargs="?", const="scouting.db",
+                        help="also write every target's lineups into this SQLite store (see data_store.py)")
+    parser.add_argument("--metrics-file", default=DEFAULT_METRICS_FILE, help="append per-phase timing spans to this JSONL file")
+    args = parser.parse_args()
+
+    targets = load_targets(args.targets) if args.targets else []
+    targets += [parse_target(spec) for spec in args.target]
+    targets = targets or DEFAULT_TARGETS
+
+    if args.fresh and os.path.exists(args.journal):
+        os.remove(args.journal)
+    os.makedirs(args.output_dir, exist_ok=True)
+
+    recorder = MetricsRecorder(args.metrics_file)
+    set_recorder(recorder)
+    cache = None if args.no_cache else ResponseCache(args.cache_dir)
+    client = SofascoreClient(args.api_base, pool_size=args.workers, rate_limiter=TokenBucket(args.rate, args.burst))
+    journal = CheckpointJournal(args.journal)
+
+    start_time = time.time()
+    outputs = {}
+    try:
+        outputs = crawl(client, targets, journal, cache=cache, workers=args.workers, output_dir=args.output_dir, db_path=args.db)
+    finally:
+        client.close()
+        complete = all(target_key(target) in journal.outputs for target in targets)
+        journal.close(remove=complete and not args.keep_journal)
+        recorder.close()
+
+    print(f"\n🎉 Wrote {len(outputs)}/{len(targets)} targets in {time.time() - start_time:.2f} seconds")
+    if not complete:
+        print(f"⚠️ Some lineups are missing; rerun to resume from {args.journal}")
+    print(recorder.summary())
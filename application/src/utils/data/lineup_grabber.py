@@ -1,279 +1,775 @@
-from playwright.sync_api import sync_playwright
+from urllib.parse import urlparse
+from concurrent.futures import ThreadPoolExecutor
+from lineup_cache import ResponseCache, load_known_events, DEFAULT_CACHE_DIR
+from lineup_api import SofascoreClient, API_BASE, TOURNAMENT_ID
+from lineup_metrics import MetricsRecorder, set_recorder, span, DEFAULT_METRICS_FILE
+from lineup_shapes import add_team_shapes
+import argparse
+import asyncio
 import json
 import re
 import time
 
+LEAGUE_NAME = "National League South"
+SEASON = "2024/25"
+STANDINGS_URL = "https://www.sofascore.com/tournament/football/england-amateur/national-league-south/174"
+MATCHES_PER_TEAM = 5
+OUTPUT_FILE = "processed_lineup_data.json"
+
+# Async collection defaults
+DEFAULT_POOL_SIZE = 4
+DEFAULT_PER_HOST_LIMIT = 4
+
+# How long to wait for each target JSON response before retrying (ms)
+ENDPOINT_DEADLINES_MS = {
+    "standings": 20000,
+    "performance": 15000,
+    "average-positions": 12000
+}
+MAX_ATTEMPTS = 3
+BACKOFF_BASE_SECONDS = 0.5
+
+# Requests that never carry data we use - aborted before they hit the network
+BLOCKED_RESOURCE_TYPES = {"image", "stylesheet", "font", "media"}
+BLOCKED_HOST_FRAGMENTS = (
+    "googletagmanager", "google-analytics", "googlesyndication", "doubleclick",
+    "adservice", "amazon-adsystem", "facebook", "hotjar", "scorecardresearch"
+)
+
 def extract_surname(full_name):
     """Extract surname from full name, handling various delimiters."""
     if not full_name or full_name.strip() == "":
         return ""
-    
+
     name = full_name.strip()
     parts = re.split(r'[\s\-_]+', name)
     parts = [part for part in parts if part.strip()]
-    
+
     if not parts:
         return ""
-    
+
     return parts[-1]
 
-def collect_all_teams_lineups():
+def season_label(year):
+    """SofaScore season year ("24/25") in this file's SEASON format ("2024/25"); other forms pass through"""
+    match = re.fullmatch(r"(\d{2})/(\d{2})", str(year or ""))
+    return f"20{match.group(1)}/{match.group(2)}" if match else year
+
+def extract_teams(standings_data):
+    """Extract team name, slug, id and league position from a standings/total response."""
+    teams = []
+    standings = standings_data.get("standings", [])
+    if standings:
+        rows = standings[0].get("rows", [])
+        for row in rows:
+            team_info = row.get("team", {})
+            teams.append({
+                "name": team_info.get("name"),
+                "slug": team_info.get("slug"),
+                "id": team_info.get("id"),
+                "position": row.get("position")
+            })
+    return teams
+
+def filter_league_events(performance_data, league_name=LEAGUE_NAME, limit=MATCHES_PER_TEAM, season_id=None):
+    """Return the most recent `limit` events from a team's performance response in the given league.
+
+    With a season_id, only events from that season count.
+    """
+    league_events = []
+    for event in performance_data.get("events", []):
+        tournament_name = event.get("tournament", {}).get("name", "")
+        if season_id is not None and (event.get("season") or {}).get("id") != season_id:
+            continue
+        if league_name in tournament_name:
+            league_events.append({
+                "id": event["id"],
+                "slug": event["slug"],
+                "customId": event.get("customId", "uesUid"),
+                "homeTeam": event["homeTeam"]["name"],
+                "awayTeam": event["awayTeam"]["name"],
+                "startTimestamp": event["startTimestamp"]
+            })
+
+    # Sort and take most recent
+    league_events.sort(key=lambda x: x["startTimestamp"], reverse=True)
+    return league_events[:limit]
+
+def process_average_positions(raw_data):
+    """Reduce an average-positions response to the player fields the frontend uses."""
+    processed_players = {"home": [], "away": []}
+
+    # Get substitution player IDs
+    substitution_player_in_ids = set()
+    for sub in raw_data.get("substitutions", []):
+        player_in = sub.get("playerIn", {})
+        if player_in and player_in.get("id"):
+            substitution_player_in_ids.add(player_in["id"])
+
+    # Process home and away players
+    for side in ["home", "away"]:
+        players_list = raw_data.get(side, [])
+
+        for player_data in players_list:
+            player_info = player_data.get("player", {})
+
+            if not player_info or not player_info.get("id"):
+                continue
+
+            player_id = player_info.get("id")
+            full_name = player_info.get("name", "")
+            surname = extract_surname(full_name)
+            jersey_number = player_info.get("jerseyNumber", "/")
+            average_x = player_data.get("averageX")
+            average_y = player_data.get("averageY")
+            started = player_id not in substitution_player_in_ids
+
+            processed_player = {
+                "surname": surname,
+                "full_name": full_name,
+                "id": player_id,
+                "jersey_number": jersey_number,
+                "position": player_info.get("position", ""),
+                "averageX": average_x,
+                "averageY": average_y,
+                "started": started
+            }
+
+            processed_players[side].append(processed_player)
+
+    return processed_players
+
+def team_url_for(team):
+    return f"https://www.sofascore.com/team/football/{team['slug']}/{team['id']}"
+
+def match_url_for(event):
+    return f"https://www.sofascore.com/football/match/{event['slug']}/{event['customId']}#id:{event['id']},tab:lineups"
+
+def should_block(request):
+    if request.resource_type in BLOCKED_RESOURCE_TYPES:
+        return True
+    host = urlparse(request.url).netloc
+    return any(fragment in host for fragment in BLOCKED_HOST_FRAGMENTS)
+
+def block_unneeded_requests(route):
+    if should_block(route.request):
+        route.abort()
+    else:
+        route.continue_()
+
+async def block_unneeded_requests_async(route):
+    if should_block(route.request):
+        await route.abort()
+    else:
+        await route.continue_()
+
+def backoff_delay(attempt):
+    """Exponential backoff between capture attempts: 0.5s, 1s, 2s..."""
+    return BACKOFF_BASE_SECONDS * 2 ** (attempt - 1)
+
+def is_standings_response(response):
+    # Only capture GET requests ending with standings/total
+    return response.url.endswith("standings/total") and response.request.method == "GET"
+
+def is_performance_response(response, team_id):
+    return "performance" in response.url and str(team_id) in response.url and response.request.method == "GET"
+
+def is_average_positions_response(response, event_id):
+    # Only capture GET requests for average-positions (not HEAD requests)
+    match_id = re.search(r'/event/(\d+)/average-positions', response.url)
+    return match_id is not None and match_id.group(1) == str(event_id) and response.request.method == "GET"
+
+def capture_response(page, url, matcher, endpoint):
+    """Navigate to `url` and return as soon as a response matching `matcher` arrives.
+
+    Each attempt is bounded by the endpoint's deadline; the rest of the page load
+    is stopped once the response is in. Returns None after MAX_ATTEMPTS misses.
+    """
+    deadline = ENDPOINT_DEADLINES_MS[endpoint]
+    for attempt in range(1, MAX_ATTEMPTS + 1):
+        try:
+            with span("response_capture", endpoint, attempt=attempt):
+                with page.expect_response(matcher, timeout=deadline) as response_info:
+                    if attempt == 1 or page.url == "about:blank":
+                        with span("goto", url):
+                            page.goto(url, wait_until="commit", timeout=deadline)
+                    else:
+                        with span("reload", url, attempt=attempt):
+                            page.reload(wait_until="commit", timeout=deadline)
+                response = response_info.value
+            stop_loading(page)
+            return response
+        except Exception as e:
+            print(f"⚠️ No {endpoint} response on attempt {attempt}/{MAX_ATTEMPTS}: {e}")
+            if attempt < MAX_ATTEMPTS:
+                with span("backoff", endpoint, attempt=attempt):
+                    time.sleep(backoff_delay(attempt))
+    return None
+
+def stop_loading(page):
+    try:
+        page.evaluate("window.stop()")
+    except Exception:
+        pass
+
+def capture_json(page, url, matcher, endpoint):
+    """capture_response() decoded to JSON, or None if nothing usable arrived."""
+    response = capture_response(page, url, matcher, endpoint)
+    if response is None:
+        return None
+    try:
+        with span("json_decode", endpoint):
+            data = response.json()
+        print(f"✅ Captured {endpoint} GET request: {response.url}")
+        return data
+    except Exception as e:
+        print(f"Error capturing {endpoint}: {e}")
+        return None
+
+def fetch_cached(cache, endpoint, key, fetch_fn):
+    if cache is None:
+        return fetch_fn()
+    return cache.fetch(endpoint, key, fetch_fn)
+
+async def fetch_cached_async(cache, endpoint, key, fetch_fn):
+    if cache is None:
+        return await fetch_fn()
+    return await cache.fetch_async(endpoint, key, fetch_fn)
+
+def build_final_data(teams, all_teams_data, league=LEAGUE_NAME, season=SEASON):
+    # Precompute each team's average shape so the frontend doesn't rebuild it per selection
+    add_team_shapes(all_teams_data)
+    return {
+        "league": league,
+        "season": season,
+        "collection_timestamp": time.time(),
+        "total_teams": len(teams),
+        "teams": all_teams_data
+    }
+
+def save_lineup_data(final_data, output_path=OUTPUT_FILE):
+    with open(output_path, 'w') as f:
+        json.dump(final_data, f, indent=2)
+
+    print(f"\n🎉 Collection complete!")
+    print(f"📊 Processed {len(final_data['teams'])} teams")
+    print(f"💾 Data saved to {output_path}")
+
+def save_lineups_to_store(final_data, db_path):
+    """Replace this league and season's lineups in the SQLite store"""
+    from data_store import DataStore
+    with DataStore(db_path) as store:
+        count = store.write_lineups(final_data)
+    print(f"💾 Stored {count} team matches in {db_path}")
+
+def load_average_positions(browser, event):
+    """Open the event's lineups tab in a fresh context and return the raw average-positions body."""
+    # Create fresh context for each match
+    with span("context_create", event['id']):
+        context = browser.new_context(viewport={"width": 300, "height": 800})
+        context.route("**/*", block_unneeded_requests)
+        match_page = context.new_page()
+
+    match_url = match_url_for(event)
+    print(f"🌐 Loading: {match_url}")
+
+    try:
+        return capture_json(
+            match_page, match_url,
+            lambda r: is_average_positions_response(r, event['id']),
+            "average-positions"
+        )
+    finally:
+        # Close context to free memory
+        with span("context_close", event['id']):
+            context.close()
+
+def capture_lineups_for_this_event(browser, event, cache=None):
+    """Return the event's processed players, or None if average-positions could not be captured."""
+    try:
+        raw_data = fetch_cached(cache, "average-positions", event['id'], lambda: load_average_positions(browser, event))
+        if raw_data is None:
+            return None
+
+        # Process immediately to reduce payload size
+        with span("process", event['id']):
+            processed_players = process_average_positions(raw_data)
+        print(f"✅ Successfully captured and processed average-positions for event {event['id']}")
+        print(f"   📊 Processed: {len(processed_players['home'])} home, {len(processed_players['away'])} away players")
+        return processed_players
+    except Exception as e:
+        print(f"❌ Error capturing average-positions for event {event['id']}: {e}")
+        return None
+
+def _collect_team_sync(page, browser, team, cache=None, known_events=None):
+    team_data = {
+        "team_name": team['name'],
+        "team_slug": team['slug'],
+        "team_id": team['id'],
+        "league_position": team['position'],
+        "last_5_matches": []
+    }
+
+    # Navigate to team page
+    team_url = team_url_for(team)
+    print(f"Loading {team['name']} page: {team_url}")
+
+    try:
+        performance_data = fetch_cached(
+            cache, "performance", team['id'],
+            lambda: capture_json(page, team_url, lambda r: is_performance_response(r, team['id']), "performance")
+        )
+        if not performance_data:
+            print(f"❌ No performance data captured for {team['name']}")
+            return team_data
+
+        # Filter National League South events, most recent first
+        last_5_events = filter_league_events(performance_data)
+
+        print(f"Found {len(last_5_events)} recent {LEAGUE_NAME} matches for {team['name']}:")
+        for event in last_5_events:
+            print(f"  - {event['homeTeam']} vs {event['awayTeam']} (ID: {event['id']})")
+
+        # Process each match for this team
+        for i, event in enumerate(last_5_events, 1):
+            print(f"\nProcessing match {i}/{len(last_5_events)}: {event['homeTeam']} vs {event['awayTeam']} (ID: {event['id']})")
+
+            with span("match", f"{event['homeTeam']} vs {event['awayTeam']}", event_id=event['id']) as match_span:
+                if known_events and event['id'] in known_events:
+                    event["players"] = known_events[event['id']]
+                    match_span.set("reused")
+                    print(f"♻️ Match {event['id']} already collected, skipping")
+                    continue
+
+                # Add processed players to the event
+                event["players"] = capture_lineups_for_this_event(browser, event, cache)
+                if event["players"]:
+                    print(f"✅ Match {event['id']} completed successfully")
+                else:
+                    event["players"] = None
+                    match_span.set("missing")
+                    print(f"❌ Match {event['id']} failed to capture average-positions")
+
+        team_data["last_5_matches"] = last_5_events
+
+    except Exception as e:
+        print(f"❌ Error processing team {team['name']}: {e}")
+
+    return team_data
+
+def collect_all_teams_lineups(cache=None, incremental=False, output_path=OUTPUT_FILE):
+    """Collect the last matches' lineups for every team in the league.
+
+    With a ResponseCache, standings, performance and average-positions bodies are
+    served from disk while fresh. With incremental=True, events that already have
+    players in `output_path` are reused instead of being fetched again.
+    """
+    known_events = load_known_events(output_path) if incremental else {}
+    if incremental:
+        print(f"♻️ Incremental mode: {len(known_events)} events already collected")
+
+    # Only the browser modes need playwright
+    from playwright.sync_api import sync_playwright
+
     with sync_playwright() as p:
         # Launch browser in incognito mode
         browser = p.chromium.launch(headless=True, args=['--incognito'])
-        page = browser.new_page()
-        
-        # Set browser viewport to 300px wide
-        page.set_viewport_size({"width": 300, "height": 800})
-        
-        standings_data = None
-        
+        context = browser.new_context(viewport={"width": 300, "height": 800})
+        context.route("**/*", block_unneeded_requests)
+        page = context.new_page()
+
         # First, capture the standings API response
-        def handle_standings_response(response):
-            nonlocal standings_data
-            # Only capture GET requests ending with standings/total
-            if response.url.endswith("standings/total") and response.request.method == "GET":
-                try:
-                    standings_data = response.json()
-                    print(f"✅ Captured standings/total GET request: {response.url}")
-                except Exception as e:
-                    print(f"Error capturing standings: {e}")
-        
-        page.on("response", handle_standings_response)
-        
-        # Navigate to National League South standings page
-        print("Loading National League South standings page...")
-        page.goto("https://www.sofascore.com/tournament/football/england-amateur/national-league-south/174", wait_until="domcontentloaded")
-        page.wait_for_load_state("networkidle")
-        
+        print(f"Loading {LEAGUE_NAME} standings page...")
+        with span("standings", LEAGUE_NAME):
+            standings_data = fetch_cached(
+                cache, "standings", STANDINGS_URL,
+                lambda: capture_json(page, STANDINGS_URL, is_standings_response, "standings")
+            )
+
         if not standings_data:
             print("❌ No standings data captured")
             browser.close()
             return
-        
+
         # Extract teams from standings - corrected structure
-        teams = []
-        standings = standings_data.get("standings", [])
-        if standings:
-            rows = standings[0].get("rows", [])
-            for row in rows:
-                team_info = row.get("team", {})
-                teams.append({
-                    "name": team_info.get("name"),
-                    "slug": team_info.get("slug"),
-                    "id": team_info.get("id"),
-                    "position": row.get("position")
-                })
-        
-        print(f"Found {len(teams)} teams in National League South:")
+        teams = extract_teams(standings_data)
+
+        print(f"Found {len(teams)} teams in {LEAGUE_NAME}:")
         for team in teams:
             print(f"  {team['position']}. {team['name']} (slug: {team['slug']}, id: {team['id']})")
-        
+
         all_teams_data = []
-        
+
         # Process each team
         for team_index, team in enumerate(teams, 1):
             print(f"\n{'='*60}")
             print(f"Processing team {team_index}/{len(teams)}: {team['name']} (ID: {team['id']})")
             print(f"{'='*60}")
-            
-            team_data = {
-                "team_name": team['name'],
-                "team_slug": team['slug'],
-                "team_id": team['id'],
-                "league_position": team['position'],
-                "last_5_matches": []
-            }
-            
-            # Get performance data for this team
-            performance_data = None
-            
-            def handle_performance_response(response):
-                nonlocal performance_data
-                if "performance" in response.url and str(team['id']) in response.url:
-                    try:
-                        performance_data = response.json()
-                        print(f"✅ Captured performance API for {team['name']}: {response.url}")
-                    except Exception as e:
-                        print(f"Error capturing performance for {team['name']}: {e}")
-            
-            page.on("response", handle_performance_response)
-            
-            # Navigate to team page
-            team_url = f"https://www.sofascore.com/team/football/{team['slug']}/{team['id']}"
-            print(f"Loading {team['name']} page: {team_url}")
-            
-            try:
-                page.goto(team_url, wait_until="domcontentloaded", timeout=15000)
-                page.wait_for_load_state("networkidle")
-                
-                if not performance_data:
-                    print(f"❌ No performance data captured for {team['name']}")
-                    all_teams_data.append(team_data)
-                    continue
-                
-                # Filter National League South events
-                national_league_south_events = []
-                for event in performance_data.get("events", []):
-                    tournament_name = event.get("tournament", {}).get("name", "")
-                    if "National League South" in tournament_name:
-                        national_league_south_events.append({
-                            "id": event["id"],
-                            "slug": event["slug"],
-                            "customId": event.get("customId", "uesUid"),
-                            "homeTeam": event["homeTeam"]["name"],
-                            "awayTeam": event["awayTeam"]["name"],
-                            "startTimestamp": event["startTimestamp"]
-                        })
-                
-                # Sort and take last 5
-                national_league_south_events.sort(key=lambda x: x["startTimestamp"], reverse=True)
-                last_5_events = national_league_south_events[:5]
-                
-                print(f"Found {len(last_5_events)} recent National League South matches for {team['name']}:")
-                for event in last_5_events:
-                    print(f"  - {event['homeTeam']} vs {event['awayTeam']} (ID: {event['id']})")
-                
-                # Process each match for this team
-                for i, event in enumerate(last_5_events, 1):
-                    print(f"\nProcessing match {i}/{len(last_5_events)}: {event['homeTeam']} vs {event['awayTeam']} (ID: {event['id']})")
-                    
-                    # Create fresh context for each match
-                    context = browser.new_context()
-                    match_page = context.new_page()
-                    
-                    # Set viewport for match page
-                    match_page.set_viewport_size({"width": 300, "height": 800})
-                    
-                    # Disable unnecessary resources for speed
-                    match_page.route("**/*.{png,jpg,jpeg,gif,svg,css,woff,woff2}", lambda route: route.abort())
-                    
-                    captured_this_event = False
-                    lineups_data = None
-                    
-                    def capture_lineups_for_this_event(response):
-                        nonlocal captured_this_event, lineups_data
-                        # Only capture GET requests for average-positions (not HEAD requests)
-                        if "average-positions" in response.url and response.request.method == "GET":
-                            match_id = re.search(r'/event/(\d+)/average-positions', response.url)
-                            if match_id:
-                                event_id = match_id.group(1)
-                                print(f"📡 Detected GET request for average-positions: event {event_id}")
-                                if event_id == str(event['id']):
-                                    try:
-                                        # Get the whole response and process immediately
-                                        raw_data = response.json()
-                                        
-                                        # Process the data immediately to reduce payload size
-                                        processed_players = {"home": [], "away": []}
-                                        
-                                        # Get substitution player IDs
-                                        substitution_player_in_ids = set()
-                                        for sub in raw_data.get("substitutions", []):
-                                            player_in = sub.get("playerIn", {})
-                                            if player_in and player_in.get("id"):
-                                                substitution_player_in_ids.add(player_in["id"])
-                                        
-                                        # Process home and away players
-                                        for side in ["home", "away"]:
-                                            players_list = raw_data.get(side, [])
-                                            
-                                            for player_data in players_list:
-                                                player_info = player_data.get("player", {})
-                                                
-                                                if not player_info or not player_info.get("id"):
-                                                    continue
-                                                
-                                                player_id = player_info.get("id")
-                                                full_name = player_info.get("name", "")
-                                                surname = extract_surname(full_name)
-                                                jersey_number = player_info.get("jerseyNumber", "/")
-                                                average_x = player_data.get("averageX")
-                                                average_y = player_data.get("averageY")
-                                                started = player_id not in substitution_player_in_ids
-                                                
-                                                processed_player = {
-                                                    "surname": surname,
-                                                    "full_name": full_name,
-                                                    "id": player_id,
-                                                    "jersey_number": jersey_number,
-                                                    "position": player_info.get("position", ""),
-                                                    "averageX": average_x,
-                                                    "averageY": average_y,
-                                                    "started": started
-                                                }
-                                                
-                                                processed_players[side].append(processed_player)
-                                        
-                                        lineups_data = processed_players
-                                        captured_this_event = True
-                                        print(f"✅ Successfully captured and processed average-positions for event {event_id}")
-                                        print(f"   📊 Processed: {len(processed_players['home'])} home, {len(processed_players['away'])} away players")
-                                        
-                                    except Exception as e:
-                                        print(f"❌ Error capturing average-positions for event {event_id}: {e}")
-                    
-                    match_page.on("response", capture_lineups_for_this_event)
-                    
-                    # Navigate directly to lineups tab
-                    match_url = f"https://www.sofascore.com/football/match/{event['slug']}/{event['customId']}#id:{event['id']},tab:lineups"
-                    print(f"🌐 Loading: {match_url}")
-                    
-                    try:
-                        # Navigate with networkidle for average-positions pages
-                        match_page.goto(match_url, wait_until="networkidle", timeout=15000)
-                        
-                        # If not captured, try one more time with a reload
-                        if not captured_this_event:
-                            print(f"⚠️ Retrying for event {event['id']}...")
-                            match_page.reload(wait_until="networkidle")
-                            match_page.wait_for_timeout(5000)
-                        
-                    except Exception as e:
-                        print(f"❌ Error loading match {event['id']}: {e}")
-                    
-                    # Add processed players to the event
-                    if captured_this_event and lineups_data:
-                        event["players"] = lineups_data
-                        print(f"✅ Match {event['id']} completed successfully")
-                    else:
-                        event["players"] = None
-                        print(f"❌ Match {event['id']} failed to capture average-positions")
-                    
-                    # Close context to free memory
-                    context.close()
-                
-                team_data["last_5_matches"] = last_5_events
-                
-            except Exception as e:
-                print(f"❌ Error processing team {team['name']}: {e}")
-            
+
+            with span("team", team['name'], team_id=team['id']) as team_span:
+                team_data = _collect_team_sync(page, browser, team, cache, known_events)
+                team_span.set(matches=len(team_data["last_5_matches"]))
+                if not team_data["last_5_matches"]:
+                    team_span.set("no_matches")
+
             all_teams_data.append(team_data)
-            
-            # Remove the response handler for this team
-            page.remove_listener("response", handle_performance_response)
-        
+
         browser.close()
-        
+
         # Save data with enhanced structure
-        final_data = {
-            "league": "National League South",
-            "season": "2024/25",
-            "collection_timestamp": time.time(),
-            "total_teams": len(teams),
-            "teams": all_teams_data
-        }
-        
-        with open('processed_lineup_data.json', 'w') as f:
-            json.dump(final_data, f, indent=2)
-        
-        print(f"\n🎉 Collection complete!")
-        print(f"📊 Processed {len(all_teams_data)} teams")
-        print(f"💾 Data saved to processed_lineup_data.json")
-        
+        final_data = build_final_data(teams, all_teams_data)
+        save_lineup_data(final_data, output_path)
+
+        if cache is not None:
+            print(f"💾 Cache: {cache.hits} hits, {cache.misses} misses")
+
         return final_data
 
+class ContextPool:
+    """Fixed pool of browser contexts shared by every team and match task.
+
+    Page loads also take a per-host semaphore slot, so at most `per_host_limit`
+    pages load from the same host at once regardless of how many contexts are free.
+    """
+
+    def __init__(self, browser, size=DEFAULT_POOL_SIZE, per_host_limit=DEFAULT_PER_HOST_LIMIT):
+        self.browser = browser
+        self.size = size
+        self.per_host_limit = per_host_limit
+        self._contexts = asyncio.Queue()
+        self._host_limits = {}
+
+    async def start(self):
+        for _ in range(self.size):
+            with span("context_create", pool_size=self.size):
+                context = await self.browser.new_context(viewport={"width": 300, "height": 800})
+                await context.route("**/*", block_unneeded_requests_async)
+            self._contexts.put_nowait(context)
+
+    async def close(self):
+        while not self._contexts.empty():
+            context = self._contexts.get_nowait()
+            with span("context_close"):
+                await context.close()
+
+    def host_limit(self, url):
+        host = urlparse(url).netloc
+        if host not in self._host_limits:
+            self._host_limits[host] = asyncio.Semaphore(self.per_host_limit)
+        return self._host_limits[host]
+
+    async def open_page(self, url, matcher, endpoint):
+        """Load `url` in a pooled context and return the first response matching `matcher`.
+
+        Resolves as soon as the response arrives; each attempt is bounded by the
+        endpoint's deadline and retried with backoff. Returns None after MAX_ATTEMPTS misses.
+        """
+        deadline = ENDPOINT_DEADLINES_MS[endpoint]
+        with span("context_wait", endpoint):
+            context = await self._contexts.get()
+        page = None
+        try:
+            page = await context.new_page()
+            for attempt in range(1, MAX_ATTEMPTS + 1):
+                try:
+                    async with self.host_limit(url):
+                        with span("response_capture", endpoint, attempt=attempt):
+                            async with page.expect_response(matcher, timeout=deadline) as response_info:
+                                if attempt == 1 or page.url == "about:blank":
+                                    with span("goto", url):
+                                        await page.goto(url, wait_until="commit", timeout=deadline)
+                                else:
+                                    with span("reload", url, attempt=attempt):
+                                        await page.reload(wait_until="commit", timeout=deadline)
+                            return await response_info.value
+                except Exception as e:
+                    print(f"⚠️ No {endpoint} response from {url} on attempt {attempt}/{MAX_ATTEMPTS}: {e}")
+                    if attempt < MAX_ATTEMPTS:
+                        with span("backoff", endpoint, attempt=attempt):
+                            await asyncio.sleep(backoff_delay(attempt))
+            return None
+        finally:
+            # Closing the page aborts whatever is still loading
+            if page is not None:
+                await page.close()
+            self._contexts.put_nowait(context)
+
+    async def open_json(self, url, matcher, endpoint):
+        """open_page() decoded to JSON, or None if nothing usable arrived."""
+        response = await self.open_page(url, matcher, endpoint)
+        if response is None:
+            return None
+        try:
+            with span("json_decode", endpoint):
+                return await response.json()
+        except Exception as e:
+            print(f"Error capturing {endpoint} from {url}: {e}")
+            return None
+
+async def _collect_match_async(pool, event, cache=None, known_events=None):
+    with span("match", f"{event['homeTeam']} vs {event['awayTeam']}", event_id=event['id']) as match_span:
+        event = await _load_match_async(pool, event, cache, known_events)
+        if known_events and event['id'] in known_events:
+            match_span.set("reused")
+        elif not event["players"]:
+            match_span.set("missing")
+    return event
+
+async def _load_match_async(pool, event, cache=None, known_events=None):
+    if known_events and event['id'] in known_events:
+        event["players"] = known_events[event['id']]
+        print(f"♻️ Match {event['id']} already collected, skipping")
+        return event
+
+    try:
+        raw_data = await fetch_cached_async(
+            cache, "average-positions", event['id'],
+            lambda: pool.open_json(
+                match_url_for(event),
+                lambda r: is_average_positions_response(r, event['id']),
+                "average-positions"
+            )
+        )
+        if raw_data is not None:
+            with span("process", event['id']):
+                event["players"] = process_average_positions(raw_data)
+            print(f"✅ Match {event['id']} completed: {len(event['players']['home'])} home, {len(event['players']['away'])} away players")
+            return event
+    except Exception as e:
+        print(f"❌ Error loading match {event['id']}: {e}")
+
+    event["players"] = None
+    print(f"❌ Match {event['id']} failed to capture average-positions")
+    return event
+
+async def _collect_team_async(pool, team, cache=None, known_events=None):
+    with span("team", team['name'], team_id=team['id']) as team_span:
+        team_data = await _load_team_async(pool, team, cache, known_events)
+        team_span.set(matches=len(team_data["last_5_matches"]))
+        if not team_data["last_5_matches"]:
+            team_span.set("no_matches")
+    return team_data
+
+async def _load_team_async(pool, team, cache=None, known_events=None):
+    team_data = {
+        "team_name": team['name'],
+        "team_slug": team['slug'],
+        "team_id": team['id'],
+        "league_position": team['position'],
+        "last_5_matches": []
+    }
+
+    try:
+        performance_data = await fetch_cached_async(
+            cache, "performance", team['id'],
+            lambda: pool.open_json(
+                team_url_for(team),
+                lambda r: is_performance_response(r, team['id']),
+                "performance"
+            )
+        )
+        if not performance_data:
+            print(f"❌ No performance data captured for {team['name']}")
+            return team_data
+
+        events = filter_league_events(performance_data)
+        print(f"✅ {team['name']}: {len(events)} recent {LEAGUE_NAME} matches")
+
+        # Match pages queue on the pool alongside other teams' pages
+        team_data["last_5_matches"] = list(await asyncio.gather(
+            *(_collect_match_async(pool, event, cache, known_events) for event in events)
+        ))
+    except Exception as e:
+        print(f"❌ Error processing team {team['name']}: {e}")
+
+    return team_data
+
+async def collect_all_teams_lineups_async(pool_size=DEFAULT_POOL_SIZE, per_host_limit=DEFAULT_PER_HOST_LIMIT,
+                                          cache=None, incremental=False, output_path=OUTPUT_FILE):
+    """Async variant of collect_all_teams_lineups() that loads team and match pages
+    concurrently through a pool of `pool_size` browser contexts."""
+    known_events = load_known_events(output_path) if incremental else {}
+    if incremental:
+        print(f"♻️ Incremental mode: {len(known_events)} events already collected")
+
+    from playwright.async_api import async_playwright
+
+    async with async_playwright() as p:
+        browser = await p.chromium.launch(headless=True, args=['--incognito'])
+        pool = ContextPool(browser, size=pool_size, per_host_limit=per_host_limit)
+        await pool.start()
+
+        try:
+            print(f"Loading {LEAGUE_NAME} standings page...")
+            with span("standings", LEAGUE_NAME):
+                standings_data = await fetch_cached_async(
+                    cache, "standings", STANDINGS_URL,
+                    lambda: pool.open_json(STANDINGS_URL, is_standings_response, "standings")
+                )
+            if not standings_data:
+                print("❌ No standings data captured")
+                return
+
+            teams = extract_teams(standings_data)
+            print(f"Found {len(teams)} teams in {LEAGUE_NAME}, collecting with {pool_size} contexts")
+
+            # gather keeps results in standings order
+            all_teams_data = list(await asyncio.gather(
+                *(_collect_team_async(pool, team, cache, known_events) for team in teams)
+            ))
+        finally:
+            await pool.close()
+            await browser.close()
+
+    final_data = build_final_data(teams, all_teams_data)
+    save_lineup_data(final_data, output_path)
+
+    if cache is not None:
+        print(f"💾 Cache: {cache.hits} hits, {cache.misses} misses")
+
+    return final_data
+
+def _collect_team_direct(client, team, cache=None, known_events=None):
+    with span("team", team['name'], team_id=team['id']) as team_span:
+        team_data = _load_team_direct(client, team, cache, known_events)
+        team_span.set(matches=len(team_data["last_5_matches"]))
+        if not team_data["last_5_matches"]:
+            team_span.set("no_matches")
+    return team_data
+
+def _load_team_direct(client, team, cache=None, known_events=None):
+    team_data = {
+        "team_name": team['name'],
+        "team_slug": team['slug'],
+        "team_id": team['id'],
+        "league_position": team['position'],
+        "last_5_matches": []
+    }
+
+    try:
+        performance_data = fetch_cached(cache, "performance", team['id'], lambda: client.team_performance(team['id']))
+        if not performance_data:
+            print(f"❌ No performance data captured for {team['name']}")
+            return team_data
+
+        events = filter_league_events(performance_data)
+        print(f"✅ {team['name']}: {len(events)} recent {LEAGUE_NAME} matches")
+
+        for event in events:
+            with span("match", f"{event['homeTeam']} vs {event['awayTeam']}", event_id=event['id']) as match_span:
+                if known_events and event['id'] in known_events:
+                    event["players"] = known_events[event['id']]
+                    match_span.set("reused")
+                    continue
+
+                raw_data = fetch_cached(cache, "average-positions", event['id'], lambda: client.average_positions(event['id']))
+                with span("process", event['id']):
+                    event["players"] = process_average_positions(raw_data) if raw_data else None
+                if not event["players"]:
+                    match_span.set("missing")
+                    print(f"❌ Match {event['id']} failed to capture average-positions")
+
+        team_data["last_5_matches"] = events
+    except Exception as e:
+        print(f"❌ Error processing team {team['name']}: {e}")
+
+    return team_data
+
+def collect_all_teams_lineups_direct(client, cache=None, incremental=False, output_path=OUTPUT_FILE, workers=DEFAULT_POOL_SIZE):
+    """Collect lineups by calling the JSON endpoints directly instead of rendering pages.
+
+    `client` is a SofascoreClient; teams are processed on `workers` threads that
+    share its keep-alive connection pool. Output matches collect_all_teams_lineups(),
+    labelled with the season the standings were taken from.
+    """
+    known_events = load_known_events(output_path) if incremental else {}
+    if incremental:
+        print(f"♻️ Incremental mode: {len(known_events)} events already collected")
+
+    print(f"Loading {LEAGUE_NAME} standings from {client.host}...")
+    with span("standings", LEAGUE_NAME):
+        seasons = client.seasons()
+        if not seasons:
+            print("❌ No seasons found")
+            return
+        season = seasons[0]
+        # Same key as lineup_crawler.py, so a standings entry is never reused for another season
+        standings_data = fetch_cached(cache, "standings", f"{TOURNAMENT_ID}/{season['id']}",
+                                      lambda: client.standings(season['id']))
+    if not standings_data:
+        print("❌ No standings data captured")
+        return
+
+    teams = extract_teams(standings_data)
+    print(f"Found {len(teams)} teams in {LEAGUE_NAME}, collecting with {workers} workers")
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        # map keeps results in standings order
+        all_teams_data = list(executor.map(
+            lambda team: _collect_team_direct(client, team, cache, known_events), teams
+        ))
+
+    final_data = build_final_data(teams, all_teams_data, season=season_label(season.get("year")) or SEASON)
+    save_lineup_data(final_data, output_path)
+
+    if cache is not None:
+        print(f"💾 Cache: {cache.hits} hits, {cache.misses} misses")
+
+    return final_data
+
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=f"Collect recent {LEAGUE_NAME} lineups from SofaScore")
+    parser.add_argument("--mode", choices=["sync", "async", "direct"], default="sync",
+                        help="sync processes pages one at a time, async uses a context pool, "
+                             "direct calls the JSON endpoints without a browser")
+    parser.add_argument("--contexts", type=int, default=DEFAULT_POOL_SIZE,
+                        help="number of browser contexts in the async pool, or connections/workers in direct mode")
+    parser.add_argument("--per-host", type=int, default=DEFAULT_PER_HOST_LIMIT,
+                        help="max concurrent page loads per host in async mode")
+    parser.add_argument("--cache-dir", default=DEFAULT_CACHE_DIR,
+                        help="directory for the on-disk response cache")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="always fetch fresh responses")
+    parser.add_argument("--incremental", action="store_true",
+                        help=f"reuse events already collected in {OUTPUT_FILE}")
+    parser.add_argument("--api-base", default=API_BASE,
+                        help="API root for direct mode, e.g. a lineup_stub_server.py address")
+    parser.add_argument("--record-dir",
+                        help="save direct-mode responses as fixtures for lineup_stub_server.py")
+    parser.add_argument("--db", nargs="?", const="scouting.db",
+                        help="also write the lineups into this SQLite store (see data_store.py)")
+    parser.add_argument("--shards-dir", help="also write per-team lineup shards and a manifest (see shard_export.py)")
+    parser.add_argument("--metrics-file", default=DEFAULT_METRICS_FILE,
+                        help="append per-phase timing spans to this JSONL file")
+    parser.add_argument("--no-metrics", action="store_true",
+                        help="skip span recording and the timing summary")
+    args = parser.parse_args()
+
+    cache = None if args.no_cache else ResponseCache(args.cache_dir)
+    recorder = None if args.no_metrics else MetricsRecorder(args.metrics_file)
+    set_recorder(recorder)
+
     start_time = time.time()
-    collect_all_teams_lineups()
-    print(f"⏱️ Total execution time: {time.time() - start_time:.2f} seconds")
\ No newline at end of file
+    if args.mode == "direct":
+        client = SofascoreClient(args.api_base, pool_size=args.contexts, record_dir=args.record_dir)
+        try:
+            final_data = collect_all_teams_lineups_direct(client, cache=cache, incremental=args.incremental, workers=args.contexts)
+        finally:
+            client.close()
+    elif args.mode == "async":
+        final_data = asyncio.run(collect_all_teams_lineups_async(
+            args.contexts, args.per_host, cache=cache, incremental=args.incremental
+        ))
+    else:
+        final_data = collect_all_teams_lineups(cache=cache, incremental=args.incremental)
+    if args.db and final_data:
+        save_lineups_to_store(final_data, args.db)
+    if args.shards_dir and final_data:
+        from shard_export import write_shards
+        write_shards("lineups", final_data["teams"], args.shards_dir)
+    print(f"⏱️ Total execution time: {time.time() - start_time:.2f} seconds")
+
+    if recorder is not None:
+        recorder.close()
+        print(f"\n📊 Phase timings (run {recorder.run_id}, spans in {args.metrics_file}):")
+        print(recorder.summary())
@@ -0,0 +1,144 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+import itertools
+import json
+import math
+import threading
+import time
+import uuid
+
+DEFAULT_METRICS_FILE = "lineup_metrics.jsonl"
+
+# Span outcomes that are not counted as errors in the summary
+OK_OUTCOMES = ("ok", "cache_hit", "reused")
+
+# Innermost open span for the current thread or asyncio task
+_current_span = ContextVar("current_span", default=None)
+
+class Span:
+    """One timed phase. Set `outcome` or add attributes before the block exits."""
+
+    def __init__(self, span_id, kind, name, parent_id, attrs):
+        self.id = span_id
+        self.kind = kind
+        self.name = name
+        self.parent_id = parent_id
+        self.attrs = attrs
+        self.outcome = "ok"
+
+    def set(self, outcome=None, **attrs):
+        if outcome is not None:
+            self.outcome = outcome
+        self.attrs.update(attrs)
+
+class MetricsRecorder:
+    """Write one JSON line per finished span and keep durations for the run summary.
+
+    Spans nest through a context variable, so parent ids stay correct across
+    threads and asyncio tasks without passing the recorder around.
+    """
+
+    def __init__(self, path=DEFAULT_METRICS_FILE):
+        self.path = path
+        self.run_id = uuid.uuid4().hex[:12]
+        self.spans = []
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._file = open(path, "a", encoding="utf-8")
+
+    @contextmanager
+    def span(self, kind, name="", **attrs):
+        parent = _current_span.get()
+        span = Span(next(self._ids), kind, str(name), parent.id if parent else None, attrs)
+        token = _current_span.set(span)
+        start_wall = time.time()
+        start = time.perf_counter()
+        try:
+            yield span
+        except BaseException as e:
+            span.set("error", error=f"{type(e).__name__}: {e}")
+            raise
+        finally:
+            _current_span.reset(token)
+            self._record(span, start_wall, (time.perf_counter() - start) * 1000)
+
+    def _record(self, span, start_wall, duration_ms):
+        entry = {
+            "run_id": self.run_id,
+            "span_id": span.id,
+            "parent_id": span.parent_id,
+            "kind": span.kind,
+            "name": span.name,
+            "start": round(start_wall, 3),
+            "duration_ms": round(duration_ms, 1),
+            "outcome": span.outcome,
+            **span.attrs
+        }
+        with self._lock:
+            self.spans.append(entry)
+            self._file.write(json.dumps(entry) + "\n")
+
+    def close(self):
+        with self._lock:
+            self._file.close()
+
+    def summary(self, slowest=5):
+        """Percentile table per span kind, plus the slowest teams and matches"""
+        lines = [f"{'phase':<20} {'count':>6} {'errors':>6} {'p50 ms':>9} {'p90 ms':>9} {'p99 ms':>9} {'max ms':>9} {'total s':>9}"]
+        by_kind = {}
+        for entry in self.spans:
+            by_kind.setdefault(entry["kind"], []).append(entry)
+
+        for kind, entries in by_kind.items():
+            durations = sorted(e["duration_ms"] for e in entries)
+            errors = sum(1 for e in entries if e["outcome"] not in OK_OUTCOMES)
+            lines.append(
+                f"{kind:<20} {len(durations):>6} {errors:>6} {percentile(durations, 50):>9.0f} "
+                f"{percentile(durations, 90):>9.0f} {percentile(durations, 99):>9.0f} "
+                f"{durations[-1]:>9.0f} {sum(durations) / 1000:>9.1f}"
+            )
+
+        for kind, label in (("team", "teams"), ("match", "matches")):
+            entries = sorted(by_kind.get(kind, []), key=lambda e: e["duration_ms"], reverse=True)[:slowest]
+            if entries:
+                lines.append(f"\nSlowest {label}:")
+                for e in entries:
+                    lines.append(f"  {e['duration_ms'] / 1000:7.2f}s  {e['name']} ({e['outcome']})")
+
+        return "\n".join(lines)
+
+class NullRecorder:
+    """Recorder used when metrics are off; spans still work but nothing is kept."""
+
+    @contextmanager
+    def span(self, kind, name="", **attrs):
+        yield Span(None, kind, name, None, attrs)
+
+    def close(self):
+        pass
+
+    def summary(self, slowest=5):
+        return ""
+
+_recorder = NullRecorder()
+
+def set_recorder(recorder):
+    global _recorder
+    _recorder = recorder or NullRecorder()
+
+def span(kind, name="", **attrs):
+    """Open a span on the active recorder: `with span("goto", url) as s: ...`"""
+    return _recorder.span(kind, name, **attrs)
+
+def annotate(outcome=None, **attrs):
+    """Set the outcome or attributes of the innermost open span, if any"""
+    current = _current_span.get()
+    if current is not None:
+        current.set(outcome, **attrs)
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0
+    rank = math.ceil(pct / 100 * len(sorted_values))
+    return sorted_values[max(0, min(len(sorted_values), rank) - 1)]
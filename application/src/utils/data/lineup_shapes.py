@@ -0,0 +1,198 @@
+import argparse
+import json
+import numpy as np
+
+DEFAULT_LAST_N = 5
+# Occupancy grid cells along the pitch length (x) and width (y)
+GRID_COLUMNS = 10
+GRID_ROWS = 7
+ALIGN_ITERATIONS = 3
+
+def team_side(team, match):
+    """The team's player list in a lineup_grabber match, or None"""
+    players = match.get('players') or {}
+    if match.get('homeTeam') == team['team_name']:
+        return players.get('home')
+    if match.get('awayTeam') == team['team_name']:
+        return players.get('away')
+    return None
+
+def recent_starters(team, last_n=DEFAULT_LAST_N):
+    """[(match, starters)] for the team's last_n most recent matches with positions, newest first"""
+    matches = sorted(team.get('last_5_matches') or [], key=lambda m: m.get('startTimestamp') or 0, reverse=True)
+    result = []
+    for match in matches:
+        starters = [
+            player for player in team_side(team, match) or []
+            if player.get('started') and player.get('averageX') is not None and player.get('averageY') is not None
+        ]
+        if starters:
+            result.append((match, starters))
+        if len(result) == last_n:
+            break
+    return result
+
+def greedy_assignment(cost):
+    """Pair rows with columns by repeatedly taking the cheapest remaining pair.
+
+    Returns an array mapping each row to its column (-1 if there are more
+    rows than columns). Close to optimal for the ten outfield slots of a
+    formation, without needing scipy.
+    """
+    cost = cost.astype(float, copy=True)
+    assignment = np.full(cost.shape[0], -1, dtype=np.int64)
+    for _ in range(min(cost.shape)):
+        row, column = np.unravel_index(np.argmin(cost), cost.shape)
+        assignment[row] = column
+        cost[row, :] = np.inf
+        cost[:, column] = np.inf
+    return assignment
+
+def mean_shape(lineups):
+    """Average outfield formation over several matches.
+
+    Each match's outfield starters are matched to the slots of a reference
+    shape (first the most complete lineup, newest on ties, then the running
+    mean) by position, so the mean is taken slot by slot rather than player by
+    player. Shorter lineups (a red card, a missing position) leave slots
+    empty rather than dropping slots from every match. Returns
+    (slots x 2 mean positions, slots x 2 standard deviations, per-match slot
+    occupants as index lists into each lineup).
+    """
+    positions = [np.array([[p['averageX'], p['averageY']] for p in lineup], dtype=float) for lineup in lineups]
+    # Lineups are newest first, so the lowest index wins a tie
+    reference = positions[max(range(len(positions)), key=lambda m: (len(positions[m]), -m))]
+    slots = len(reference)
+
+    for _ in range(ALIGN_ITERATIONS):
+        aligned = np.full((len(positions), slots, 2), np.nan)
+        occupants = []
+        for m, points in enumerate(positions):
+            # Squared distance from every reference slot to every player in this match
+            cost = ((reference[:, None, :] - points[None, :, :]) ** 2).sum(axis=2)
+            assignment = greedy_assignment(cost)
+            filled = assignment >= 0
+            aligned[m, filled] = points[assignment[filled]]
+            occupants.append(assignment)
+        reference = np.nanmean(aligned, axis=0)
+
+    return reference, np.nanstd(aligned, axis=0), occupants
+
+def player_averages(lineups):
+    """Mean position and spread per player over the given starting lineups, most starts first"""
+    players = {}
+    ids, xs, ys = [], [], []
+    for lineup in lineups:
+        for player in lineup:
+            index = players.setdefault(player['id'], len(players))
+            ids.append(index)
+            xs.append(player['averageX'])
+            ys.append(player['averageY'])
+    ids = np.array(ids, dtype=np.int64)
+    points = np.column_stack([np.array(xs, dtype=float), np.array(ys, dtype=float)])
+
+    starts = np.bincount(ids, minlength=len(players))
+    sums = np.stack([np.bincount(ids, points[:, axis], len(players)) for axis in (0, 1)], axis=1)
+    squares = np.stack([np.bincount(ids, points[:, axis] ** 2, len(players)) for axis in (0, 1)], axis=1)
+    means = sums / starts[:, None]
+    spreads = np.sqrt(np.maximum(squares / starts[:, None] - means ** 2, 0))
+
+    latest = {}
+    for lineup in reversed(lineups):
+        for player in lineup:
+            latest[player['id']] = player
+    result = [
+        {
+            'id': player_id,
+            'surname': latest[player_id].get('surname', ''),
+            'full_name': latest[player_id].get('full_name', ''),
+            'jersey_number': latest[player_id].get('jersey_number', '/'),
+            'position': latest[player_id].get('position', ''),
+            'starts': int(starts[index]),
+            'averageX': round(float(means[index, 0]), 2),
+            'averageY': round(float(means[index, 1]), 2),
+            'spreadX': round(float(spreads[index, 0]), 2),
+            'spreadY': round(float(spreads[index, 1]), 2)
+        }
+        for player_id, index in players.items()
+    ]
+    return sorted(result, key=lambda p: -p['starts'])
+
+def occupancy_grid(lineups, columns=GRID_COLUMNS, rows=GRID_ROWS):
+    """Share of outfield starter positions in each cell, rows (y) by columns (x), summing to 1"""
+    points = np.array([[p['averageX'], p['averageY']] for lineup in lineups for p in lineup], dtype=float).reshape(-1, 2)
+    counts, _, _ = np.histogram2d(points[:, 1], points[:, 0], bins=[rows, columns], range=[[0, 100], [0, 100]])
+    total = counts.sum()
+    return (counts / total if total else counts).round(3).tolist()
+
+def team_shape(team, last_n=DEFAULT_LAST_N, columns=GRID_COLUMNS, rows=GRID_ROWS):
+    """Average-shape record for one lineup_data.json team, or None without positional data.
+
+    `slots` are PlayerPosition-shaped (so Pitch.tsx can draw them as starters)
+    with the mean slot position, its spread, and the player who filled the
+    slot most often. Coordinates are in the same 0-100 frame as averageX/Y.
+    """
+    recent = recent_starters(team, last_n)
+    if not recent:
+        return None
+    lineups = [starters for _, starters in recent]
+    outfield = [[p for p in starters if p.get('position') != 'G'] for starters in lineups]
+    outfield_lineups = [lineup for lineup in outfield if lineup]
+
+    slots = []
+    if outfield_lineups:
+        means, spreads, occupants = mean_shape(outfield_lineups)
+        for slot in range(len(means)):
+            filled_by = [lineup[assignment[slot]] for lineup, assignment in zip(outfield_lineups, occupants) if assignment[slot] >= 0]
+            ids = [player['id'] for player in filled_by]
+            regular = filled_by[ids.index(max(set(ids), key=ids.count))] if filled_by else {}
+            slots.append({
+                'surname': regular.get('surname', ''),
+                'full_name': regular.get('full_name', ''),
+                'id': regular.get('id', slot),
+                'jersey_number': regular.get('jersey_number', '/'),
+                'position': regular.get('position', ''),
+                'averageX': round(float(means[slot, 0]), 2),
+                'averageY': round(float(means[slot, 1]), 2),
+                'started': True,
+                'spreadX': round(float(spreads[slot, 0]), 2),
+                'spreadY': round(float(spreads[slot, 1]), 2)
+            })
+
+    return {
+        'matches': len(recent),
+        'match_ids': [match['id'] for match, _ in recent],
+        'slots': slots,
+        'players': player_averages(lineups),
+        'grid': {
+            'columns': columns,
+            'rows': rows,
+            'occupancy': occupancy_grid(outfield_lineups, columns, rows) if outfield_lineups else [[0.0] * columns for _ in range(rows)]
+        }
+    }
+
+def add_team_shapes(teams, last_n=DEFAULT_LAST_N):
+    """Attach an average_shape record to every team that has positional data"""
+    for team in teams:
+        shape = team_shape(team, last_n)
+        if shape:
+            team['average_shape'] = shape
+        else:
+            team.pop('average_shape', None)
+    return teams
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Add per-team average shapes to an existing lineup_data.json")
+    parser.add_argument("lineup_file")
+    parser.add_argument("--last", type=int, default=DEFAULT_LAST_N, help="matches per team to average over")
+    parser.add_argument("--output", help="write here instead of updating lineup_file in place")
+    args = parser.parse_args()
+
+    with open(args.lineup_file, 'r') as f:
+        data = json.load(f)
+    add_team_shapes(data['teams'], args.last)
+
+    with open(args.output or args.lineup_file, 'w') as f:
+        json.dump(data, f, indent=2)
+    shaped = sum(1 for team in data['teams'] if 'average_shape' in team)
+    print(f"📐 Added average shapes for {shaped} of {len(data['teams'])} teams")
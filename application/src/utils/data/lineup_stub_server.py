@@ -0,0 +1,50 @@
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+import argparse
+import os
+import threading
+
+class FixtureHandler(BaseHTTPRequestHandler):
+    """Serve <fixtures_dir>/<request path>.json, or 404 if no fixture was recorded."""
+
+    protocol_version = "HTTP/1.1"  # keep-alive, like the real API
+    fixtures_dir = "fixtures"
+
+    def do_GET(self):
+        path = self.path.split("?", 1)[0].lstrip("/")
+        fixtures_dir = os.path.abspath(self.fixtures_dir)
+        fixture_path = os.path.abspath(os.path.join(fixtures_dir, path + ".json"))
+
+        # A path escaping the fixtures dir (including into a sibling like fixtures_old/) is a 404
+        if os.path.commonpath([fixture_path, fixtures_dir]) != fixtures_dir or not os.path.isfile(fixture_path):
+            body = b'{"error": {"code": 404}}'
+            self.send_response(404)
+        else:
+            with open(fixture_path, "rb") as f:
+                body = f.read()
+            self.send_response(200)
+
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+def start_stub_server(fixtures_dir, port=0):
+    """Start a fixture server on a background thread and return (server, api_base)."""
+    handler = type("BoundFixtureHandler", (FixtureHandler,), {"fixtures_dir": fixtures_dir})
+    server = ThreadingHTTPServer(("127.0.0.1", port), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_port}/api/v1"
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve recorded SofaScore fixtures for lineup_grabber --mode direct")
+    parser.add_argument("fixtures_dir", help="directory written by lineup_grabber --record-dir")
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    handler = type("BoundFixtureHandler", (FixtureHandler,), {"fixtures_dir": args.fixtures_dir})
+    server = ThreadingHTTPServer(("127.0.0.1", args.port), handler)
+    print(f"📡 Serving {args.fixtures_dir} at http://127.0.0.1:{args.port}/api/v1")
+    server.serve_forever()
@@ -1,108 +1,347 @@
+import argparse
 import csv
+import hashlib
 import json
+import numpy as np
+import os
 from datetime import datetime
 
-def csv_to_json(csv_file_path, json_file_path):
-    matches = {}
+from csv_schema import Schema, convert_cell, read_table
+from xpoints import add_xpoints
+
+# Bump when the output format changes so pipeline.py reconverts unchanged inputs
+CONVERTER_VERSION = 3
+DATA_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Rolling windows (in matches) precomputed for the Progress page
+DEFAULT_WINDOWS = (5,)
+SEASON_LENGTH = 46
+
+# Identifying columns stay as text; every other column is a numeric stat
+# (whole numbers as int, empty or unparseable cells as 0)
+MATCH_SCHEMA = Schema({'Match': 'raw', 'Home': 'raw', 'Date': 'raw', 'Team': 'raw'}, default='number')
+
+def read_match_rows(csv_file_path, schema=MATCH_SCHEMA):
+    """Group CSV rows by match, in file order, with each row's stats parsed.
+
+    Returns (league_average, {match_name: [(row, stats)]}). stats holds the
+    converted stat columns; row holds the identifying columns. Columns are
+    converted whole, once per file, by csv_schema. Rows with no Goals value
+    carry no stats and are dropped here.
+    """
+    table = read_table(csv_file_path, schema)
+    print(table.report.summary())
+    
+    stat_columns = [name for name in table.header if table.types[name] != 'raw']
+    raw_columns = [name for name in table.header if table.types[name] == 'raw']
+    rows = table.parsed_rows(raw_columns)
+    no_goals = table.empty['Goals']
     league_average = None
-    match_id_counter = 1  # Start at 1 for actual matches (0 will be for league average)
+    match_rows = {}
     
-    with open(csv_file_path, 'r', encoding='utf-8') as file:
-        csv_reader = csv.DictReader(file)
+    for row, stats, skip in zip(rows, table.parsed_rows(stat_columns), no_goals):
+        match_name = row['Match']
         
-        for row in csv_reader:
-            match_name = row['Match']
-            
-            # Handle League Average separately
-            if match_name == 'LEAGUE AVERAGE':
-                league_average = process_team_data(row)
-                continue
-            
-            # Skip rows with no meaningful data (like the Opposition row with no stats)
-            if not row['Goals'] or row['Goals'].strip() == '':
+        # Handle League Average separately
+        if match_name == 'LEAGUE AVERAGE':
+            league_average = (row, stats)
+            continue
+        
+        # Skip rows with no meaningful data (like the Opposition row with no stats)
+        if skip:
+            continue
+        
+        match_rows.setdefault(match_name, []).append((row, stats))
+    
+    return league_average, match_rows
+
+def read_raw_match_rows(csv_file_path):
+    """Group CSV rows by match in one csv.reader pass, converting nothing.
+
+    Returns (header, league_average_row, {match_name: [row]}) where each row
+    maps every column to its original string (missing trailing cells are '').
+    Rows are skipped as in read_match_rows().
+    """
+    with open(csv_file_path, 'r', encoding='utf-8', newline='') as csv_file:
+        reader = csv.reader(csv_file)
+        header = next(reader, [])
+        width = len(header)
+        league_average = None
+        match_rows = {}
+        for cells in reader:
+            if not cells:
                 continue
-                
-            # Create match entry if it doesn't exist
-            if match_name not in matches:
-                matches[match_name] = {
-                    'matchId': match_id_counter,
-                    'match': match_name,
-                    'home': row['Home'],
-                    'date': row['Date'],
-                    'teams': {}
-                }
-                match_id_counter += 1
-            
-            # Add team data
-            team_name = row['Team']
-            matches[match_name]['teams'][team_name] = process_team_data(row)
-    
-    # Calculate xPoints for each match
-    for match in matches.values():
-        calculate_xpoints(match)
+            if len(cells) < width:
+                cells = cells + [''] * (width - len(cells))
+            row = dict(zip(header, cells))
+            if row['Match'] == 'LEAGUE AVERAGE':
+                league_average = row
+            elif row['Goals'] and not row['Goals'].isspace():
+                match_rows.setdefault(row['Match'], []).append(row)
+    return header, league_average, match_rows
+
+def parse_row_stats(header, rows, schema=MATCH_SCHEMA):
+    """(row, stats) pairs for raw rows, converted cell by cell with the schema's column types"""
+    converters = [(name, convert) for _, name, convert in schema.cell_converters(header) if schema.column_type(name) != 'raw']
+    return [(row, {name: convert(row[name]) for name, convert in converters}) for row in rows]
+
+def build_match(match_name, rows, match_id, xpoints=True):
+    """Build one match's JSON entry from its (row, stats) pairs.
+
+    With xpoints=False the caller adds xPoints afterwards, batched over many
+    matches with add_xpoints().
+    """
+    match = {
+        'matchId': match_id,
+        'match': match_name,
+        'home': rows[0][0]['Home'],
+        'date': rows[0][0]['Date'],
+        'teams': {}
+    }
     
-    # Convert to list and add league average at the beginning
-    result = list(matches.values())
-    if league_average:
-        result.insert(0, {
-            'matchId': 0,
-            'match': 'LEAGUE AVERAGE',
-            'home': '',
-            'date': '30/12/1899',
-            'teams': {
-                'Dorking Wanderers': league_average
-            }
-        })
+    # Add team data
+    for row, stats in rows:
+        match['teams'][row['Team']] = process_team_data(row, stats)
     
+    if xpoints:
+        calculate_xpoints(match)
+    return match
+
+def build_league_average(league_average):
+    row, stats = league_average
+    return {
+        'matchId': 0,
+        'match': 'LEAGUE AVERAGE',
+        'home': '',
+        'date': '30/12/1899',
+        'teams': {
+            'Dorking Wanderers': process_team_data(row, stats)
+        }
+    }
+
+def write_match_outputs(result, json_file_path, series_file_path=None, windows=DEFAULT_WINDOWS):
     # Write to JSON file
     with open(json_file_path, 'w', encoding='utf-8') as json_file:
         json.dump(result, json_file, indent=2, ensure_ascii=False)
     
     print(f"Converted {len(result)} matches to {json_file_path}")
+    
+    if series_file_path:
+        series = build_team_series(result, windows)
+        with open(series_file_path, 'w', encoding='utf-8') as series_file:
+            json.dump(series, series_file, ensure_ascii=False)
+        print(f"Wrote time series for {len(series['teams'])} teams to {series_file_path}")
+
+def save_to_store(matches, csv_file_path, db_path, season=''):
+    """Replace this CSV's matches in the SQLite store"""
+    from data_store import DataStore, store_source
+    with DataStore(db_path) as store:
+        count = store.write_matches(store_source(csv_file_path), matches, season)
+    print(f"Stored {count} team rows in {db_path}")
+
+def save_matrices(matches, stem):
+    """Write one row per team per match as a memory-mappable .npy matrix (see stat_matrix.py)"""
+    from stat_matrix import match_matrices, write_matrices
+    labels_path = write_matrices(stem, *match_matrices(matches))
+    print(f"Wrote stat matrix described by {labels_path}")
+    return labels_path
+
+def csv_to_json(csv_file_path, json_file_path, series_file_path=None, windows=DEFAULT_WINDOWS, db_path=None, season='',
+                shards_dir=None, schema=MATCH_SCHEMA):
+    league_average, match_rows = read_match_rows(csv_file_path, schema)
+    
+    # Start at 1 for actual matches (0 will be for league average)
+    result = [
+        build_match(match_name, rows, match_id, xpoints=False)
+        for match_id, (match_name, rows) in enumerate(match_rows.items(), 1)
+    ]
+    add_xpoints(result)
+    
+    # Add league average at the beginning
+    if league_average:
+        result.insert(0, build_league_average(league_average))
+    
+    write_match_outputs(result, json_file_path, series_file_path, windows)
+    if db_path:
+        save_to_store(result, csv_file_path, db_path, season)
+    if shards_dir:
+        from shard_export import write_shards
+        write_shards("matches", result, shards_dir)
     return result
 
+def fingerprint_rows(rows):
+    """Stable hash of a match's raw CSV rows, independent of row order"""
+    digest = hashlib.sha1()
+    for row in sorted(rows, key=lambda r: r['Team']):
+        digest.update(json.dumps(row, sort_keys=True).encode('utf-8'))
+    return digest.hexdigest()
+
+def load_match_index(index_file_path):
+    try:
+        with open(index_file_path, 'r', encoding='utf-8') as index_file:
+            return json.load(index_file)
+    except (OSError, ValueError):
+        return {'nextId': 1, 'matches': {}}
+
+def csv_to_json_incremental(csv_file_path, json_file_path, index_file_path=None, series_file_path=None, windows=DEFAULT_WINDOWS,
+                            db_path=None, season='', shards_dir=None, schema=MATCH_SCHEMA):
+    """Rebuild match_data.json re-parsing only new or changed matches.
+
+    A sidecar index maps each match name to a stable matchId and a fingerprint
+    of its raw CSV rows. The file is read once as plain strings to fingerprint
+    every match; only new or changed matches have their stats converted.
+    Unchanged matches are copied from the existing JSON; new matches get the
+    next unused id, so inserting rows never shifts other ids.
+    An index written by another CONVERTER_VERSION rebuilds every match.
+    """
+    index_file_path = index_file_path or f"{json_file_path}.index.json"
+    index = load_match_index(index_file_path)
+    
+    try:
+        with open(json_file_path, 'r', encoding='utf-8') as json_file:
+            existing = {match['match']: match for match in json.load(json_file)}
+    except (OSError, ValueError):
+        existing = {}
+    
+    header, league_average, match_rows = read_raw_match_rows(csv_file_path)
+    
+    result = []
+    rebuilt = []
+    new_index = {'version': CONVERTER_VERSION, 'nextId': index['nextId'], 'matches': {}}
+    current_version = index.get('version') == CONVERTER_VERSION
+    
+    for match_name, rows in match_rows.items():
+        fingerprint = fingerprint_rows(rows)
+        indexed = index['matches'].get(match_name)
+        
+        if indexed:
+            match_id = indexed['matchId']
+        else:
+            match_id = new_index['nextId']
+            new_index['nextId'] += 1
+        
+        previous = existing.get(match_name)
+        if current_version and indexed and indexed['fingerprint'] == fingerprint and previous and previous['matchId'] == match_id:
+            result.append(previous)
+        else:
+            rebuilt.append(build_match(match_name, parse_row_stats(header, rows, schema), match_id, xpoints=False))
+            result.append(rebuilt[-1])
+        
+        new_index['matches'][match_name] = {'matchId': match_id, 'fingerprint': fingerprint}
+    
+    add_xpoints(rebuilt)
+    changed = len(rebuilt)
+    
+    # League average is a single row, so re-parsing it is cheap
+    if league_average:
+        result.insert(0, build_league_average(parse_row_stats(header, [league_average], schema)[0]))
+    
+    removed = len(set(index['matches']) - set(match_rows))
+    print(f"Incremental update: {changed} new or changed, {len(match_rows) - changed} unchanged, {removed} removed")
+    
+    write_match_outputs(result, json_file_path, series_file_path, windows)
+    if db_path:
+        save_to_store(result, csv_file_path, db_path, season)
+    if shards_dir:
+        from shard_export import write_shards
+        write_shards("matches", result, shards_dir)
+    
+    with open(index_file_path, 'w', encoding='utf-8') as index_file:
+        json.dump(new_index, index_file, ensure_ascii=False)
+    
+    return result
+
+def rolling_mean(values, window):
+    """Trailing mean over the last `window` values; early entries average what is available"""
+    if window <= 0:
+        raise ValueError(f"Rolling window must be a positive number of matches, got {window}")
+    cumulative = np.cumsum(values)
+    lagged = np.zeros_like(cumulative)
+    lagged[window:] = cumulative[:-window]
+    counts = np.minimum(np.arange(1, len(values) + 1), window)
+    return (cumulative - lagged) / counts
+
+def positive_int(value):
+    """argparse type for --windows"""
+    number = int(value)
+    if number <= 0:
+        raise argparse.ArgumentTypeError(f"{value} is not a positive number of matches")
+    return number
+
+def build_team_series(matches, windows=DEFAULT_WINDOWS, season_length=SEASON_LENGTH):
+    """Per-team cumulative xPoints and rolling differences, in matchId order.
+
+    Each team's values are gathered into arrays once, then every series is a
+    cumulative sum or a difference of cumulative sums.
+    """
+    columns = {}
+    for match in sorted(matches, key=lambda m: m['matchId']):
+        if match['matchId'] == 0:
+            continue
+        for team_name, team_data in match['teams'].items():
+            opposition = next((t['stats'] for name, t in match['teams'].items() if name != team_name), {})
+            stats = team_data['stats']
+            team_columns = columns.setdefault(team_name, {
+                'matchIds': [], 'matches': [], 'xPoints': [], 'xG': [], 'oppXG': [],
+                'goals': [], 'oppGoals': [], 'progPass': [], 'oppProgPass': []
+            })
+            team_columns['matchIds'].append(match['matchId'])
+            team_columns['matches'].append(match['match'])
+            team_columns['xPoints'].append(stats.get('xPoints', 0))
+            team_columns['xG'].append(stats.get('xG', 0))
+            team_columns['oppXG'].append(opposition.get('xG', 0))
+            team_columns['goals'].append(stats.get('Goals', 0))
+            team_columns['oppGoals'].append(opposition.get('Goals', 0))
+            team_columns['progPass'].append(stats.get('Progressive pass success %', 0))
+            team_columns['oppProgPass'].append(opposition.get('Progressive pass success %', 0))
+    
+    teams = {}
+    for team_name, team_columns in columns.items():
+        arrays = {key: np.asarray(values, dtype=float) for key, values in team_columns.items() if key not in ('matchIds', 'matches')}
+        differences = {
+            'xgDiff': arrays['xG'] - arrays['oppXG'],
+            'progPassDiff': arrays['progPass'] - arrays['oppProgPass'],
+            'xgPerformance': (arrays['goals'] - arrays['xG']) - (arrays['oppGoals'] - arrays['oppXG'])
+        }
+        cumulative_xpoints = np.cumsum(arrays['xPoints'])
+        games_played = np.arange(1, len(cumulative_xpoints) + 1)
+        
+        teams[team_name] = {
+            'matchIds': team_columns['matchIds'],
+            'matches': team_columns['matches'],
+            'cumulativeXPoints': np.round(cumulative_xpoints, 4).tolist(),
+            'projectedXPoints': np.round(cumulative_xpoints / games_played * season_length, 4).tolist(),
+            'rolling': {
+                str(window): {
+                    name: np.round(rolling_mean(values, window), 4).tolist()
+                    for name, values in differences.items()
+                }
+                for window in windows
+            }
+        }
+    
+    return {
+        'windows': list(windows),
+        'seasonLength': season_length,
+        'teams': teams
+    }
+
 def calculate_xpoints(match):
-    """Calculate xPoints for each team in a match based on their xG share"""
-    teams = match['teams']
-    
-    # Get all team xG values
-    team_xgs = {}
-    total_xg = 0
-    
-    for team_name, team_data in teams.items():
-        xg = team_data['stats'].get('xG', 0)
-        team_xgs[team_name] = xg
-        total_xg += xg
-    
-    # Calculate xPoints for each team
-    if total_xg > 0:
-        for team_name, team_data in teams.items():
-            team_xg = team_xgs[team_name]
-            xpoints = (team_xg / total_xg) * 3
-            team_data['stats']['xPoints'] = round(xpoints, 3)
-    else:
-        # If no xG data, set xPoints to 0
-        for team_name, team_data in teams.items():
-            team_data['stats']['xPoints'] = 0
-
-def process_team_data(row):
-    # Define which fields to exclude from stats
-    excluded_fields = ['Match', 'Home', 'Date', 'Team']
-    
-    stats = {}
-    
-    # Process all other fields as stats
-    for key, value in row.items():
-        if key not in excluded_fields:
-            try:
-                if value and value.strip():
-                    # Try to convert to float first, then int if it's a whole number
-                    float_val = float(value)
-                    stats[key] = int(float_val) if float_val.is_integer() else float_val
-                else:
-                    stats[key] = 0
-            except ValueError:
-                stats[key] = 0
+    """Set each team's xPoints (3 * P(win) + P(draw) from both sides' xG) for one match.
+
+    See xpoints.py; use add_xpoints() directly for many matches at once.
+    """
+    add_xpoints([match])
+
+def process_team_data(row, stats=None):
+    """Team entry for one CSV row. Pass stats already parsed by read_match_rows();
+    without them the row is converted on its own with MATCH_SCHEMA."""
+    if stats is None:
+        stats = {
+            key: convert_cell(value, MATCH_SCHEMA.column_type(key))
+            for key, value in row.items()
+            if MATCH_SCHEMA.column_type(key) != 'raw'
+        }
     
     return {
         'name': row['Team'],
@@ -111,5 +350,32 @@ def process_team_data(row):
 
 # Usage example
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Convert match_data.csv to match_data.json and match_series.json")
+    parser.add_argument("--windows", type=positive_int, nargs="+", default=list(DEFAULT_WINDOWS),
+                        help="rolling windows (in matches) to precompute")
+    parser.add_argument("--incremental", action="store_true",
+                        help="only re-parse matches that are new or changed since the last run")
+    parser.add_argument("--db", nargs="?", const=os.path.join(DATA_DIR, 'scouting.db'),
+                        help="also write the matches into this SQLite store (see data_store.py)")
+    parser.add_argument("--season", default='', help="season label stored with the matches in --db")
+    parser.add_argument("--shards-dir", nargs="?", const=os.path.join(DATA_DIR, '..', '..', '..', 'public', 'data', 'shards'),
+                        help="also write per-team minified shards and a manifest (see shard_export.py)")
+    parser.add_argument("--schema", help="JSON column types overriding MATCH_SCHEMA (see csv_schema.py)")
+    parser.add_argument("--npy", nargs="?", const=os.path.join(DATA_DIR, 'match_data'), metavar="STEM",
+                        help="also write STEM.values.npy and STEM.labels.json for memory-mapped analysis")
+    args = parser.parse_args()
+    schema = MATCH_SCHEMA.extend(Schema.load(args.schema)) if args.schema else MATCH_SCHEMA
+    
+    csv_file_path = os.path.join(DATA_DIR, 'match_data.csv')
+    json_file_path = os.path.join(DATA_DIR, 'match_data.json')
+    series_file_path = os.path.join(DATA_DIR, 'match_series.json')
+    
     # Convert the CSV file
-    matches_data = csv_to_json('match_data.csv', 'match_data.json')
\ No newline at end of file
+    if args.incremental:
+        matches_data = csv_to_json_incremental(csv_file_path, json_file_path, series_file_path=series_file_path, windows=tuple(args.windows),
+                                               db_path=args.db, season=args.season, shards_dir=args.shards_dir, schema=schema)
+    else:
+        matches_data = csv_to_json(csv_file_path, json_file_path, series_file_path, tuple(args.windows), args.db, args.season,
+                                   args.shards_dir, schema)
+    if args.npy:
+        save_matrices(matches_data, args.npy)
\ No newline at end of file
@@ -1,91 +1,243 @@
+from bisect import bisect_left, bisect_right
 import pandas as pd
 import numpy as np
+import argparse
 import json
+import os
 
-def calculate_percentile_rank(series, reverse=False):
-    """Calculate percentile rank for a series"""
-    if reverse:
-        # For stats where lower is better, invert the values
-        series = 1 / series.replace(0, np.inf)  # Handle division by zero
-    return series.rank(pct=True) * 100
+# Bump when the output format changes so pipeline.py reconverts unchanged inputs
+CONVERTER_VERSION = 3
+DATA_DIR = os.path.dirname(os.path.abspath(__file__))
 
-def process_football_data(csv_file_path):
-    # Read the CSV file
+# Define stats that need reverse percentile ranking (lower is better)
+REVERSE_STATS = [
+    'PPDA', 'Oppo Progressive pass success %', 'Oppo Counterattacks leading to shot', 
+    'Oppo xG', 'Oppo Final third pass success %', 'Oppo open play attacks per final third entry', 'Losses low %', 'High recoveries', 'Med recoveries', ' Oppo counter threat'
+]
+
+# Teams are only ranked against rows sharing these values (League is used when the CSV has it)
+GROUP_COLUMNS = ['Season', 'League']
+
+def calculate_percentile_rank(values, reverse_columns=(), groups=None):
+    """Calculate percentile ranks for every column of a numeric frame in one pass.
+
+    Columns in reverse_columns are stats where lower is better; their values are
+    inverted before ranking. With `groups` (keys aligned to values' rows), each
+    row is ranked only against rows in the same group.
+    """
+    reverse_columns = [col for col in values.columns if col in reverse_columns]
+    if reverse_columns:
+        values = values.copy()
+        values[reverse_columns] = 1 / values[reverse_columns].replace(0, np.inf)  # Handle division by zero
+    if groups is not None:
+        return values.groupby(groups, dropna=False).rank(pct=True) * 100
+    return values.rank(pct=True) * 100
+
+def group_columns(df):
+    return [col for col in GROUP_COLUMNS if col in df.columns]
+
+def add_derived_stats(df):
+    """Return df with the calculated stats appended as one block of columns"""
+    derived = {}
+    derived['Final third entries'] = df['Total final third passes'] * (df['Final third pass success %'] / 100)
+    derived['Oppo final third entries'] = df['Oppo Total final third passes'] * (df['Oppo Final third pass success %'] / 100)
+    derived['Losses low %'] = (df['Low losses'] / df['Total losses']) * 100
+    derived['Recoveries high %'] = (df['High recoveries'] / df['Total recoveries']) * 100
+    derived['Recoveries med %'] = (df['Med recoveries'] / df['Total recoveries']) * 100
+    derived['xG per final third entry'] = df['xG'] / derived['Final third entries']
+    derived['Oppo open play attacks per final third entry'] = df['Oppo Positional attacks leading to shot'] / derived['Oppo final third entries']
+    derived['Oppo counter threat'] = df['Oppo Total counterattacks'] / df['Oppo Total positional attacks']
+    return pd.concat([df, pd.DataFrame(derived, index=df.index)], axis=1)
+
+def build_records(teams, seasons, numeric_columns, values, percentiles, leagues=None):
+    """Serialize team rows to the {team, season, stats: {col: {value, percentile}}} layout"""
+    value_rows = values.to_numpy(dtype=float).tolist()
+    percentile_rows = percentiles.to_numpy(dtype=float).tolist()
+
+    records = [
+        {
+            'team': team,
+            'season': season,
+            'stats': {
+                col: {'value': value, 'percentile': percentile}
+                for col, value, percentile in zip(numeric_columns, value_row, percentile_row)
+            }
+        }
+        for team, season, value_row, percentile_row in zip(teams, seasons, value_rows, percentile_rows)
+    ]
+    if leagues is not None:
+        for record, league in zip(records, leagues):
+            record['league'] = league
+    return records
+
+def load_team_rows(csv_file_path):
+    """Read an oppo CSV with derived stats added. Returns (df, numeric_columns)."""
     df = pd.read_csv(csv_file_path)
     
     # Calculate new stats
-    df['Final third entries'] = df['Total final third passes'] * (df['Final third pass success %'] / 100)
-    df['Oppo final third entries'] = df['Oppo Total final third passes'] * (df['Oppo Final third pass success %'] / 100)
-    df['Losses low %'] = (df['Low losses'] / df['Total losses']) * 100
-    df['Recoveries high %'] = (df['High recoveries'] / df['Total recoveries']) * 100
-    df['Recoveries med %'] = (df['Med recoveries'] / df['Total recoveries']) * 100
-    df['xG per final third entry'] = df['xG'] / df['Final third entries']
-    df['Oppo open play attacks per final third entry'] = df['Oppo Positional attacks leading to shot'] / df['Oppo final third entries']
-    df['Oppo counter threat'] = df['Oppo Total counterattacks'] / df['Oppo Total positional attacks']
+    df = add_derived_stats(df)
     
     # Replace inf and NaN values with 0 for the calculated stats
     df = df.replace([np.inf, -np.inf, np.nan], 0)
     
-    # Define stats that need reverse percentile ranking (lower is better)
-    reverse_stats = [
-        'PPDA', 'Oppo Progressive pass success %', 'Oppo Counterattacks leading to shot', 
-        'Oppo xG', 'Oppo Final third pass success %', 'Oppo open play attacks per final third entry', 'Losses low %', 'High recoveries', 'Med recoveries', ' Oppo counter threat'
-    ]
-    
     # Get all numeric columns for percentile calculation
     numeric_columns = df.select_dtypes(include=[np.number]).columns.tolist()
-    # Remove Team and Season if they're numeric (they shouldn't be, but just in case)
-    numeric_columns = [col for col in numeric_columns if col not in ['Team', 'Season']]
-    
-    # Calculate percentile ranks for all numeric stats
-    percentile_data = {}
-    for col in numeric_columns:
-        if col in reverse_stats:
-            percentile_data[f'{col}_percentile'] = calculate_percentile_rank(df[col], reverse=True)
-        else:
-            percentile_data[f'{col}_percentile'] = calculate_percentile_rank(df[col], reverse=False)
-    
-    # Add percentile columns to dataframe
-    for col, data in percentile_data.items():
-        df[col] = data
+    # Remove Team, Season and League if they're numeric (they shouldn't be, but just in case)
+    numeric_columns = [col for col in numeric_columns if col not in ['Team'] + GROUP_COLUMNS]
+    return df, numeric_columns
+
+def process_football_data(csv_file_path):
+    return rank_team_rows(*load_team_rows(csv_file_path))
+
+def rank_team_rows(df, numeric_columns):
+    """Records for every row of a load_team_rows() frame, ranked within their groups"""
+    # Calculate percentile ranks for all numeric stats, within season (and league)
+    values = df[numeric_columns]
+    groups = [df[col].astype(str) for col in group_columns(df)]
+    percentiles = calculate_percentile_rank(values, REVERSE_STATS, groups or None)
     
     # Convert to JSON format
-    result = []
+    return build_records(
+        df['Team'].tolist(), df['Season'].tolist(), numeric_columns,
+        values.fillna(0), percentiles.fillna(0),
+        df['League'].tolist() if 'League' in df.columns else None
+    )
+
+def _rank_value(stat, value):
+    """Value as ranked by calculate_percentile_rank (reverse stats are inverted, 0 -> 0)"""
+    if stat in REVERSE_STATS:
+        return 1 / value if value != 0 else 0.0
+    return value
+
+def _record_group(record):
+    return (str(record['season']), str(record.get('league', '')))
+
+def update_football_data(records, changed_csv_path):
+    """Apply changed or new team rows to existing records, re-ranking only what they affect.
+
+    Rows are matched to records by (team, season). Only the (group, stat)
+    pairs where a value changed are re-ranked: each gets a sorted array of the
+    group's values, and every team in the group is located in it by binary
+    search, giving the same average-rank percentiles as a full run.
+    Returns the updated records and the number of re-ranked (group, stat) pairs.
+    """
+    return apply_team_rows(records, *load_team_rows(changed_csv_path))
+
+def apply_team_rows(records, df, numeric_columns):
+    """update_football_data() for rows already loaded with load_team_rows()"""
+    position = {(record['team'], str(record['season'])): i for i, record in enumerate(records)}
+    leagues = df['League'].tolist() if 'League' in df.columns else [None] * len(df)
     
-    for _, row in df.iterrows():
-        team_data = {
-            'team': row['Team'],
-            'season': row['Season'],
-            'stats': {}
-        }
+    affected = {}
+    value_rows = df[numeric_columns].to_numpy(dtype=float).tolist()
+    for team, season, league, value_row in zip(df['Team'], df['Season'], leagues, value_rows):
+        key = (team, str(season))
+        new_values = dict(zip(numeric_columns, value_row))
         
-        # Add all stats with their values and percentile ranks
-        for col in numeric_columns:
-            team_data['stats'][col] = {
-                'value': float(row[col]) if pd.notna(row[col]) else 0,
-                'percentile': float(row[f'{col}_percentile']) if pd.notna(row[f'{col}_percentile']) else 0
-            }
+        if key in position:
+            record = records[position[key]]
+            changed = [stat for stat, value in new_values.items() if record['stats'].get(stat, {}).get('value') != value]
+            for stat in changed:
+                record['stats'][stat] = {'value': new_values[stat], 'percentile': 0.0}
+        else:
+            record = {'team': team, 'season': season,
+                      'stats': {stat: {'value': value, 'percentile': 0.0} for stat, value in new_values.items()}}
+            if league is not None:
+                record['league'] = league
+            position[key] = len(records)
+            records.append(record)
+            # A new row shifts every column of its group
+            changed = numeric_columns
         
-        result.append(team_data)
+        affected.setdefault(_record_group(record), set()).update(changed)
+    
+    members = {}
+    for record in records:
+        members.setdefault(_record_group(record), []).append(record)
     
-    return result
+    reranked = 0
+    for group, stats in affected.items():
+        group_records = members[group]
+        for stat in stats:
+            ranked = [_rank_value(stat, record['stats'][stat]['value']) for record in group_records if stat in record['stats']]
+            ordered = sorted(ranked)
+            count = len(ordered)
+            for record, value in zip((r for r in group_records if stat in r['stats']), ranked):
+                below = bisect_left(ordered, value)
+                ties = bisect_right(ordered, value) - below
+                record['stats'][stat]['percentile'] = (below + (ties + 1) / 2) / count * 100
+            reranked += 1
+    
+    return records, reranked
 
 def save_to_json(data, output_file_path):
     """Save the processed data to a JSON file"""
     with open(output_file_path, 'w') as f:
         json.dump(data, f, indent=2)
 
+def save_columnar(data, output_file_path, report=True):
+    """Write the columnar layout (see columnar.py) and compare it with oppo_data.json"""
+    from columnar import encode_team_stats, write_columnar, format_report
+    payload = encode_team_stats(data)
+    write_columnar(payload, output_file_path)
+    print(f"Wrote columnar team stats to {output_file_path}")
+    if report:
+        print(format_report(data, payload))
+    return payload
+
+def save_matrices(data, stem):
+    """Write values and percentiles as memory-mappable .npy matrices (see stat_matrix.py)"""
+    from stat_matrix import oppo_matrices, write_matrices
+    labels_path = write_matrices(stem, *oppo_matrices(data))
+    print(f"Wrote stat matrices described by {labels_path}")
+    return labels_path
+
+def save_to_store(data, csv_file_path, db_path):
+    """Replace this CSV's team-season rows in the SQLite store"""
+    from data_store import DataStore, store_source
+    with DataStore(db_path) as store:
+        count = store.write_team_seasons(store_source(csv_file_path), data)
+    print(f"Stored {count} team seasons in {db_path}")
+
 # Usage
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Convert oppo_data.csv to oppo_data.json with percentile ranks")
+    parser.add_argument("--db", nargs="?", const=os.path.join(DATA_DIR, "scouting.db"),
+                        help="also write the team seasons into this SQLite store (see data_store.py)")
+    parser.add_argument("--shards-dir", nargs="?", const=os.path.join(DATA_DIR, "..", "..", "..", "public", "data", "shards"),
+                        help="also write per-team and per-season minified shards and a manifest (see shard_export.py)")
+    parser.add_argument("--update", metavar="CHANGED_CSV",
+                        help="apply changed or new team rows from this CSV to the existing oppo_data.json, "
+                             "re-ranking only the affected season groups and stats")
+    parser.add_argument("--columnar", nargs="?", const=os.path.join(DATA_DIR, "oppo_data.columnar.json"),
+                        help="also write the columnar layout and report its size and parse time")
+    parser.add_argument("--npy", nargs="?", const=os.path.join(DATA_DIR, "oppo_data"), metavar="STEM",
+                        help="also write STEM.values.npy, STEM.percentiles.npy and STEM.labels.json for memory-mapped analysis")
+    args = parser.parse_args()
+
     # Process the data
-    csv_file_path = "src/utils/data/oppo_data.csv"
+    csv_file_path = os.path.join(DATA_DIR, "oppo_data.csv")
     
     try:
-        processed_data = process_football_data(csv_file_path)
+        output_file_path = os.path.join(DATA_DIR, "oppo_data.json")
+        if args.update:
+            with open(output_file_path, 'r') as f:
+                processed_data, reranked = update_football_data(json.load(f), args.update)
+            print(f"Re-ranked {reranked} (season group, stat) columns from {args.update}")
+        else:
+            processed_data = process_football_data(csv_file_path)
         
         # Save to JSON file
-        output_file_path = "src/utils/data/oppo_data.json"
         save_to_json(processed_data, output_file_path)
+        if args.db:
+            save_to_store(processed_data, csv_file_path, args.db)
+        if args.shards_dir:
+            from shard_export import write_shards
+            write_shards("oppo", processed_data, args.shards_dir)
+        if args.columnar:
+            save_columnar(processed_data, args.columnar)
+        if args.npy:
+            save_matrices(processed_data, args.npy)
         
         print(f"Successfully processed {len(processed_data)} teams")
         print(f"Data saved to {output_file_path}")
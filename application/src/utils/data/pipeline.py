@@ -0,0 +1,207 @@
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import argparse
+import hashlib
+import importlib
+import json
+import os
+import time
+
+DATA_DIR = os.path.dirname(os.path.abspath(__file__))
+STATE_FILE = ".pipeline_state.json"
+
+# CSV filename prefix -> converter module. Inputs are found anywhere under the
+# root, e.g. seasons/24-25/national-league-south/oppo_data.csv
+CONVERTERS = {
+    "match_data": "match_csv_converter",
+    "oppo_data": "oppo_csv_converter",
+    "player_data": "player_csv_converter"
+}
+# Converter module -> shard_export kind
+SHARD_KINDS = {
+    "match_csv_converter": "matches",
+    "oppo_csv_converter": "oppo",
+    "player_csv_converter": "players"
+}
+
+def find_inputs(root):
+    """Yield (converter_module, csv_path) for every converter input under root"""
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = sorted(d for d in dirnames if not d.startswith('.') and d != 'node_modules')
+        for filename in sorted(filenames):
+            if not filename.endswith('.csv'):
+                continue
+            for prefix, module_name in CONVERTERS.items():
+                if filename.startswith(prefix):
+                    yield module_name, os.path.join(dirpath, filename)
+                    break
+
+def input_season(csv_path, root):
+    """Season directory of an input laid out as seasons/<season>/..., or ''"""
+    parts = os.path.relpath(csv_path, root).split(os.sep)
+    return parts[1] if len(parts) > 2 and parts[0] == "seasons" else ''
+
+def hash_file(path, chunk_size=1 << 20):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def output_paths(module_name, csv_path, root, output_dir):
+    """JSON outputs for an input, mirroring its location under root into output_dir"""
+    relative_dir = os.path.dirname(os.path.relpath(csv_path, root))
+    target_dir = os.path.join(output_dir, relative_dir)
+    stem = os.path.splitext(os.path.basename(csv_path))[0]
+
+    paths = [os.path.join(target_dir, f"{stem}.json")]
+    if module_name == "match_csv_converter":
+        paths.append(os.path.join(target_dir, f"{stem.replace('match_data', 'match_series', 1)}.json"))
+    return paths
+
+def run_conversion(module_name, csv_path, outputs, db_path=None, season=''):
+    """Worker entry point: convert one CSV and return (csv_path, seconds).
+    season labels the matches written into the store; team and player rows carry their own."""
+    start_time = time.perf_counter()
+    converter = importlib.import_module(module_name)
+    os.makedirs(os.path.dirname(outputs[0]), exist_ok=True)
+
+    if module_name == "match_csv_converter":
+        converter.csv_to_json(csv_path, outputs[0], outputs[1], db_path=db_path, season=season)
+    elif module_name == "oppo_csv_converter":
+        data = converter.process_football_data(csv_path)
+        converter.save_to_json(data, outputs[0])
+        if db_path:
+            converter.save_to_store(data, csv_path, db_path)
+    else:
+        converter.csv_to_json(csv_path, outputs[0], db_path=db_path)
+
+    return csv_path, time.perf_counter() - start_time
+
+def load_state(path):
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def write_pipeline_shards(inputs, state, shards_dir):
+    """Shard every input of each kind together into <shards_dir>/<kind>, the one tree shardLoader.ts reads.
+
+    inputs is [(key, module_name, outputs, fingerprint)]. A kind is resharded
+    when any of its inputs changed since the last run or its manifest is missing.
+    """
+    from shard_export import MANIFEST_FILE, write_shards
+
+    by_kind = {}
+    for key, module_name, outputs, fingerprint in inputs:
+        by_kind.setdefault(SHARD_KINDS[module_name], []).append((key, outputs[0], fingerprint))
+
+    for kind, kind_inputs in by_kind.items():
+        fingerprint = {"dir": os.path.abspath(shards_dir), "inputs": {key: fp for key, _, fp in kind_inputs}}
+        state_key = f"shards:{kind}"
+        if state.get(state_key) == fingerprint and os.path.exists(os.path.join(shards_dir, kind, MANIFEST_FILE)):
+            print(f"⏭️  Shards up to date: {kind}")
+            continue
+
+        records = []
+        for key, output_path, _ in kind_inputs:
+            try:
+                with open(output_path, 'r', encoding='utf-8') as f:
+                    records += json.load(f)
+            except (OSError, ValueError) as e:
+                print(f"⚠️ No {kind} output to shard for {key}: {e}")
+        write_shards(kind, records, shards_dir)
+        state[state_key] = fingerprint
+
+def run_pipeline(root=DATA_DIR, output_dir=None, workers=None, force=False, db_path=None, shards_dir=None):
+    """Convert every changed CSV under root in parallel.
+
+    An input is skipped when its content hash and its converter's
+    CONVERTER_VERSION match the last successful run and all outputs exist.
+    With db_path, converted inputs are also written into that SQLite store.
+    With shards_dir, the outputs of every input of a kind are sharded together
+    into <shards_dir>/<kind> once the conversions finish.
+    """
+    output_dir = output_dir or root
+    state_path = os.path.join(output_dir, STATE_FILE)
+    state = load_state(state_path)
+    timings = {}
+    total_start = time.perf_counter()
+
+    stage_start = time.perf_counter()
+    inputs = list(find_inputs(root))
+    timings['discover'] = time.perf_counter() - stage_start
+
+    stage_start = time.perf_counter()
+    jobs = []
+    discovered = []
+    for module_name, csv_path in inputs:
+        version = importlib.import_module(module_name).CONVERTER_VERSION
+        outputs = output_paths(module_name, csv_path, root, output_dir)
+        fingerprint = {"hash": hash_file(csv_path), "converter": module_name, "version": version}
+        season = input_season(csv_path, root)
+        if db_path:
+            # Inputs converted before the store was in use (or stored without
+            # their season) still need writing into it
+            fingerprint["db"] = os.path.abspath(db_path)
+            fingerprint["season"] = season
+        key = os.path.relpath(csv_path, root)
+        discovered.append((key, module_name, outputs, fingerprint))
+
+        if not force and state.get(key) == fingerprint and all(os.path.exists(p) for p in outputs + ([db_path] if db_path else [])):
+            print(f"⏭️  Up to date: {key}")
+            continue
+        jobs.append((key, module_name, csv_path, outputs, fingerprint, season))
+    timings['hash + version check'] = time.perf_counter() - stage_start
+
+    stage_start = time.perf_counter()
+    failures = 0
+    if jobs:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = {
+                executor.submit(run_conversion, module_name, csv_path, outputs, db_path, season): (key, fingerprint)
+                for key, module_name, csv_path, outputs, fingerprint, season in jobs
+            }
+            for future in as_completed(futures):
+                key, fingerprint = futures[future]
+                try:
+                    _, seconds = future.result()
+                    timings[f"convert {key}"] = seconds
+                    state[key] = fingerprint
+                    print(f"✅ Converted {key} in {seconds:.2f}s")
+                except Exception as e:
+                    failures += 1
+                    print(f"❌ Failed to convert {key}: {e}")
+    timings['convert (wall)'] = time.perf_counter() - stage_start
+
+    if shards_dir:
+        stage_start = time.perf_counter()
+        # Failed inputs keep their old fingerprint, so their kind is resharded once they convert
+        write_pipeline_shards([(key, module_name, outputs, state.get(key)) for key, module_name, outputs, _ in discovered],
+                              state, shards_dir)
+        timings['shards'] = time.perf_counter() - stage_start
+
+    os.makedirs(output_dir, exist_ok=True)
+    with open(state_path, 'w', encoding='utf-8') as f:
+        json.dump(state, f, indent=2)
+
+    timings['total'] = time.perf_counter() - total_start
+
+    print(f"\n📊 {len(inputs)} inputs, {len(jobs)} converted, {len(inputs) - len(jobs)} skipped, {failures} failed")
+    for stage, seconds in timings.items():
+        print(f"  {stage:<50} {seconds:8.3f}s")
+
+    return timings
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Convert every match/oppo/player CSV under a directory in parallel")
+    parser.add_argument("--root", default=DATA_DIR, help="directory searched recursively for CSV inputs")
+    parser.add_argument("--output-dir", help="where JSON outputs are written, mirroring the input layout (default: next to inputs)")
+    parser.add_argument("--workers", type=int, help="process pool size (default: CPU count)")
+    parser.add_argument("--force", action="store_true", help="reconvert even if inputs are unchanged")
+    parser.add_argument("--db", nargs="?", const=os.path.join(DATA_DIR, "scouting.db"),
+                        help="also write every converted input into this SQLite store (see data_store.py)")
+    parser.add_argument("--shards-dir", help="also write minified shards, manifests and gzip sidecars here (see shard_export.py)")
+    args = parser.parse_args()
+
+    run_pipeline(args.root, args.output_dir, args.workers, args.force, args.db, args.shards_dir)
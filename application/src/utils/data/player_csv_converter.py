@@ -1,79 +1,288 @@
+from array import array
+from bisect import bisect_left
+import argparse
 import csv
 import json
+import os
+import time
+import pandas as pd
 
-def csv_to_json(csv_file_path, json_file_path):
-    # Define the top-level fields that should be at the same level as 'stats'
-    top_level_fields = [
-        'Player', 'Team within selected timeframe', 'Season', 'Position', 
-        'Age', 'Contract expires', 'Minutes played', 'Passport country', 
-        'Foot', 'Height', 'League'
+from csv_schema import Schema, read_table
+
+# Bump when the output format changes so pipeline.py reconverts unchanged inputs
+CONVERTER_VERSION = 3
+DATA_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Define the top-level fields that should be at the same level as 'stats'
+TOP_LEVEL_FIELDS = [
+    'Player', 'Team within selected timeframe', 'Season', 'Position', 
+    'Age', 'Contract expires', 'Minutes played', 'Passport country', 
+    'Foot', 'Height', 'League'
+]
+
+# Mapping for cleaner key names
+FIELD_MAPPING = {
+    'Player': 'name',
+    'Team within selected timeframe': 'team',
+    'Season': 'season',
+    'Position': 'position',
+    'Age': 'age',
+    'Contract expires': 'contract',
+    'Minutes played': 'minutes',
+    'Passport country': 'passport',
+    'Foot': 'foot',
+    'Height': 'height',
+    'League': 'league'
+}
+
+NUMERIC_TOP_LEVEL_FIELDS = ['age', 'minutes', 'height']
+
+# Column types for csv_schema: numeric top-level fields are int (float if they
+# contain '.'), other top-level fields text, and every stat column a float.
+# Unparseable numbers are kept as their raw string.
+PLAYER_SCHEMA = Schema(
+    {key: 'integer' if FIELD_MAPPING[key] in NUMERIC_TOP_LEVEL_FIELDS else 'text' for key in TOP_LEVEL_FIELDS},
+    default='float'
+)
+
+def primary_position(position):
+    """First listed position, e.g. 'CF, LW' -> 'CF'"""
+    return str(position).split(',')[0].strip()
+
+def is_numeric_stat(value):
+    """A parsed float stat, or an empty stat cell (which PLAYER_SCHEMA parses as int 0)"""
+    return isinstance(value, float) or (type(value) is int and value == 0)
+
+def add_percentile_ranks(players):
+    """Replace each numeric stat with {value, percentile}, ranked within position and league.
+
+    Zero values are treated as missing, matching the frontend's previous ranking:
+    percentile = share of non-zero peers with a strictly lower value. Empty
+    cells become {value: 0, percentile: 0.0}, so every numeric stat has one shape.
+    """
+    if not players:
+        return players
+
+    numeric_keys = list(dict.fromkeys(
+        key for player in players for key, value in player['stats'].items() if is_numeric_stat(value)
+    ))
+    values = pd.DataFrame(
+        [{key: value for key, value in player['stats'].items() if is_numeric_stat(value)} for player in players],
+        columns=numeric_keys, dtype=float
+    )
+
+    group_keys = [
+        pd.Series([primary_position(player['position']) for player in players]),
+        pd.Series([str(player['league']) for player in players])
     ]
+    grouped = values.where(values != 0).groupby(group_keys, dropna=False)
+    ranks = grouped.rank(method='min')
+    counts = grouped.transform('count')
+    percentiles = ((ranks - 1) / counts * 100).fillna(0).round(1)
+
+    present = values.notna().to_numpy()
+    for player, percentile_row, present_row in zip(players, percentiles.to_numpy().tolist(), present):
+        stats = player['stats']
+        for key, percentile, is_present in zip(numeric_keys, percentile_row, present_row):
+            if is_present:
+                stats[key] = {'value': stats[key], 'percentile': percentile}
+
+    return players
+
+def save_to_store(players, csv_file_path, db_path):
+    """Replace this CSV's players in the SQLite store. `players` may be a generator."""
+    from data_store import DataStore, store_source
+    with DataStore(db_path) as store:
+        count = store.write_players(store_source(csv_file_path), players)
+    print(f"Stored {count} players in {db_path}")
+    return count
+
+def save_columnar(players, output_file_path, report=True):
+    """Write the columnar layout (see columnar.py) and compare it with player_data.json"""
+    from columnar import encode_players, write_columnar, format_report
+    payload = encode_players(players)
+    write_columnar(payload, output_file_path)
+    print(f"Wrote columnar players to {output_file_path}")
+    if report:
+        print(format_report(players, payload))
+    return payload
+
+def csv_to_json(csv_file_path, json_file_path, db_path=None, shards_dir=None, schema=PLAYER_SCHEMA):
+    # Convert each column in one pass, then assemble players row by row
+    table = read_table(csv_file_path, schema)
+    print(table.report.summary())
     
-    # Mapping for cleaner key names
-    field_mapping = {
-        'Player': 'name',
-        'Team within selected timeframe': 'team',
-        'Season': 'season',
-        'Position': 'position',
-        'Age': 'age',
-        'Contract expires': 'contract',
-        'Minutes played': 'minutes',
-        'Passport country': 'passport',
-        'Foot': 'foot',
-        'Height': 'height',
-        'League': 'league'
-    }
+    top_level = [key for key in table.header if key in TOP_LEVEL_FIELDS]
+    clean_keys = [FIELD_MAPPING.get(key, key.lower().replace(' ', '_')) for key in top_level]
+    stat_keys = [key for key in table.header if key not in TOP_LEVEL_FIELDS]
     
     players = []
+    for fields, stats in zip(table.parsed_rows(top_level), table.parsed_rows(stat_keys)):
+        player = dict(zip(clean_keys, fields.values()))
+        player['stats'] = stats
+        players.append(player)
     
-    with open(csv_file_path, 'r', encoding='utf-8') as file:
-        csv_reader = csv.DictReader(file)
-        
-        for row in csv_reader:
-            player = {}
-            stats = {}
-            
-            # Process each field in the row
-            for key, value in row.items():
-                if key in top_level_fields:
-                    # Map to cleaner field name and add to top level
-                    clean_key = field_mapping.get(key, key.lower().replace(' ', '_'))
-                    
-                    # Convert numeric fields
-                    if clean_key in ['age', 'minutes', 'height']:
-                        try:
-                            if value and value.strip():
-                                player[clean_key] = float(value) if '.' in value else int(value)
-                            else:
-                                player[clean_key] = 0
-                        except ValueError:
-                            player[clean_key] = value
-                    else:
-                        player[clean_key] = value if value and value.strip() else 0
-                else:
-                    # Add to stats object
-                    try:
-                        if value and value.strip():
-                            stats[key] = float(value)
-                        else:
-                            stats[key] = 0
-                    except ValueError:
-                        stats[key] = value
-            
-            player['stats'] = stats
-            players.append(player)
+    # Rank every numeric stat within position and league
+    add_percentile_ranks(players)
     
     # Write to JSON file
     with open(json_file_path, 'w', encoding='utf-8') as json_file:
         json.dump(players, json_file, indent=2, ensure_ascii=False)
     
     print(f"Converted {len(players)} players to {json_file_path}")
+    if db_path:
+        save_to_store(players, csv_file_path, db_path)
+    if shards_dir:
+        from shard_export import write_shards
+        write_shards("players", players, shards_dir)
     return players
 
+def build_row_parser(header, schema=PLAYER_SCHEMA):
+    """Decide each column's role and converter once from the header.
+
+    Returns a function mapping a csv.reader row to the same player dict
+    csv_to_json() builds, without per-cell field lookups.
+    """
+    top_level = []
+    stat_columns = []
+    for index, key, convert in schema.cell_converters(header):
+        if key in TOP_LEVEL_FIELDS:
+            top_level.append((index, FIELD_MAPPING.get(key, key.lower().replace(' ', '_')), convert))
+        else:
+            stat_columns.append((index, key, convert))
+
+    width = len(header)
+
+    def parse_row(row):
+        if len(row) < width:
+            row = row + [''] * (width - len(row))
+        player = {clean_key: convert(row[index]) for index, clean_key, convert in top_level}
+        player['stats'] = {key: convert(row[index]) for index, key, convert in stat_columns}
+        return player
+
+    return parse_row
+
+def iter_players(csv_file_path, schema=PLAYER_SCHEMA):
+    """Yield one parsed player dict per CSV row"""
+    with open(csv_file_path, 'r', encoding='utf-8', newline='') as file:
+        csv_reader = csv.reader(file)
+        header = next(csv_reader, None)
+        if header is None:
+            return
+        parse_row = build_row_parser(header, schema)
+        for row in csv_reader:
+            yield parse_row(row)
+
+def _group_key(player):
+    return (primary_position(player['position']), str(player['league']))
+
+def collect_rank_tables(csv_file_path, schema=PLAYER_SCHEMA):
+    """First streaming pass: sorted non-zero values per (position, league) group and stat.
+
+    Values are kept in compact float arrays rather than player dicts, so memory
+    scales with the numeric cells only.
+    """
+    tables = {}
+    for player in iter_players(csv_file_path, schema):
+        group = tables.setdefault(_group_key(player), {})
+        for key, value in player['stats'].items():
+            if isinstance(value, float) and value == value and value != 0:
+                group.setdefault(key, array('d')).append(value)
+
+    for group in tables.values():
+        for key, values in group.items():
+            group[key] = array('d', sorted(values))
+    return tables
+
+def csv_to_json_streaming(csv_file_path, json_file_path, rank=True, progress_every=50000, db_path=None, schema=PLAYER_SCHEMA):
+    """Convert players row by row, writing each array item to disk as it is produced.
+
+    Output matches csv_to_json() except that each player is written on one line.
+    With rank=True a first pass builds per-group sorted value tables for the
+    percentile lookup; with rank=False memory stays flat regardless of file size.
+    With db_path, each player is also inserted into the SQLite store as it is written.
+    """
+    start_time = time.perf_counter()
+    tables = collect_rank_tables(csv_file_path, schema) if rank else None
+
+    count = 0
+    with open(json_file_path, 'w', encoding='utf-8') as json_file:
+        json_file.write('[')
+
+        def written_players():
+            nonlocal count
+            for player in iter_players(csv_file_path, schema):
+                if tables is not None:
+                    group = tables.get(_group_key(player), {})
+                    stats = player['stats']
+                    for key, value in stats.items():
+                        if is_numeric_stat(value) and value == value:
+                            values = group.get(key)
+                            percentile = 0.0
+                            if value != 0 and values:
+                                percentile = round(bisect_left(values, value) / len(values) * 100, 1)
+                            stats[key] = {'value': value, 'percentile': percentile}
+
+                json_file.write(',\n' if count else '\n')
+                json_file.write(json.dumps(player, ensure_ascii=False))
+                count += 1
+
+                if progress_every and count % progress_every == 0:
+                    print(f"  {count} rows ({count / (time.perf_counter() - start_time):.0f} rows/sec)")
+                yield player
+
+        # The store consumes the generator, so each row goes to both outputs in one pass
+        if db_path:
+            save_to_store(written_players(), csv_file_path, db_path)
+        else:
+            for _ in written_players():
+                pass
+        json_file.write('\n]\n')
+
+    elapsed = time.perf_counter() - start_time
+    rate = count / elapsed if elapsed > 0 else 0
+    print(f"Converted {count} players to {json_file_path} in {elapsed:.2f}s ({rate:.0f} rows/sec)")
+    return count
+
 # Usage example
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Convert a Wyscout player export to player_data.json")
+    parser.add_argument("--stream", action="store_true",
+                        help="write players as they are parsed instead of building the whole list in memory")
+    parser.add_argument("--no-rank", action="store_true",
+                        help="with --stream, skip percentile ranking for constant memory")
+    parser.add_argument("--db", nargs="?", const=os.path.join(DATA_DIR, 'scouting.db'),
+                        help="also write the players into this SQLite store (see data_store.py)")
+    parser.add_argument("--shards-dir", nargs="?", const=os.path.join(DATA_DIR, '..', '..', '..', 'public', 'data', 'shards'),
+                        help="also write per-team, league/position and season shards and a manifest (see shard_export.py); "
+                             "not available with --stream")
+    parser.add_argument("--similarity", action="store_true",
+                        help="also write player_similarity.json (top-k neighbours per player) and player_similarity.npz "
+                             "(matrices for player_similarity.py queries); not available with --stream")
+    parser.add_argument("--columnar", nargs="?", const=os.path.join(DATA_DIR, 'player_data.columnar.json'),
+                        help="also write the columnar layout and report its size and parse time; not available with --stream")
+    parser.add_argument("--schema", help="JSON column types overriding PLAYER_SCHEMA (see csv_schema.py)")
+    args = parser.parse_args()
+    schema = PLAYER_SCHEMA.extend(Schema.load(args.schema)) if args.schema else PLAYER_SCHEMA
+
+    csv_file_path = os.path.join(DATA_DIR, 'player_data.csv')
+    json_file_path = os.path.join(DATA_DIR, 'player_data.json')
+
+    if args.stream and (args.shards_dir or args.columnar or args.similarity):
+        parser.error("--shards-dir, --columnar and --similarity need the full player list; run without --stream")
+
+    if args.stream:
+        csv_to_json_streaming(csv_file_path, json_file_path, rank=not args.no_rank, db_path=args.db, schema=schema)
+        raise SystemExit(0)
+
     # Convert the CSV file
-    players_data = csv_to_json('player_data.csv', 'player_data.json')
+    players_data = csv_to_json(csv_file_path, json_file_path, args.db, args.shards_dir, schema)
+    if args.columnar:
+        save_columnar(players_data, args.columnar)
+    if args.similarity:
+        from player_similarity import build_similarity_outputs
+        build_similarity_outputs(players_data, os.path.join(DATA_DIR, 'player_similarity.json'),
+                                 os.path.join(DATA_DIR, 'player_similarity.npz'))
     
     # Print first player as example
     if players_data:
@@ -0,0 +1,260 @@
+import argparse
+import json
+import os
+import time
+import numpy as np
+
+from player_csv_converter import primary_position
+
+DATA_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_K = 10
+DEFAULT_BATCH_SIZE = 512
+
+# Wyscout primary position -> the position groups PlayerView.tsx uses
+POSITION_GROUPS = {
+    'GK': 'GK',
+    'CB': 'CB', 'LCB': 'CB', 'RCB': 'CB',
+    'LB': 'FB', 'RB': 'FB', 'LWB': 'FB', 'RWB': 'FB',
+    'DMF': 'CM', 'LDMF': 'CM', 'RDMF': 'CM', 'CMF': 'CM', 'LCMF': 'CM', 'RCMF': 'CM', 'AMF': 'CM',
+    'LW': 'WIDE', 'RW': 'WIDE', 'LWF': 'WIDE', 'RWF': 'WIDE', 'LAMF': 'WIDE', 'RAMF': 'WIDE', 'LM': 'WIDE', 'RM': 'WIDE',
+    'CF': 'FW'
+}
+
+# Stat families usable as weighting keys; stats missing from an export are ignored
+STAT_FAMILIES = {
+    'defending': ['Defensive duels won, %', 'Successful defensive actions per 90', 'PAdj Interceptions',
+                  'Defensive duels per 90', 'Interceptions per 90'],
+    'aerial': ['Aerial duels per 90', 'Aerial duels won, %'],
+    'goal_threat': ['xG per 90', 'Goals per 90', 'xG/shot', 'Shots per 90', 'Touches in box per 90', 'xG performance'],
+    'creation': ['xA per 90', 'xA/shot assist', 'Shot assists per 90', 'Key passes per 90', 'Deep completions per 90',
+                 'Through passes per 90', 'Passes to penalty area per 90', 'Crosses per 90'],
+    'progression': ['Progressive passes per 90', 'Passes to final third per 90', 'Accurate progressive passes, %',
+                    'Accurate passes to final third, %', 'Progressive runs per 90', 'Successful dribbles per 90',
+                    'Accelerations per 90'],
+    'passing': ['Passes per 90', 'Accurate passes, %', 'Accurate short / medium passes, %']
+}
+
+def position_group(position):
+    return POSITION_GROUPS.get(primary_position(position).upper(), 'OTHER')
+
+def stat_value(entry):
+    """Numeric value of a converter stat entry ({value, percentile} or a bare value), else NaN"""
+    if isinstance(entry, dict):
+        entry = entry.get('value')
+    return float(entry) if isinstance(entry, (int, float)) else np.nan
+
+def column_weights(stats, weights=None):
+    """Per-column weights from {family or stat name: weight}.
+
+    With no weights every column counts equally; otherwise only the named
+    families and stats are used (a stat named directly overrides its family).
+    """
+    if not weights:
+        return np.ones(len(stats))
+    by_stat = {}
+    for family, weight in weights.items():
+        for stat in STAT_FAMILIES.get(family, []):
+            by_stat[stat] = weight
+    for name, weight in weights.items():
+        if name not in STAT_FAMILIES:
+            by_stat[name] = weight
+    return np.array([by_stat.get(stat, 0.0) for stat in stats], dtype=float)
+
+def standardize(matrix):
+    """Z-score each column; missing values become the column mean (0 after scaling)"""
+    means = np.nanmean(matrix, axis=0)
+    stds = np.nanstd(matrix, axis=0)
+    stds[~np.isfinite(stds) | (stds == 0)] = 1.0
+    standardized = (matrix - np.nan_to_num(means)) / stds
+    return np.nan_to_num(standardized, nan=0.0).astype(np.float32)
+
+def _prepare(matrix, weights, metric):
+    # Scaling columns by sqrt(weight) turns both metrics into their weighted forms
+    weighted = matrix * np.sqrt(weights).astype(np.float32)
+    if metric == 'cosine':
+        norms = np.linalg.norm(weighted, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return weighted / norms
+    return weighted
+
+def _scores(queries, candidates, candidate_sq_norms, metric):
+    """Higher is more similar: cosine similarity, or negative Euclidean distance"""
+    products = queries @ candidates.T
+    if metric == 'cosine':
+        return products
+    query_sq_norms = np.einsum('ij,ij->i', queries, queries)[:, None]
+    return -np.sqrt(np.maximum(query_sq_norms + candidate_sq_norms[None, :] - 2 * products, 0))
+
+def top_k_neighbours(matrix, k=DEFAULT_K, metric='cosine', weights=None, batch_size=DEFAULT_BATCH_SIZE):
+    """Top-k most similar rows for every row of a standardized matrix.
+
+    `weights` is an optional per-column weight array. Rows are scored against
+    the whole matrix `batch_size` at a time, so peak memory is batch_size x n
+    scores. Returns (indices, scores), each n x k, best first; a row is never
+    its own neighbour.
+    """
+    n = matrix.shape[0]
+    k = min(k, n - 1)
+    if k <= 0:
+        return np.zeros((n, 0), dtype=np.int64), np.zeros((n, 0), dtype=np.float32)
+
+    prepared = _prepare(matrix, np.ones(matrix.shape[1]) if weights is None else weights, metric)
+    sq_norms = np.einsum('ij,ij->i', prepared, prepared)
+    indices = np.empty((n, k), dtype=np.int64)
+    scores = np.empty((n, k), dtype=np.float32)
+
+    for start in range(0, n, batch_size):
+        stop = min(start + batch_size, n)
+        batch_scores = _scores(prepared[start:stop], prepared, sq_norms, metric)
+        batch_scores[np.arange(stop - start), np.arange(start, stop)] = -np.inf
+
+        # argpartition finds the k best in linear time; only those k get sorted
+        best = np.argpartition(batch_scores, -k, axis=1)[:, -k:]
+        best_scores = np.take_along_axis(batch_scores, best, axis=1)
+        order = np.argsort(-best_scores, axis=1)
+        indices[start:stop] = np.take_along_axis(best, order, axis=1)
+        scores[start:stop] = np.take_along_axis(best_scores, order, axis=1)
+
+    return indices, scores
+
+class SimilarityIndex:
+    """Standardized stat matrices per position group, for nearest-neighbour queries.
+
+    Rows refer to positions in player_data.json. Matrices are standardized
+    within each group, so a stat counts relative to players in the same role.
+    """
+
+    def __init__(self, stats, names, teams, groups):
+        self.stats = list(stats)
+        self.names = list(names)
+        self.teams = list(teams)
+        # group -> (rows array, standardized float32 matrix)
+        self.groups = groups
+        self._group_of = {int(row): (group, position) for group, (rows, _) in groups.items() for position, row in enumerate(rows)}
+
+    @classmethod
+    def build(cls, players, stats=None, min_minutes=0):
+        """Build from converter output. `stats` defaults to every numeric stat column."""
+        if stats is None:
+            stats = list(dict.fromkeys(
+                key for player in players for key, entry in player['stats'].items()
+                if isinstance(entry, dict) or isinstance(entry, float)
+            ))
+
+        values = np.array([[stat_value(player['stats'].get(stat)) for stat in stats] for player in players], dtype=float) \
+            if players else np.zeros((0, len(stats)))
+
+        members = {}
+        for row, player in enumerate(players):
+            minutes = player.get('minutes')
+            if min_minutes and not (isinstance(minutes, (int, float)) and minutes >= min_minutes):
+                continue
+            members.setdefault(position_group(player.get('position', '')), []).append(row)
+
+        groups = {
+            group: (np.array(rows, dtype=np.int64), standardize(values[rows]))
+            for group, rows in members.items()
+        }
+        return cls(stats, [p.get('name', '') for p in players], [p.get('team', '') for p in players], groups)
+
+    def save(self, path):
+        """Write the matrices to a .npz file for query()"""
+        arrays = {'stats': np.array(self.stats), 'names': np.array(self.names), 'teams': np.array(self.teams)}
+        for group, (rows, matrix) in self.groups.items():
+            arrays[f"rows__{group}"] = rows
+            arrays[f"matrix__{group}"] = matrix
+        np.savez_compressed(path, **arrays)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path, allow_pickle=False) as data:
+            groups = {
+                key[len("rows__"):]: (data[key], data[f"matrix__{key[len('rows__'):]}"])
+                for key in data.files if key.startswith("rows__")
+            }
+            return cls(data['stats'].tolist(), data['names'].tolist(), data['teams'].tolist(), groups)
+
+    def neighbours(self, k=DEFAULT_K, metric='cosine', weights=None, batch_size=DEFAULT_BATCH_SIZE):
+        """Top-k neighbours of every player: {group: {"rows", "neighbours", "scores"}} with global rows"""
+        col_weights = column_weights(self.stats, weights)
+        result = {}
+        for group, (rows, matrix) in self.groups.items():
+            indices, scores = top_k_neighbours(matrix, k, metric, col_weights, batch_size)
+            result[group] = {
+                'rows': rows.tolist(),
+                'neighbours': rows[indices].tolist(),
+                'scores': np.round(scores, 3).tolist()
+            }
+        return result
+
+    def query(self, row, k=DEFAULT_K, metric='cosine', weights=None):
+        """The k players most like player_data.json row `row`, within its position group.
+
+        `weights` maps stat families (see STAT_FAMILIES) or stat names to
+        weights, e.g. {'progression': 2, 'creation': 1}. Returns a list of
+        {row, name, team, score}; score is cosine similarity, or negative
+        distance for metric='euclidean'.
+        """
+        if row not in self._group_of:
+            raise KeyError(f"Player row {row} is not in the index")
+        group, position = self._group_of[row]
+        rows, matrix = self.groups[group]
+
+        prepared = _prepare(matrix, column_weights(self.stats, weights), metric)
+        sq_norms = np.einsum('ij,ij->i', prepared, prepared)
+        scores = _scores(prepared[position:position + 1], prepared, sq_norms, metric)[0]
+        scores[position] = -np.inf
+
+        k = min(k, len(rows) - 1)
+        if k <= 0:
+            return []
+        best = np.argpartition(-scores, k - 1)[:k]
+        best = best[np.argsort(-scores[best])]
+        return [
+            {'row': int(rows[i]), 'name': self.names[rows[i]], 'team': self.teams[rows[i]], 'score': round(float(scores[i]), 4)}
+            for i in best
+        ]
+
+    def find_rows(self, name, team=None):
+        return [row for row, (player_name, player_team) in enumerate(zip(self.names, self.teams))
+                if player_name == name and (team is None or player_team == team)]
+
+def build_similarity_outputs(players, index_file_path, matrix_file_path, k=DEFAULT_K, metric='cosine', weights=None, min_minutes=0):
+    """Write the neighbour index JSON (for the frontend) and the matrix .npz (for query())"""
+    start_time = time.perf_counter()
+    index = SimilarityIndex.build(players, min_minutes=min_minutes)
+    index.save(matrix_file_path)
+
+    neighbours = index.neighbours(k, metric, weights)
+    with open(index_file_path, 'w', encoding='utf-8') as f:
+        json.dump({'k': k, 'metric': metric, 'weights': weights, 'groups': neighbours},
+                  f, ensure_ascii=False, separators=(',', ':'))
+
+    indexed = sum(len(group['rows']) for group in neighbours.values())
+    print(f"Indexed {indexed} players in {len(neighbours)} position groups in {time.perf_counter() - start_time:.2f}s "
+          f"-> {index_file_path}, {matrix_file_path}")
+    return index
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Find players similar to a given player using the similarity matrices")
+    parser.add_argument("name", help="player name as in player_data.json")
+    parser.add_argument("--team", help="disambiguate players with the same name")
+    parser.add_argument("--matrix-file", default=os.path.join(DATA_DIR, 'player_similarity.npz'))
+    parser.add_argument("-k", type=int, default=DEFAULT_K)
+    parser.add_argument("--metric", choices=["cosine", "euclidean"], default="cosine")
+    parser.add_argument("--weight", action="append", default=[],
+                        help=f"family=weight or 'stat name=weight', repeatable; families: {', '.join(STAT_FAMILIES)}")
+    args = parser.parse_args()
+
+    weights = {}
+    for spec in args.weight:
+        key, _, value = spec.rpartition('=')
+        weights[key] = float(value)
+
+    index = SimilarityIndex.load(args.matrix_file)
+    rows = index.find_rows(args.name, args.team)
+    if not rows:
+        parser.error(f"No player named {args.name!r} in the index")
+
+    for match in index.query(rows[0], args.k, args.metric, weights or None):
+        print(f"{match['score']:>8.3f}  {match['name']} ({match['team']})")
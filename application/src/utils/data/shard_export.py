@@ -0,0 +1,133 @@
+import argparse
+import gzip
+import hashlib
+import json
+import os
+import re
+
+from player_csv_converter import primary_position
+
+DATA_DIR = os.path.dirname(os.path.abspath(__file__))
+# Served by Vite from public/, so shards load as data/shards/<kind>/...
+DEFAULT_SHARDS_DIR = os.path.join(DATA_DIR, '..', '..', '..', 'public', 'data', 'shards')
+MANIFEST_FILE = "manifest.json"
+
+# kind -> layout -> function returning the shard keys a record belongs to.
+# Records are the items of the converter's JSON output (teams for lineups).
+SHARD_LAYOUTS = {
+    "oppo": {
+        "by-team": lambda record: [record['team']],
+        "by-season": lambda record: [str(record['season'])]
+    },
+    "players": {
+        "by-team": lambda player: [str(player.get('team', ''))],
+        "by-position": lambda player: [f"{player.get('league', '')}/{primary_position(player.get('position', ''))}"],
+        "by-season": lambda player: [str(player.get('season', ''))]
+    },
+    "matches": {
+        "by-team": lambda match: list(match['teams'])
+    },
+    "lineups": {
+        "by-team": lambda team: [team['team_name']]
+    }
+}
+
+def slugify(value):
+    return re.sub(r"[^a-z0-9]+", "-", str(value).lower()).strip("-") or "_"
+
+def shard_path(key):
+    """Relative file for a shard key; '/' in a key becomes a subdirectory"""
+    return "/".join(slugify(part) for part in key.split("/")) + ".json"
+
+def load_manifest(kind_dir):
+    try:
+        with open(os.path.join(kind_dir, MANIFEST_FILE), 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {"layouts": {}}
+
+def write_shards(kind, records, shards_dir=DEFAULT_SHARDS_DIR):
+    """Write minified JSON shards of `records` for every layout of `kind`, with .gz sidecars.
+
+    Each layout gets a directory of shards keyed by team, league/position or
+    season, and <shards_dir>/<kind>/manifest.json maps every key to its path,
+    record count, sizes and content hash. Shards whose hash is unchanged are
+    left untouched, and shards no longer produced are deleted.
+    """
+    kind_dir = os.path.join(shards_dir, kind)
+    previous = load_manifest(kind_dir)
+    manifest = {"kind": kind, "layouts": {}}
+    written = unchanged = 0
+
+    for layout, keys_for in SHARD_LAYOUTS[kind].items():
+        groups = {}
+        for record in records:
+            for key in keys_for(record):
+                groups.setdefault(key, []).append(record)
+
+        entries = {}
+        used_paths = set()
+        previous_entries = previous["layouts"].get(layout, {})
+        for key, group in sorted(groups.items()):
+            body = json.dumps(group, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+            digest = hashlib.sha256(body).hexdigest()[:16]
+            relative_path = f"{layout}/{shard_path(key)}"
+            if relative_path in used_paths:
+                # Two keys that slugify the same, e.g. "St. Albans" and "St Albans"
+                relative_path = f"{relative_path[:-len('.json')]}-{hashlib.sha256(key.encode('utf-8')).hexdigest()[:8]}.json"
+            used_paths.add(relative_path)
+            path = os.path.join(kind_dir, relative_path)
+
+            old = previous_entries.get(key)
+            if old and old["hash"] == digest and old["path"] == relative_path and os.path.exists(path) and os.path.exists(path + ".gz"):
+                entries[key] = old
+                unchanged += 1
+                continue
+
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # mtime=0 keeps the gzip bytes identical for identical content
+            compressed = gzip.compress(body, compresslevel=9, mtime=0)
+            with open(path, 'wb') as f:
+                f.write(body)
+            with open(path + ".gz", 'wb') as f:
+                f.write(compressed)
+            entries[key] = {
+                "path": relative_path,
+                "count": len(group),
+                "bytes": len(body),
+                "gzipBytes": len(compressed),
+                "hash": digest
+            }
+            written += 1
+
+        manifest["layouts"][layout] = entries
+
+    # Remove shards that were produced last time but not this time
+    current_paths = {entry["path"] for entries in manifest["layouts"].values() for entry in entries.values()}
+    for entries in previous["layouts"].values():
+        for entry in entries.values():
+            if entry["path"] not in current_paths:
+                for stale in (entry["path"], entry["path"] + ".gz"):
+                    try:
+                        os.remove(os.path.join(kind_dir, stale))
+                    except OSError:
+                        pass
+
+    os.makedirs(kind_dir, exist_ok=True)
+    with open(os.path.join(kind_dir, MANIFEST_FILE), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, separators=(',', ':'))
+
+    total_bytes = sum(entry["bytes"] for entries in manifest["layouts"].values() for entry in entries.values())
+    print(f"Wrote {written} {kind} shards ({unchanged} unchanged, {total_bytes / 1024:.0f} KB) to {kind_dir}")
+    return manifest
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Shard an existing converter JSON output for lazy frontend loading")
+    parser.add_argument("kind", choices=sorted(SHARD_LAYOUTS))
+    parser.add_argument("json_file", help="e.g. oppo_data.json, player_data.json, match_data.json or lineup_data.json")
+    parser.add_argument("--shards-dir", default=DEFAULT_SHARDS_DIR)
+    args = parser.parse_args()
+
+    with open(args.json_file, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    write_shards(args.kind, data["teams"] if args.kind == "lineups" else data, args.shards_dir)
@@ -0,0 +1,135 @@
+import argparse
+import json
+import os
+import numpy as np
+
+MATRIX_VERSION = 1
+
+def _as_float(value):
+    """Stat entry ({value, percentile} or a bare value) as a float; non-numeric becomes NaN"""
+    if isinstance(value, dict):
+        value = value.get('value')
+    return float(value) if isinstance(value, (int, float)) and not isinstance(value, bool) else np.nan
+
+def oppo_matrices(records):
+    """(row labels, columns, {name: matrix}) for oppo_data.json records: stat values and percentiles"""
+    columns = list(dict.fromkeys(stat for record in records for stat in record['stats']))
+    rows = {
+        'team': [record['team'] for record in records],
+        'season': [str(record['season']) for record in records]
+    }
+    if any('league' in record for record in records):
+        rows['league'] = [record.get('league', '') for record in records]
+
+    values = np.full((len(records), len(columns)), np.nan)
+    percentiles = np.full((len(records), len(columns)), np.nan)
+    for i, record in enumerate(records):
+        stats = record['stats']
+        values[i] = [_as_float(stats.get(stat)) for stat in columns]
+        percentiles[i] = [stats[stat]['percentile'] if stat in stats else np.nan for stat in columns]
+    return rows, columns, {'values': values, 'percentiles': percentiles}
+
+def match_matrices(matches):
+    """(row labels, columns, {name: matrix}) for match_data.json: one row per team per match"""
+    columns = list(dict.fromkeys(stat for match in matches for team in match['teams'].values() for stat in team['stats']))
+    rows = {'matchId': [], 'match': [], 'date': [], 'team': []}
+    value_rows = []
+    for match in matches:
+        for team_name, team in match['teams'].items():
+            rows['matchId'].append(match['matchId'])
+            rows['match'].append(match['match'])
+            rows['date'].append(match['date'])
+            rows['team'].append(team_name)
+            value_rows.append([_as_float(team['stats'].get(stat)) for stat in columns])
+    values = np.array(value_rows, dtype=np.float64).reshape(len(value_rows), len(columns))
+    return rows, columns, {'values': values}
+
+def write_matrices(stem, rows, columns, matrices):
+    """Write <stem>.<name>.npy for each matrix and <stem>.labels.json describing them.
+
+    Missing and non-numeric stats are NaN. Returns the sidecar path.
+    """
+    os.makedirs(os.path.dirname(os.path.abspath(stem)), exist_ok=True)
+    files = {}
+    for name, matrix in matrices.items():
+        path = f"{stem}.{name}.npy"
+        np.save(path, np.ascontiguousarray(matrix, dtype=np.float64))
+        files[name] = os.path.basename(path)
+
+    labels_path = f"{stem}.labels.json"
+    with open(labels_path, 'w', encoding='utf-8') as f:
+        json.dump({
+            'version': MATRIX_VERSION,
+            'shape': [len(next(iter(rows.values()), [])), len(columns)],
+            'rows': rows,
+            'columns': columns,
+            'matrices': files
+        }, f, ensure_ascii=False)
+    return labels_path
+
+class StatMatrix:
+    """Read-only, memory-mapped view of matrices written by write_matrices().
+
+    Every process opening the same files shares one copy through the page
+    cache; nothing is parsed or copied until a slice is used.
+
+        m = StatMatrix('oppo_data.labels.json')
+        xg = m.column('xG')                       # view into the mapped file
+        rows = m.rows_where(season='24/25')
+        m.values[rows][:, m.columns_for(['xG', 'Oppo xG'])]
+    """
+
+    def __init__(self, labels_path, mmap_mode='r'):
+        with open(labels_path, 'r', encoding='utf-8') as f:
+            labels = json.load(f)
+        base_dir = os.path.dirname(os.path.abspath(labels_path))
+        self.rows = labels['rows']
+        self.columns = labels['columns']
+        self._column_index = {column: i for i, column in enumerate(self.columns)}
+        self.matrices = {
+            name: np.load(os.path.join(base_dir, filename), mmap_mode=mmap_mode)
+            for name, filename in labels['matrices'].items()
+        }
+
+    @property
+    def values(self):
+        return self.matrices['values']
+
+    @property
+    def shape(self):
+        return self.values.shape
+
+    def __getitem__(self, name):
+        return self.matrices[name]
+
+    def columns_for(self, names):
+        return [self._column_index[name] for name in names]
+
+    def column(self, name, matrix='values'):
+        return self.matrices[matrix][:, self._column_index[name]]
+
+    def rows_where(self, **labels):
+        """Row indices whose labels equal every given value, e.g. rows_where(team='Dorking Wanderers')"""
+        mask = np.ones(self.shape[0], dtype=bool)
+        for key, value in labels.items():
+            mask &= np.asarray(self.rows[key], dtype=object) == value
+        return np.flatnonzero(mask)
+
+    def frame(self, matrix='values'):
+        """pandas DataFrame over one matrix (pandas may copy the data)"""
+        import pandas as pd
+        index = pd.MultiIndex.from_arrays(list(self.rows.values()), names=list(self.rows))
+        return pd.DataFrame(self.matrices[matrix], index=index, columns=self.columns)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Write .npy stat matrices from an existing oppo_data.json or match_data.json")
+    parser.add_argument("kind", choices=["oppo", "matches"])
+    parser.add_argument("json_file")
+    parser.add_argument("--stem", help="output path prefix (default: json_file without .json)")
+    args = parser.parse_args()
+
+    with open(args.json_file, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    rows, columns, matrices = (oppo_matrices if args.kind == "oppo" else match_matrices)(data)
+    labels_path = write_matrices(args.stem or os.path.splitext(args.json_file)[0], rows, columns, matrices)
+    print(f"Wrote {', '.join(matrices)} ({len(next(iter(rows.values())))}x{len(columns)}) described by {labels_path}")
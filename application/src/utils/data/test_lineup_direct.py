@@ -0,0 +1,102 @@
+import json
+import os
+
+from lineup_api import SofascoreClient, TOURNAMENT_ID
+from lineup_cache import ResponseCache
+from lineup_grabber import (LEAGUE_NAME, STANDINGS_URL, extract_teams, build_final_data,
+                            collect_all_teams_lineups_direct, _collect_team_sync)
+from lineup_stub_server import start_stub_server
+
+SEASON_ID = 61234
+TEAMS = [("Dorking Wanderers", "dorking-wanderers", 43470, 1), ("Truro City", "truro-city", 43471, 2)]
+
+def event(event_id, home, away, timestamp, tournament=LEAGUE_NAME):
+    return {
+        "id": event_id, "slug": f"e-{event_id}", "customId": f"c{event_id}", "startTimestamp": timestamp,
+        "tournament": {"name": tournament},
+        "homeTeam": {"name": home}, "awayTeam": {"name": away}
+    }
+
+def average_positions(event_id):
+    side = lambda offset: [
+        {"player": {"id": event_id * 100 + offset + n, "name": f"Player {offset + n}", "jerseyNumber": str(n + 1),
+                    "position": "G" if n == 0 else "M"},
+         "averageX": 10.0 + n * 7, "averageY": 50.0 - n}
+        for n in range(12)
+    ]
+    return {"home": side(0), "away": side(50), "substitutions": [{"playerIn": {"id": event_id * 100 + 11}}]}
+
+def recorded_fixtures():
+    """{API path: body}, in the layout SofascoreClient(record_dir=...) writes"""
+    events = {
+        43470: [event(11, "Dorking Wanderers", "Truro City", 300), event(12, "Bath City", "Dorking Wanderers", 200),
+                event(13, "Dorking Wanderers", "Chelsea", 250, tournament="FA Cup")],
+        43471: [event(11, "Dorking Wanderers", "Truro City", 300), event(14, "Truro City", "Hemel", 100)]
+    }
+    fixtures = {
+        f"unique-tournament/{TOURNAMENT_ID}/seasons": {"seasons": [
+            {"id": SEASON_ID, "name": "National League South 24/25", "year": "24/25"},
+            {"id": SEASON_ID - 1, "name": "National League South 23/24", "year": "23/24"}
+        ]},
+        f"unique-tournament/{TOURNAMENT_ID}/season/{SEASON_ID}/standings/total": {"standings": [{"rows": [
+            {"position": position, "team": {"name": name, "slug": slug, "id": team_id}}
+            for name, slug, team_id, position in TEAMS
+        ]}]}
+    }
+    for team_id, team_events in events.items():
+        fixtures[f"team/{team_id}/performance"] = {"events": team_events}
+    # Event 14 has no average-positions fixture, so the stub answers 404
+    for event_id in (11, 12, 13):
+        fixtures[f"event/{event_id}/average-positions"] = average_positions(event_id)
+    return fixtures
+
+def write_fixtures(fixtures_dir, fixtures):
+    for path, body in fixtures.items():
+        fixture_path = os.path.join(fixtures_dir, "api", "v1", path + ".json")
+        os.makedirs(os.path.dirname(fixture_path), exist_ok=True)
+        with open(fixture_path, "w", encoding="utf-8") as f:
+            json.dump(body, f)
+
+def browser_mode_output(fixtures, cache_dir):
+    """collect_all_teams_lineups()'s result for the same responses.
+
+    Every body the browser would capture is already in the response cache, so
+    no page is ever opened and the browser-mode assembly runs without a browser.
+    """
+    cache = ResponseCache(cache_dir)
+    standings = fixtures[f"unique-tournament/{TOURNAMENT_ID}/season/{SEASON_ID}/standings/total"]
+    cache.put("standings", STANDINGS_URL, standings)
+    for path, body in fixtures.items():
+        parts = path.split("/")
+        if parts[0] == "team":
+            cache.put("performance", int(parts[1]), body)
+        elif parts[0] == "event":
+            cache.put("average-positions", int(parts[1]), body)
+
+    teams = extract_teams(standings)
+    return build_final_data(teams, [_collect_team_sync(None, None, team, cache) for team in teams])
+
+def test_direct_mode_matches_browser_mode(tmp_path):
+    fixtures = recorded_fixtures()
+    write_fixtures(tmp_path / "fixtures", fixtures)
+    server, api_base = start_stub_server(str(tmp_path / "fixtures"))
+    client = SofascoreClient(api_base, pool_size=2, max_attempts=1)
+    try:
+        direct = collect_all_teams_lineups_direct(client, output_path=str(tmp_path / "direct.json"), workers=2)
+    finally:
+        client.close()
+        server.shutdown()
+
+    browser = browser_mode_output(fixtures, str(tmp_path / "cache"))
+    for data in (direct, browser):
+        data.pop("collection_timestamp")
+    assert direct == browser
+
+    # The label comes from the season the standings were taken from
+    assert direct["season"] == "2024/25"
+    dorking = direct["teams"][0]
+    assert [match["id"] for match in dorking["last_5_matches"]] == [11, 12]
+    assert dorking["last_5_matches"][0]["players"]["home"][11]["started"] is False
+    assert direct["teams"][1]["last_5_matches"][1]["players"] is None
+    with open(tmp_path / "direct.json", encoding="utf-8") as f:
+        assert json.load(f)["teams"] == direct["teams"]
@@ -0,0 +1,263 @@
+import argparse
+import csv
+import json
+import os
+import time
+
+from match_csv_converter import (MATCH_SCHEMA, DEFAULT_WINDOWS, build_match, build_league_average,
+                                 build_team_series, positive_int)
+from oppo_csv_converter import load_team_rows, rank_team_rows, apply_team_rows, group_columns
+from pipeline import CONVERTERS, output_paths
+
+DATA_DIR = os.path.dirname(os.path.abspath(__file__))
+# Served by the Vite dev server, so rewritten files show up on the next fetch
+DEFAULT_OUTPUT_DIR = os.path.join(DATA_DIR, '..', '..', '..', 'public', 'data')
+DEFAULT_INTERVAL = 0.05
+
+def write_json_atomic(path, data, **dump_options):
+    """Write to a temporary file and rename it over `path`, so readers never see half a file"""
+    temporary_path = f"{path}.tmp"
+    with open(temporary_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, **dump_options)
+    os.replace(temporary_path, path)
+
+def file_signature(path):
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size)
+
+class MatchWatcher:
+    """Keeps match_data.csv parsed in memory and rebuilds only matches whose rows changed.
+
+    Parsed stats are cached per raw CSV row, so an edit re-parses just the
+    edited rows, and a match is rebuilt (xPoints included) only when its set of
+    rows changed. Match ids are assigned in file order on the first build, as
+    csv_to_json() does; later new matches get the next unused id.
+    """
+
+    def __init__(self, csv_file_path, json_file_path, series_file_path, windows=DEFAULT_WINDOWS):
+        self.csv_file_path = csv_file_path
+        self.json_file_path = json_file_path
+        self.series_file_path = series_file_path
+        self.windows = windows
+        self.header = None
+        self.parsed = {}    # raw row tuple -> (row dict, stats)
+        self.matches = {}   # match name -> (raw row tuples, built match)
+        self.ids = {}
+        self.next_id = 1
+
+    def _parse_rows(self, rows):
+        if rows[0] != self.header:
+            # New columns change every row's stats, so start over
+            self.header = rows[0]
+            self.parsed = {}
+            self.converters = [(i, name, convert) for i, name, convert in MATCH_SCHEMA.cell_converters(self.header)
+                               if MATCH_SCHEMA.column_type(name) != 'raw']
+
+        width = len(self.header)
+        parsed = {}
+        reparsed = 0
+        for row in rows[1:]:
+            if not row:
+                continue
+            key = tuple(row)
+            entry = self.parsed.get(key) or parsed.get(key)
+            if entry is None:
+                # Missing trailing cells are '', as the converters pad them
+                cells = row + [''] * (width - len(row)) if len(row) < width else row
+                entry = (dict(zip(self.header, cells)), {name: convert(cells[i]) for i, name, convert in self.converters})
+                reparsed += 1
+            parsed[key] = entry
+        self.parsed = parsed
+        return [(tuple(row), parsed[tuple(row)]) for row in rows[1:] if row], reparsed
+
+    def refresh(self):
+        """Re-read the CSV and rewrite the outputs. Returns (rows re-parsed, matches rebuilt)."""
+        with open(self.csv_file_path, 'r', encoding='utf-8', newline='') as f:
+            rows = list(csv.reader(f))
+        if not rows:
+            return 0, 0
+        entries, reparsed = self._parse_rows(rows)
+
+        league_average = None
+        grouped = {}
+        for key, (row, stats) in entries:
+            if row['Match'] == 'LEAGUE AVERAGE':
+                league_average = (row, dict(stats))
+            elif row['Goals'] and not row['Goals'].isspace():
+                grouped.setdefault(row['Match'], []).append((key, row, stats))
+
+        result = []
+        matches = {}
+        rebuilt = 0
+        for match_name, match_entries in grouped.items():
+            if match_name not in self.ids:
+                self.ids[match_name] = self.next_id
+                self.next_id += 1
+            row_keys = tuple(key for key, _, _ in match_entries)
+            previous = self.matches.get(match_name)
+            if previous and previous[0] == row_keys:
+                match = previous[1]
+            else:
+                # Copies, because build_match() adds xPoints to the stats it is given
+                match = build_match(match_name, [(row, dict(stats)) for _, row, stats in match_entries], self.ids[match_name])
+                rebuilt += 1
+            matches[match_name] = (row_keys, match)
+            result.append(match)
+        self.matches = matches
+
+        if league_average:
+            result.insert(0, build_league_average(league_average))
+
+        write_json_atomic(self.json_file_path, result, indent=2, ensure_ascii=False)
+        write_json_atomic(self.series_file_path, build_team_series(result, self.windows), ensure_ascii=False)
+        return reparsed, rebuilt
+
+class OppoWatcher:
+    """Keeps oppo_data.csv's rows and ranked records in memory and re-ranks only changed rows.
+
+    Edited rows (matched by team and season) and rows appended at the end go
+    through apply_team_rows(), which re-ranks only the season groups and stats
+    they touch. Removed, reordered or regrouped rows, or changed columns, fall
+    back to ranking every row.
+    """
+
+    def __init__(self, csv_file_path, json_file_path):
+        self.csv_file_path = csv_file_path
+        self.json_file_path = json_file_path
+        self.records = None
+        self.columns = None
+        self.rows = {}      # (team, season) -> (groups, values)
+
+    def refresh(self):
+        """Re-read the CSV and rewrite the output. Returns (rows re-ranked, (group, stat) pairs re-ranked)."""
+        df, numeric_columns = load_team_rows(self.csv_file_path)
+        keys = list(zip(df['Team'], df['Season'].astype(str)))
+        groups = list(zip(*[df[col].astype(str) for col in group_columns(df)])) or [()] * len(df)
+        values = df[numeric_columns].to_numpy(dtype=float).tolist()
+        rows = dict(zip(keys, zip(groups, values)))
+
+        previous_keys = list(self.rows)
+        incremental = (
+            self.records is not None
+            and numeric_columns == self.columns
+            and len(rows) == len(keys)
+            and keys[:len(previous_keys)] == previous_keys
+            and all(rows[key][0] == self.rows[key][0] for key in previous_keys)
+        )
+
+        if incremental:
+            changed = [key not in self.rows or self.rows[key][1] != rows[key][1] for key in keys]
+            records, reranked = apply_team_rows(self.records, df[changed], numeric_columns)
+            updated = sum(changed)
+        else:
+            records = rank_team_rows(df, numeric_columns)
+            reranked = None
+            updated = len(df)
+
+        self.records, self.columns, self.rows = records, numeric_columns, rows
+        if updated:
+            write_json_atomic(self.json_file_path, records, indent=2)
+        return updated, reranked
+
+class ConverterWatcher:
+    """Any other converter input: full conversion in this process, so only the parse is repeated"""
+
+    def __init__(self, module_name, csv_file_path, json_file_path):
+        import importlib
+        self.converter = importlib.import_module(module_name)
+        self.csv_file_path = csv_file_path
+        self.json_file_path = json_file_path
+
+    def refresh(self):
+        temporary_path = f"{self.json_file_path}.tmp"
+        data = self.converter.csv_to_json(self.csv_file_path, temporary_path)
+        os.replace(temporary_path, self.json_file_path)
+        return len(data), None
+
+def make_watcher(csv_file_path, output_dir, windows=DEFAULT_WINDOWS):
+    filename = os.path.basename(csv_file_path)
+    module_name = next((module for prefix, module in CONVERTERS.items() if filename.startswith(prefix)), None)
+    if module_name is None:
+        raise ValueError(f"No converter for {filename}; expected a name starting with one of {', '.join(CONVERTERS)}")
+
+    outputs = output_paths(module_name, csv_file_path, os.path.dirname(csv_file_path), output_dir)
+    if module_name == "match_csv_converter":
+        return MatchWatcher(csv_file_path, outputs[0], outputs[1], windows)
+    if module_name == "oppo_csv_converter":
+        return OppoWatcher(csv_file_path, outputs[0])
+    return ConverterWatcher(module_name, csv_file_path, outputs[0])
+
+def refresh(csv_file_path, watcher):
+    start_time = time.perf_counter()
+    try:
+        updated, detail = watcher.refresh()
+    except Exception as e:
+        # Most often the file was caught mid-save; the next change retries with the warm state intact
+        print(f"❌ {os.path.basename(csv_file_path)}: {e}")
+        return False
+    elapsed_ms = (time.perf_counter() - start_time) * 1000
+
+    if isinstance(watcher, MatchWatcher):
+        summary = f"{updated} rows re-parsed, {detail} matches rebuilt"
+    elif isinstance(watcher, OppoWatcher):
+        summary = f"{updated} rows updated, " + ("all groups re-ranked" if detail is None else f"{detail} (group, stat) pairs re-ranked")
+    else:
+        summary = f"{updated} rows converted"
+    print(f"🔄 {os.path.basename(csv_file_path)}: {summary} in {elapsed_ms:.1f} ms")
+    return True
+
+def watch(csv_file_paths, output_dir=DEFAULT_OUTPUT_DIR, interval=DEFAULT_INTERVAL, windows=DEFAULT_WINDOWS, once=False):
+    """Convert each CSV, then poll and reconvert whichever one changes.
+
+    A change is acted on once the file's mtime and size have been stable for
+    one polling interval, so a save in progress is not read half-written.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    watchers = {path: make_watcher(path, output_dir, windows) for path in csv_file_paths}
+    seen = {}
+    for path, watcher in watchers.items():
+        seen[path] = file_signature(path)
+        if seen[path] is not None:
+            refresh(path, watcher)
+    if once:
+        return watchers
+
+    print(f"👀 Watching {len(watchers)} files every {interval * 1000:.0f} ms -> {os.path.abspath(output_dir)} (Ctrl+C to stop)")
+    pending = {}
+    try:
+        while True:
+            time.sleep(interval)
+            for path, watcher in watchers.items():
+                signature = file_signature(path)
+                if signature is None or signature == seen[path]:
+                    pending.pop(path, None)
+                elif pending.get(path) != signature:
+                    pending[path] = signature
+                else:
+                    del pending[path]
+                    seen[path] = signature
+                    refresh(path, watcher)
+    except KeyboardInterrupt:
+        print("\n👋 Stopped watching")
+    return watchers
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Keep CSV inputs parsed in memory and reconvert them into the Vite data directory on change")
+    parser.add_argument("csv_files", nargs="*",
+                        help="CSVs to watch (default: match_data.csv, oppo_data.csv and player_data.csv next to this script)")
+    parser.add_argument("--output-dir", default=DEFAULT_OUTPUT_DIR, help="where JSON outputs are written")
+    parser.add_argument("--interval", type=float, default=DEFAULT_INTERVAL, help="polling interval in seconds")
+    parser.add_argument("--windows", type=positive_int, nargs="+", default=list(DEFAULT_WINDOWS),
+                        help="rolling windows for match_series.json")
+    parser.add_argument("--once", action="store_true", help="convert once and exit")
+    args = parser.parse_args()
+
+    csv_file_paths = args.csv_files or [
+        path for path in (os.path.join(DATA_DIR, f"{prefix}.csv") for prefix in CONVERTERS) if os.path.exists(path)
+    ]
+    if not csv_file_paths:
+        parser.error("No CSV inputs found")
+    watch([os.path.abspath(path) for path in csv_file_paths], args.output_dir, args.interval, tuple(args.windows), args.once)
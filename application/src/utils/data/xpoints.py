@@ -0,0 +1,100 @@
+import argparse
+import math
+from functools import lru_cache
+import numpy as np
+
+# Goals per side considered; the last bucket holds the Poisson tail (MAX_GOALS or more)
+MAX_GOALS = 15
+# xG grid for the cached goal-distribution table. CSV xG is recorded to two
+# decimals, so nearly every value is a table lookup; anything else is computed.
+TABLE_STEP = 0.01
+TABLE_MAX_XG = 8.0
+
+def _poisson_pmf(rates, max_goals):
+    """P(goals = k) for k = 0..max_goals per rate, with the tail folded into the last column"""
+    rates = np.asarray(rates, dtype=float)
+    goals = np.arange(max_goals + 1)
+    log_factorials = np.array([math.lgamma(k + 1) for k in goals])
+    with np.errstate(divide='ignore', invalid='ignore'):
+        log_pmf = goals * np.log(rates)[:, None] - rates[:, None] - log_factorials
+    pmf = np.exp(log_pmf)
+    # log(0) * 0 is nan: a team with zero xG scores zero goals
+    pmf[rates == 0] = np.eye(1, max_goals + 1)[0]
+    pmf[:, -1] = np.maximum(1 - pmf[:, :-1].sum(axis=1), 0)
+    return pmf
+
+@lru_cache(maxsize=None)
+def goal_table(max_goals=MAX_GOALS, step=TABLE_STEP, max_xg=TABLE_MAX_XG):
+    """Cached goal distributions for xG = 0, step, 2*step, ... max_xg (read-only)"""
+    table = _poisson_pmf(np.arange(round(max_xg / step) + 1) * step, max_goals)
+    table.setflags(write=False)
+    return table
+
+def goal_distributions(xg, max_goals=MAX_GOALS):
+    """Goal distribution for each xG value, from the cached table where the value is on its grid"""
+    xg = np.maximum(np.asarray(xg, dtype=float), 0)
+    table = goal_table(max_goals)
+    index = np.rint(xg / TABLE_STEP).astype(np.int64)
+    on_grid = (index < len(table)) & np.isclose(index * TABLE_STEP, xg, rtol=0, atol=1e-9)
+
+    pmf = np.empty((len(xg), max_goals + 1))
+    pmf[on_grid] = table[index[on_grid]]
+    if not on_grid.all():
+        pmf[~on_grid] = _poisson_pmf(xg[~on_grid], max_goals)
+    return pmf
+
+def outcome_probabilities(xg_for, xg_against, max_goals=MAX_GOALS):
+    """(win, draw, loss) probability arrays for every match at once.
+
+    Goals for each side are independent Poisson variables with mean xG.
+    Summing the score matrix P(for = i) * P(against = j) below, on and above
+    its diagonal is done through the opponent's cumulative distribution, so
+    each match costs O(max_goals) rather than O(max_goals^2).
+    """
+    pmf_for = goal_distributions(xg_for, max_goals)
+    pmf_against = goal_distributions(xg_against, max_goals)
+    cdf_against = np.cumsum(pmf_against, axis=1)
+
+    draw = np.einsum('ij,ij->i', pmf_for, pmf_against)
+    win = np.einsum('ij,ij->i', pmf_for[:, 1:], cdf_against[:, :-1])
+    loss = np.maximum(1 - win - draw, 0)
+    return win, draw, loss
+
+def expected_points(xg_for, xg_against, max_goals=MAX_GOALS):
+    """3 * P(win) + P(draw) for every match"""
+    win, draw, _ = outcome_probabilities(xg_for, xg_against, max_goals)
+    return 3 * win + draw
+
+def add_xpoints(matches):
+    """Set stats['xPoints'] for both teams of every match in one batched pass.
+
+    A side missing from a match counts as 0 xG. Matches where neither side has
+    any xG are treated as having no xG data and get 0, as before.
+    """
+    pairs = []
+    for match in matches:
+        teams = list(match['teams'].values())
+        for team in teams[2:]:
+            team['stats']['xPoints'] = 0
+        pairs.append(teams[:2])
+
+    xg = np.array([[teams[i]['stats'].get('xG', 0) if i < len(teams) else 0 for i in range(2)] for teams in pairs],
+                  dtype=float).reshape(-1, 2)
+    xpoints_for = np.round(expected_points(xg[:, 0], xg[:, 1]), 3).tolist()
+    xpoints_against = np.round(expected_points(xg[:, 1], xg[:, 0]), 3).tolist()
+    no_xg = (xg.sum(axis=1) <= 0).tolist()
+
+    for teams, first, second, missing in zip(pairs, xpoints_for, xpoints_against, no_xg):
+        for team, xpoints in zip(teams, (first, second)):
+            team['stats']['xPoints'] = 0 if missing else xpoints
+    return matches
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Win/draw/loss probabilities and xPoints from two sides' xG")
+    parser.add_argument("xg_for", type=float)
+    parser.add_argument("xg_against", type=float)
+    args = parser.parse_args()
+
+    win, draw, loss = (p[0] for p in outcome_probabilities([args.xg_for], [args.xg_against]))
+    print(f"Win {win:.1%}  Draw {draw:.1%}  Loss {loss:.1%}")
+    print(f"xPoints {3 * win + draw:.3f} vs {3 * loss + draw:.3f}")
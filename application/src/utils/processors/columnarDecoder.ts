@@ -0,0 +1,37 @@
+import type { ColumnarTeamStats, ColumnarPlayers, TeamStats, Player } from '../../types'
+
+// Rebuild oppo_data.json rows from the columnar layout; values[i] holds stat i for every team
+export const decodeTeamStats = (payload: ColumnarTeamStats): TeamStats[] => {
+  return payload.teams.map((team, row) => {
+    const stats: Record<string, { value: number; percentile: number }> = {};
+    payload.stats.forEach((stat, column) => {
+      stats[stat] = { value: payload.values[column][row], percentile: payload.percentiles[column][row] };
+    });
+    const record: Record<string, unknown> = { team, season: payload.seasons[row], stats };
+    // Leagues are only present when percentiles were ranked within season and league
+    const league = payload.leagues?.[row];
+    if (league != null) record.league = league;
+    return record as unknown as TeamStats;
+  });
+}
+
+// Rebuild player_data.json rows; a null percentile means the stat was stored as a bare value
+export const decodePlayers = (payload: ColumnarPlayers): Player[] => {
+  const players: Player[] = [];
+  for (let row = 0; row < payload.count; row++) {
+    const player: Record<string, unknown> = {};
+    payload.fields.forEach((field, column) => {
+      player[field] = payload.columns[column][row];
+    });
+
+    const stats: Player['stats'] = {};
+    payload.stats.forEach((stat, column) => {
+      const value = payload.values[column][row];
+      const percentile = payload.percentiles[column][row];
+      stats[stat] = percentile === null ? (value as number) : { value: value as number, percentile };
+    });
+    player.stats = stats;
+    players.push(player as unknown as Player);
+  }
+  return players;
+}
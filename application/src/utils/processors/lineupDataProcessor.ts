@@ -1,4 +1,5 @@
-import type { LineupData, TeamLineup, MatchLineup, PlayerPosition } from '../../types'
+import type { LineupData, TeamLineup, MatchLineup, PlayerPosition, AverageShape } from '../../types'
+import { loadShard } from './shardLoader'
 
 export const processLineupData = async (): Promise<LineupData> => {
   try {
@@ -22,10 +23,12 @@ export const processLineupData = async (): Promise<LineupData> => {
 
 export const getTeamMatches = async (teamName: string): Promise<MatchLineup[]> => {
   try {
-    const data = await processLineupData();
+    // Per-team shard when available, otherwise the full lineup file
+    const shard = await loadShard<TeamLineup>('lineups', 'by-team', teamName).catch(() => null);
+    const teams = shard ?? (await processLineupData()).teams;
     
     // Find team by exact name match
-    const team = data.teams.find(t => 
+    const team = teams.find(t => 
       t.team_name === teamName
     );
     
@@ -80,6 +83,17 @@ export const getTeamMatches = async (teamName: string): Promise<MatchLineup[]> =
   }
 }
 
+export const getTeamShape = async (teamName: string): Promise<AverageShape | null> => {
+  try {
+    const shard = await loadShard<TeamLineup>('lineups', 'by-team', teamName).catch(() => null);
+    const teams = shard ?? (await processLineupData()).teams;
+    return teams.find(t => t.team_name === teamName)?.average_shape ?? null;
+  } catch (error) {
+    console.error('Error getting team shape:', error);
+    return null;
+  }
+}
+
 export const getMatchStarters = (matchLineup: MatchLineup): PlayerPosition[] => {
   return matchLineup.starters;
 }
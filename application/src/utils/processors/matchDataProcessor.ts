@@ -1,3 +1,5 @@
+import type { MatchSeries } from '../../types'
+
 export const processMatchData = async (): Promise<MatchData[]> => {
   try {
     const response = await fetch('data/match_data.json');
@@ -98,6 +100,29 @@ export const calculateXPointsProgression = (matches: MatchData[]): { match: stri
   });
 }
 
+// Precomputed per-team series written by match_csv_converter.py (match_series.json)
+export const processMatchSeries = async (): Promise<MatchSeries | null> => {
+  try {
+    const response = await fetch('data/match_series.json');
+    if (!response.ok) return null;
+
+    return await response.json();
+  } catch (error) {
+    console.error('Error loading match series:', error);
+    return null;
+  }
+}
+
+// Trailing mean over the last `window` values using a running sum
+export const rollingMean = (values: number[], window: number): number[] => {
+  let sum = 0;
+  return values.map((value, index) => {
+    sum += value;
+    if (index >= window) sum -= values[index - window];
+    return sum / Math.min(index + 1, window);
+  });
+}
+
 // Helper function to get team comparison data for stacked bar charts
 export const getTeamComparison = (match: MatchData, stats: string[]): { name: string; dorking: number; opposition: number }[] => {
   return stats.map(statName => ({
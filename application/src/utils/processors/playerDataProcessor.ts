@@ -31,29 +31,20 @@ export const processPlayerData = async (): Promise<Player[]> => {
 }
 
 export const getValue = (player: Player, statName: string): number => {
-  const value = player.stats[statName];
-  return typeof value === 'number' ? value : 0;
+  const stat = player.stats[statName];
+  if (typeof stat === 'number') return stat;
+  return stat && typeof stat === 'object' ? stat.value : 0;
 }
 
-export const getPercentileRank = (player: Player, statName: string, allPlayers: Player[]): number => {
-  const playerValue = getValue(player, statName);
-  const values = allPlayers
-    .map(p => getValue(p, statName))
-    .filter(v => v !== null && v !== undefined && !isNaN(v) && v !== 0)
-    .sort((a, b) => a - b);
-  
-  if (values.length === 0) return 0;
-  
-  const rank = values.filter(v => v < playerValue).length;
-  return Math.round((rank / values.length) * 100);
+// Percentiles are ranked within position and league by player_csv_converter.py
+export const getPercentileRank = (player: Player, statName: string): number => {
+  const stat = player.stats[statName];
+  return stat && typeof stat === 'object' ? Math.round(stat.percentile) : 0;
 }
 
 // Helper function to get all available stats for a player
 export const getAvailableStats = (player: Player): string[] => {
-  return Object.keys(player.stats).filter(key => {
-    const value = player.stats[key];
-    return typeof value === 'number' && value !== 0;
-  });
+  return Object.keys(player.stats).filter(key => getValue(player, key) !== 0);
 }
 
 // Helper function to check if a stat exists and has meaningful data across players
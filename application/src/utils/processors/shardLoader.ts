@@ -0,0 +1,40 @@
+import type { ShardManifest } from '../../types'
+
+// Manifests and shards are fetched at most once per page load
+const manifests = new Map<string, Promise<ShardManifest | null>>();
+const shards = new Map<string, Promise<unknown>>();
+
+export const loadShardManifest = (kind: string): Promise<ShardManifest | null> => {
+  let manifest = manifests.get(kind);
+  if (!manifest) {
+    manifest = fetch(`data/shards/${kind}/manifest.json`)
+      .then(response => (response.ok ? response.json() : null))
+      .catch(() => null);
+    manifests.set(kind, manifest);
+  }
+  return manifest;
+}
+
+// Load the shard for one key (e.g. a team name) of a layout, or null if the
+// converters were not run with --shards-dir. The content hash in the URL lets
+// unchanged shards stay in the browser cache across data updates.
+export const loadShard = async <T>(kind: string, layout: string, key: string): Promise<T[] | null> => {
+  const manifest = await loadShardManifest(kind);
+  const entry = manifest?.layouts[layout]?.[key];
+  if (!entry) return null;
+
+  const url = `data/shards/${kind}/${entry.path}?v=${entry.hash}`;
+  let shard = shards.get(url);
+  if (!shard) {
+    shard = fetch(url).then(response => {
+      if (!response.ok) {
+        throw new Error(`HTTP error! status: ${response.status}`);
+      }
+      return response.json();
+    });
+    shards.set(url, shard);
+    // Drop failed loads so a later call can retry
+    shard.catch(() => shards.delete(url));
+  }
+  return shard as Promise<T[]>;
+}
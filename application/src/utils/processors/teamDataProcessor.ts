@@ -1,14 +1,22 @@
 import type { TeamStats } from '../../types'
+import { loadShard } from './shardLoader'
 
-export const processTeamData = async (): Promise<TeamStats[]> => {
+// Pass a season to load only that season's shard when shards are available
+export const processTeamData = async (season?: string): Promise<TeamStats[]> => {
   try {
-    const response = await fetch('data/oppo_data.json');
-    if (!response.ok) {
-      throw new Error(`HTTP error! status: ${response.status}`);
+    const shard = season ? await loadShard<TeamStats>('oppo', 'by-season', season).catch(() => null) : null;
+    let data: TeamStats[];
+    if (shard) {
+      data = shard;
+    } else {
+      const response = await fetch('data/oppo_data.json');
+      if (!response.ok) {
+        throw new Error(`HTTP error! status: ${response.status}`);
+      }
+      
+      data = await response.json();
     }
     
-    const data: TeamStats[] = await response.json();
-    
     if (!data || !data.length) {
       throw new Error('No team data found');
     }